@@ -3,9 +3,16 @@ The main Hallam application startup code.
 
 This will run if and only if the user invokes the Hallam application
 directly (but not when just using it as a plugin in a different app). 
+
+Pass ``--profile-startup`` anywhere on the command line to run the command under
+Python's import timer and print the slowest module imports afterwards.
 """
 import sys
 import os
+import subprocess
+
+PROFILE_STARTUP_FLAG = "--profile-startup"
+NUM_SLOWEST_IMPORTS = 30
 
 
 def buildPath():
@@ -28,13 +35,55 @@ def buildPath():
     )
 
     root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    base, pluginDirs, _ = next(os.walk(os.path.join(root, "plugins")))
-    for pluginDir in pluginDirs:
-        sys.path.append(os.path.join(base, pluginDir))
+    pluginsRoot = os.path.join(root, "plugins")
+    if os.path.isdir(pluginsRoot):
+        for entry in os.scandir(pluginsRoot):
+            if entry.is_dir():
+                sys.path.append(entry.path)
 
     sys.path.append(os.path.abspath(root))
 
 
+def profileStartup(argv):
+    """
+    Rerun this command under ``python -X importtime`` and report import times.
+
+    The command's own stderr is passed through, and the slowest imports (by
+    cumulative time, including their own imports) are printed at the end.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "happ"] + argv,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            sys.stderr.write(line + "\n")
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            selfUs, cumulativeUs = int(fields[0]), int(fields[1])
+        except ValueError:
+            # the header line
+            continue
+        imports.append((cumulativeUs, selfUs, fields[2].strip()))
+
+    total = sum(selfUs for _cumulative, selfUs, _name in imports)
+    print(f"\nStartup imports: {len(imports)} modules, {total / 1e6:.3f} s total")
+    print(f"{'cumulative (s)':>15} {'self (s)':>10}  module")
+    for cumulativeUs, selfUs, name in sorted(imports, reverse=True)[
+        :NUM_SLOWEST_IMPORTS
+    ]:
+        print(f"{cumulativeUs / 1e6:15.3f} {selfUs / 1e6:10.3f}  {name}")
+    return proc.returncode
+
+
+if PROFILE_STARTUP_FLAG in sys.argv and __name__ == "__main__":
+    sys.exit(
+        profileStartup([arg for arg in sys.argv[1:] if arg != PROFILE_STARTUP_FLAG])
+    )
+
 buildPath()
 
 # pylint: disable=wrong-import-position ; avoid circular imports
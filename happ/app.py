@@ -13,7 +13,10 @@ class HallamApp(App):
         # you have activated this particular app.
         materials.setMaterialNamespaceOrder(["happ.materials", "armi.materials"])
 
-        # register our plugin with the plugin manager
+        # register our plugin with the plugin manager.
+        # The DRAGON plugin is needed for its settings, but its interface and the
+        # Hallam DRAGON writer/executer are only imported if the Hallam-DRAGON
+        # kernel is selected (see HallamPhysicsPlugin.exposeInterfaces).
         self._pm.register(HallamPhysicsPlugin)
         self._pm.register(DragonPlugin)
 
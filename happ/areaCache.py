@@ -0,0 +1,123 @@
+"""
+Dimension-keyed memoization of Hallam area calculations.
+
+ARMI asks for component and block areas on nearly every density, volume, and
+area-fraction query, but the answers only change when a dimension or a temperature
+changes. Each cached value is stored on the object it describes. Components whose
+areas are cached call :py:func:`invalidate` from ``setDimension`` and
+``setTemperature``, which drops their values and bumps a version number that cached
+values of other objects (e.g. a block's max area) can be keyed on.
+
+Dimensions linked to another component's dimension also change when that component
+is heated, which the component holding the link is not told about. Values are
+therefore also keyed on the temperatures and cold dimensions of linked components
+(see :py:func:`getLinkedState`), which costs nothing when nothing is linked.
+"""
+from armi import runLog
+
+_CACHE_ATTR = "_hallamAreaCache"
+_VERSION_ATTR = "_hallamAreaVersion"
+_LINKS_ATTR = "_hallamAreaLinks"
+
+
+class AreaCache:
+    """
+    Per-object memo of an area with hit/miss counters.
+
+    One instance exists per kind of calculation (see module-level caches below), but
+    the values themselves live on the objects, so they follow them through copies and
+    are garbage collected with them.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, obj, slot, key, compute):
+        """
+        Return the cached value for ``obj`` if it was computed from ``key``.
+
+        Parameters
+        ----------
+        obj : object
+            The object the value describes (e.g. a component or block).
+        slot : hashable
+            Distinguishes multiple values cached on one object (e.g. hot vs. cold).
+        key : tuple
+            State the value depends on. A mismatch triggers recomputation.
+        compute : callable
+            Zero-argument function that computes the value on a miss.
+        """
+        entries = obj.__dict__.setdefault(_CACHE_ATTR, {})
+        cached = entries.get(slot)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        value = compute()
+        entries[slot] = (key, value)
+        return value
+
+    def reset(self):
+        """Zero out the hit/miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hitRate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} {self.label}: {self.hits} hits, "
+            f"{self.misses} misses ({100 * self.hitRate:.1f}%)>"
+        )
+
+
+def clear(obj):
+    """Drop any cached values stored on ``obj``."""
+    obj.__dict__.pop(_CACHE_ATTR, None)
+    obj.__dict__.pop(_LINKS_ATTR, None)
+
+
+def invalidate(obj):
+    """Drop the cached values of ``obj`` and bump its version, after it changed."""
+    clear(obj)
+    obj.__dict__[_VERSION_ATTR] = getVersion(obj) + 1
+
+
+def getVersion(obj):
+    """Number of times ``obj`` was invalidated."""
+    return obj.__dict__.get(_VERSION_ATTR, 0)
+
+
+def getLinkedState(c, dimNames):
+    """
+    Get the temperatures and cold dimensions that ``c``'s linked dimensions come from.
+
+    Which dimensions are linked is only looked up once per invalidation, so this is
+    an empty tuple, found without any dimension lookups, for unlinked components.
+    """
+    linksByDims = c.__dict__.setdefault(_LINKS_ATTR, {})
+    links = linksByDims.get(dimNames)
+    if links is None:
+        links = tuple(c.p[name] for name in dimNames if c.dimensionIsLinked(name))
+        linksByDims[dimNames] = links
+    return tuple(
+        (linkedComp.temperatureInC, linkedComp.p[linkedName])
+        for linkedComp, linkedName in links
+    )
+
+
+SCALLOPED_HEX_AREAS = AreaCache("ScallopedHex.getComponentArea")
+MAX_AREAS = AreaCache("HallamBlock.getMaxArea")
+
+ALL_CACHES = (SCALLOPED_HEX_AREAS, MAX_AREAS)
+
+
+def report():
+    """Log hit/miss counters of all Hallam area caches."""
+    for cache in ALL_CACHES:
+        runLog.info(str(cache))
@@ -0,0 +1,334 @@
+"""
+Benchmarks of Hallam hot paths.
+
+These are meant to be run by hand or through the ``benchmark`` entry point to show
+whether a change (in Hallam or in ARMI) sped anything up or slowed it down. They are
+not part of a test suite.
+
+Results are written as JSON and can be compared against a stored baseline. Any case
+that got slower than the baseline by more than a threshold is reported as a
+regression.
+"""
+import json
+import os
+import platform
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from armi.reactor import blocks
+from armi.reactor import components
+from armi.reactor.converters import blockConverters
+from armi.reactor.flags import Flags
+from armi.utils import flags
+
+from happ import areaCache
+from happ import components as hallamComponents
+from happ import dragonRunner
+from happ import stageTimer
+from happ import unitCellConverter
+from happ import unitCells
+
+# Stand-in for DRAGON that echoes its input, so execution overhead can be measured
+STUB_DRAGON = """#!{python}
+import sys
+
+lines = sys.stdin.readlines()
+print("STUB DRAGON read", len(lines), "input lines")
+print(" K-INFINITY  =  1.000000E+00")
+"""
+
+
+def timeCall(func, repeat=100):
+    """Return the best wall time in seconds of ``repeat`` calls to ``func``."""
+    return timeCalls(func, repeat)["best"]
+
+
+def timeCalls(func, repeat=100):
+    """Time ``repeat`` calls to ``func`` and return best and mean wall times in s."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "mean": sum(times) / len(times), "repeat": repeat}
+
+
+def measurePeakMemory(func):
+    """Return the peak memory in bytes allocated by Python during a call to ``func``."""
+    tracemalloc.start()
+    try:
+        func()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def makeRingWithBlender(ringSpec):
+    """
+    Blend a ring the way the converter originally did, for comparison.
+
+    This builds a throwaway block of unshaped copies of the ring's components and
+    asks it for its volume and number densities.
+    """
+    blender = blocks.Block(name="blender")
+    flag = flags.Flag()
+    for c in ringSpec.components:
+        blender.add(components.UnshapedComponent.fromComponent(c))
+        flag |= c.p.flags
+
+    area = blender.getVolume() / ringSpec.heightCm * ringSpec.fraction
+
+    tempInC = sum(c.temperatureInC for c in ringSpec.components) / len(
+        ringSpec.components
+    )
+
+    outerDiamCm = blockConverters.getOuterDiamFromIDAndArea(ringSpec.innerDiamCm, area)
+    ring = components.Circle(
+        "convertedRing",
+        "Custom",
+        tempInC,
+        tempInC,
+        od=outerDiamCm,
+        id=ringSpec.innerDiamCm,
+        mult=1,
+    )
+    ring.p.flags = flag
+    nDensities = blender.getNumberDensities()
+    nDensities = {k: v * ringSpec.fraction for k, v in nDensities.items()}
+    ring.setNumberDensities(nDensities)
+    return ring
+
+
+def timeRingBlending(sourceBlock, repeat=100, makeRing=None):
+    """
+    Time blending the rings of a unit cell and measure its peak memory.
+
+    Parameters
+    ----------
+    sourceBlock : Block
+        Block whose unit cell rings are blended.
+    repeat : int
+        Number of timed calls.
+    makeRing : callable, optional
+        Blends one ring from its spec. Defaults to the converter's own blending;
+        pass :py:func:`makeRingWithBlender` to time the original one.
+
+    Returns
+    -------
+    dict
+        Best and mean times (s) and peak memory (bytes).
+    """
+    makeRing = makeRing or unitCellConverter._makeRing
+    conv = unitCellConverter.HallamUnitCellConverter(sourceBlock, quiet=True)
+    ringSpecs = conv.ringSpecs
+
+    def blend():
+        return [makeRing(spec) for spec in ringSpecs]
+
+    results = timeCalls(blend, repeat)
+    results["peakMemory"] = measurePeakMemory(blend)
+    return results
+
+
+def compareRingBlending(results):
+    """
+    Say how the ring blending compares to the original blender, if both were timed.
+
+    Returns
+    -------
+    str or None
+    """
+    new, old = results.get("ringBlending"), results.get("ringBlendingBlender")
+    if not new or not old:
+        return None
+    return (
+        f"Ring blending takes {new['best'] * 1e3:.4f} ms and peaks at "
+        f"{new['peakMemory'] / 1024:.1f} kB, against {old['best'] * 1e3:.4f} ms and "
+        f"{old['peakMemory'] / 1024:.1f} kB with the original blender "
+        f"({old['best'] / new['best']:.1f}x faster, "
+        f"{old['peakMemory'] / max(new['peakMemory'], 1):.1f}x less peak memory)"
+    )
+
+
+def timeReconversion(sourceBlock, repeat=100):
+    """
+    Time converting a unit cell again after a change in its fuel temperature.
+
+    One converter is kept for all calls, as a perturbation loop would, and the fuel
+    temperature alternates between two values so the fuel ring is always re-blended.
+    """
+    conv = unitCellConverter.HallamUnitCellConverter(sourceBlock, quiet=True)
+    conv.convert()
+    fuel = sourceBlock.getComponentByName("fuel")
+    temps = [fuel.temperatureInC + 1.0, fuel.temperatureInC]
+
+    def reconvert():
+        temps.reverse()
+        fuel.setTemperature(temps[0])
+        return conv.convert()
+
+    return timeCalls(reconvert, repeat)
+
+
+def writeStubDragon(directory):
+    """Write an executable that stands in for DRAGON and return its path."""
+    path = os.path.join(directory, "stubDragon.py")
+    with open(path, "w") as f:
+        f.write(STUB_DRAGON.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def runSuite(cs, repeat=20):
+    """
+    Time the Hallam hot paths using the blueprints named in the settings.
+
+    Parameters
+    ----------
+    cs : Settings
+        Case settings, e.g. from ``inputs/hallam_settings.yaml``.
+    repeat : int
+        Number of timed calls per case. Slow cases use fewer.
+
+    Returns
+    -------
+    dict
+        Maps case names to their timing results.
+    """
+    results = {}
+    bp = unitCells.loadBlueprints(cs)
+
+    def construct():
+        return unitCells.constructBlock(cs, bp, unitCells.BASIC_FUEL)
+
+    results["blockConstruction"] = timeCalls(construct, repeat)
+    b = construct()
+    modClad = b.getComponent(Flags.MODERATOR | Flags.CLAD, exact=True)
+    scallopedHexes = [c for c in b if isinstance(c, hallamComponents.ScallopedHex)]
+
+    # the memoized values are dropped before each call so the calculation is timed
+    results["scallopedHexArea"] = timeCalls(
+        lambda: _uncached(modClad, modClad.getComponentArea), repeat * 50
+    )
+    results["scallopedHexAreaBatch"] = timeCalls(
+        lambda: hallamComponents.getScallopedHexAreas(scallopedHexes), repeat * 50
+    )
+    results["maxArea"] = timeCalls(lambda: _uncached(b, b.getMaxArea), repeat * 50)
+    results["unitCellConvert"] = timeCalls(
+        lambda: unitCellConverter.HallamUnitCellConverter(b, quiet=True).convert(),
+        repeat,
+    )
+    results["unitCellReconvert"] = timeReconversion(b, repeat)
+    results["ringBlending"] = timeRingBlending(b, repeat)
+    results["ringBlendingBlender"] = timeRingBlending(b, repeat, makeRingWithBlender)
+
+    with tempfile.TemporaryDirectory() as workingDir:
+        results["dragonWriter"] = timeCalls(
+            lambda: _renderInput(cs, b, workingDir), repeat
+        )
+        stubDragon = writeStubDragon(workingDir)
+        case = dragonRunner.DragonCase(
+            label="benchmark",
+            workingDir=workingDir,
+            executablePath=stubDragon,
+            inputName=_renderInput(cs, b, workingDir),
+            outputName="benchmark.out",
+        )
+        results["stubDragonExecution"] = timeCalls(
+            lambda: dragonRunner.runCase(case), max(1, repeat // 4)
+        )
+
+    results["tablesEntryPoint"] = timeCalls(
+        lambda: _runTables(cs), max(1, repeat // 10)
+    )
+    return results
+
+
+def _uncached(obj, func):
+    """Call ``func`` after dropping the area values memoized on ``obj``."""
+    areaCache.clear(obj)
+    return func()
+
+
+def _renderInput(cs, b, workingDir):
+    """Render the Hallam DRAGON input for a block and return its file name."""
+    # pylint: disable=import-outside-toplevel ; DRAGON modules are optional
+    from terrapower.physics.neutronics.dragon import dragonExecutor
+    from terrapower.physics.neutronics.dragon.dragonFactory import dragonFactory
+    from happ import latticeInterface
+
+    # pylint: disable=protected-access
+    latticeInterface._registerHallamDragonSubclasses()
+    options = dragonExecutor.DragonOptions("benchmark")
+    options.fromUserSettings(cs)
+    options.fromBlock(b)
+    options.resolveDerivedOptions()
+    options.inputFile = os.path.join(workingDir, "benchmark.x2m")
+    converted = unitCellConverter.HallamUnitCellConverter(b, quiet=True).convert()
+    # keep the benchmark's renders out of the lattice pipeline timings
+    with stageTimer.TIMER.discarding():
+        dragonFactory.makeWriter(converted, options).write()
+    return os.path.basename(options.inputFile)
+
+
+def _runTables(cs):
+    """Run the ``tables`` entry point in a fresh interpreter, as a user would."""
+    subprocess.run(
+        [sys.executable, "-m", "happ", "tables", cs.path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(cs.path)),
+    )
+
+
+def writeResults(results, path):
+    """Save benchmark results, with enough metadata to tell runs apart."""
+    data = {
+        "metadata": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def readResults(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def findRegressions(results, baseline, threshold=0.2):
+    """
+    Compare results to a baseline.
+
+    Parameters
+    ----------
+    results, baseline : dict
+        Benchmark results as returned by :py:func:`runSuite`.
+    threshold : float
+        Fractional slowdown of the best time above which a case has regressed.
+
+    Returns
+    -------
+    list of tuple
+        ``(name, baselineTime, newTime, fractionalChange)`` for each regressed case.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        old = baseline[name]["best"]
+        new = result["best"]
+        change = (new - old) / old if old else 0.0
+        if change > threshold:
+            regressions.append((name, old, new, change))
+    return regressions
@@ -0,0 +1,359 @@
+"""
+Choose which blocks in the core need their own Hallam lattice calculation.
+
+Many blocks in the core are identical once they are converted to 1-D unit cells
+(e.g. the same design at the same state in several assemblies). Each converted block
+is fingerprinted by its ring geometry and rounded number densities, and only one
+representative per cross section ID and unique fingerprint is sent to DRAGON. The
+cross sections of a run are stored under the XS ID of its representative, so blocks
+with different XS IDs are never grouped together, even if they are identical. Groups
+that share an XS ID but not a fingerprint are each given an XS ID of their own (see
+:py:func:`splitXSIDs`), so no run overwrites the cross sections of another.
+
+Once burnup spreads the compositions, hardly any blocks are identical. The unique unit
+cells can then also be clustered: cells whose ring geometry, temperatures, and number
+densities are all within a relative tolerance of a cluster's representative share its
+results, as long as they have the same XS ID. The distance to the representative is
+kept for each block so the spread of each cluster can be reported.
+"""
+import collections
+import hashlib
+import string
+
+import numpy
+
+from armi import runLog
+from armi.reactor.flags import Flags
+
+from happ import unitCellConverter
+
+# Rounding applied before fingerprinting, so round-off noise does not defeat matching
+DIAMETER_DECIMALS = 6
+TEMPERATURE_DECIMALS = 3
+NDENS_SIG_FIGS = 6
+
+# Letters that XS types can be given when groups need XS IDs of their own
+XS_TYPES = string.ascii_uppercase
+
+
+def getCandidateBlocks(core):
+    """Get the fuel blocks in the core that can be converted to unit cells."""
+    return [b for b in core.getBlocks(Flags.FUEL) if unitCellConverter.canConvert(b)]
+
+
+def getFingerprint(convertedBlock):
+    """
+    Hash the ring geometry and composition of a converted unit cell block.
+
+    Parameters
+    ----------
+    convertedBlock : ThRZBlock
+        Output of :py:class:`~happ.unitCellConverter.HallamUnitCellConverter`.
+
+    Returns
+    -------
+    str
+        Hex digest that is equal for blocks that would produce the same DRAGON input.
+    """
+    rings = []
+    for ring in convertedBlock:
+        ndens = tuple(
+            (nucName, _roundSigFigs(nd, NDENS_SIG_FIGS))
+            for nucName, nd in sorted(ring.getNumberDensities().items())
+            if nd
+        )
+        rings.append(
+            (
+                round(ring.getDimension("id"), DIAMETER_DECIMALS),
+                round(ring.getDimension("od"), DIAMETER_DECIMALS),
+                round(ring.temperatureInC, TEMPERATURE_DECIMALS),
+                ndens,
+            )
+        )
+    return hashlib.sha1(repr(rings).encode()).hexdigest()
+
+
+def groupByFingerprint(blocks, convertedBlocks=None):
+    """
+    Group blocks with the same XS ID whose converted unit cells are identical.
+
+    Parameters
+    ----------
+    blocks : list of Block
+        Blocks to group.
+    convertedBlocks : list of ThRZBlock, optional
+        The blocks already converted to unit cells, if available.
+
+    Returns
+    -------
+    groups : OrderedDict
+        Maps each XS ID and fingerprint to the list of blocks that share them, in
+        the order they were first encountered. The first block of each group is its
+        representative.
+    """
+    if convertedBlocks is None:
+        convertedBlocks = unitCellConverter.convertBlocks(blocks)
+    groups = collections.OrderedDict()
+    for b, converted in zip(blocks, convertedBlocks):
+        key = (b.getMicroSuffix(), getFingerprint(converted))
+        groups.setdefault(key, []).append(b)
+    return groups
+
+
+def splitXSIDs(groups, usedXSTypes):
+    """
+    Give each group of blocks that shares an XS ID with an earlier group its own ID.
+
+    The first group of each XS ID keeps it. Each later one gets the same burnup
+    group with the first XS type letter that is neither used in the core nor already
+    given to another group with that burnup group. If the letters run out, the
+    remaining groups are merged into the first group of their XS ID, whose results
+    they then share, as they would without fingerprinting.
+
+    Parameters
+    ----------
+    groups : OrderedDict
+        Output of :py:func:`groupByFingerprint` or :py:func:`clusterGroups`, keyed
+        by XS ID and fingerprint.
+    usedXSTypes : set of str
+        XS types of all blocks in the core, which are not handed out.
+
+    Returns
+    -------
+    groups : OrderedDict
+        The groups keyed by their new XS IDs.
+    xsTypes : dict
+        Maps the name of each block whose XS type has to change to its new XS type.
+    """
+    newGroups = collections.OrderedDict()
+    firstKeys = {}
+    xsTypes = {}
+    assigned = set()
+    numMerged = 0
+    for (xsID, fingerprint), blocks in groups.items():
+        if xsID not in firstKeys:
+            firstKeys[xsID] = (xsID, fingerprint)
+            newGroups[(xsID, fingerprint)] = list(blocks)
+            continue
+        buGroup = xsID[1:]
+        free = [
+            xsType
+            for xsType in XS_TYPES
+            if xsType not in usedXSTypes and xsType + buGroup not in assigned
+        ]
+        if not free:
+            newGroups[firstKeys[xsID]].extend(blocks)
+            numMerged += len(blocks)
+            continue
+        newID = free[0] + buGroup
+        assigned.add(newID)
+        newGroups[(newID, fingerprint)] = list(blocks)
+        xsTypes.update((b.getName(), free[0]) for b in blocks)
+    if numMerged:
+        runLog.warning(
+            f"Ran out of XS types for unique unit cells; {numMerged} blocks share the "
+            f"lattice results of the first unit cell of their XS ID instead"
+        )
+    return newGroups, xsTypes
+
+
+def getClusterFeatures(convertedBlocks):
+    """
+    Gather the ring data that clustering compares, over a shared nuclide index.
+
+    Returns
+    -------
+    ndens : numpy.ndarray
+        Number densities, indexed by block, ring, and nuclide.
+    outerDiams : numpy.ndarray
+        Ring outer diameters in cm, indexed by block and ring.
+    tempsK : numpy.ndarray
+        Ring temperatures in K, indexed by block and ring.
+    """
+    ringDensities = [
+        [ring.getNumberDensities() for ring in converted]
+        for converted in convertedBlocks
+    ]
+    nucIndex = {}
+    for blockDensities in ringDensities:
+        for densities in blockDensities:
+            for nucName in densities:
+                nucIndex.setdefault(nucName, len(nucIndex))
+
+    # every convertible block has the same rings (see RING_LAYOUT)
+    numRings = len(unitCellConverter.RING_LAYOUT)
+    ndens = numpy.zeros((len(convertedBlocks), numRings, len(nucIndex)))
+    for i, blockDensities in enumerate(ringDensities):
+        for j, densities in enumerate(blockDensities):
+            for nucName, nd in densities.items():
+                ndens[i, j, nucIndex[nucName]] = nd
+
+    outerDiams = numpy.array(
+        [[ring.getDimension("od") for ring in conv] for conv in convertedBlocks]
+    )
+    tempsK = numpy.array(
+        [[ring.temperatureInK for ring in converted] for converted in convertedBlocks]
+    )
+    return ndens, outerDiams, tempsK
+
+
+def getClusterDistances(features, i, leaders):
+    """
+    Relative distance from unit cell ``i`` to each of several others.
+
+    The distance is the largest, over all rings, of the relative differences in
+    outer diameter, absolute temperature, and the number density of each nuclide.
+    Number densities are compared nuclide by nuclide, relative to the larger of the
+    two, so a nuclide that is only in one of the cells is 1 apart whatever its
+    density. Since a macroscopic cross section is a sum of number densities times
+    positive microscopic cross sections, it cannot change by more than the number
+    density distance for the same microscopic cross sections. How the microscopic
+    cross sections change with temperature and self-shielding is not bounded.
+    """
+    ndens, outerDiams, tempsK = features
+    leaders = numpy.asarray(leaders, dtype=int)
+    refDens = ndens[leaders]
+    densDiff = numpy.abs(ndens[i] - refDens)
+    densScale = numpy.maximum(ndens[i], refDens)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        densDist = numpy.where(densDiff > 0, densDiff / densScale, 0.0).max(axis=-1)
+    diamDist = numpy.abs(outerDiams[i] - outerDiams[leaders]) / outerDiams[leaders]
+    tempDist = numpy.abs(tempsK[i] - tempsK[leaders]) / tempsK[leaders]
+    return numpy.maximum.reduce([densDist, diamDist, tempDist]).max(axis=-1)
+
+
+def clusterGroups(groups, convertedByName, tolerance):
+    """
+    Merge groups of identical unit cells whose representatives are close together.
+
+    Groups are visited in order. Each joins the nearest existing cluster of the same
+    XS ID whose representative is within ``tolerance``, or else starts a new cluster
+    with its own representative.
+
+    Parameters
+    ----------
+    groups : OrderedDict
+        Output of :py:func:`groupByFingerprint`.
+    convertedByName : dict
+        Maps block names to their converted unit cells.
+    tolerance : float
+        Largest relative distance (see :py:func:`getClusterDistances`) at which a
+        unit cell is represented by another.
+
+    Returns
+    -------
+    clusters : OrderedDict
+        Like ``groups``, with fewer (larger) groups.
+    distances : dict
+        Maps each block name to its distance from its cluster's representative.
+    """
+    reps = [blocks[0] for blocks in groups.values()]
+    features = getClusterFeatures([convertedByName[b.getName()] for b in reps])
+    leaders = []
+    members = {}
+    distances = {}
+    xsIDs = [xsID for xsID, _fingerprint in groups]
+    for i, blocks in enumerate(groups.values()):
+        distance = numpy.inf
+        candidates = [leader for leader in leaders if xsIDs[leader] == xsIDs[i]]
+        if candidates:
+            candidateDistances = getClusterDistances(features, i, candidates)
+            nearest = candidates[int(candidateDistances.argmin())]
+            distance = candidateDistances.min()
+        if distance <= tolerance:
+            members[nearest].extend(blocks)
+        else:
+            leaders.append(i)
+            members[i] = list(blocks)
+            distance = 0.0
+        distances.update((b.getName(), float(distance)) for b in blocks)
+
+    keys = list(groups)
+    clusters = collections.OrderedDict((keys[i], members[i]) for i in leaders)
+    return clusters, distances
+
+
+class BlockSelection:
+    """
+    Representative blocks chosen for lattice physics and the blocks they stand for.
+    """
+
+    def __init__(self, groups, distances=None, xsTypes=None):
+        self.distances = distances or {}
+        # new XS types of the blocks that need one (see splitXSIDs)
+        self.xsTypes = xsTypes or {}
+        self.representatives = [blocks[0] for blocks in groups.values()]
+        self._blocksByRep = {
+            blocks[0].getName(): list(blocks) for blocks in groups.values()
+        }
+        self._repByBlock = {
+            b.getName(): blocks[0] for blocks in groups.values() for b in blocks
+        }
+
+    @classmethod
+    def fromBlocks(cls, blocks, tolerance=0.0, usedXSTypes=None):
+        """
+        Select representatives of identical unit cells, then cluster them if asked.
+
+        With a ``tolerance`` of 0, only identical unit cells share results. Groups
+        that share an XS ID are then given XS IDs of their own, avoiding the XS
+        types in ``usedXSTypes`` (by default, those of ``blocks``). The new types
+        are in :py:attr:`xsTypes`; it is up to the caller to give them to the blocks.
+        """
+        if usedXSTypes is None:
+            usedXSTypes = {b.getMicroSuffix()[0] for b in blocks}
+        convertedBlocks = unitCellConverter.convertBlocks(blocks)
+        groups = groupByFingerprint(blocks, convertedBlocks)
+        distances = None
+        if tolerance and len(groups) > 1:
+            convertedByName = {
+                b.getName(): converted for b, converted in zip(blocks, convertedBlocks)
+            }
+            groups, distances = clusterGroups(groups, convertedByName, tolerance)
+        groups, xsTypes = splitXSIDs(groups, usedXSTypes)
+        return cls(groups, distances, xsTypes)
+
+    @property
+    def numCandidates(self):
+        return len(self._repByBlock)
+
+    def getRepresentative(self, b):
+        """Return the block whose lattice results apply to ``b``."""
+        return self._repByBlock[b.getName()]
+
+    def getDistance(self, b):
+        """
+        Distance of ``b`` from the representative whose results it uses.
+
+        See :py:func:`getClusterDistances`. This is 0 unless unit cells were
+        clustered.
+        """
+        return self.distances.get(b.getName(), 0.0)
+
+    def getRepresentedBlocks(self, rep):
+        """Return all blocks (including ``rep``) that share the results of ``rep``."""
+        return self._blocksByRep[rep.getName()]
+
+    def logSummary(self):
+        numRuns = len(self.representatives)
+        runLog.info(
+            f"Selected {numRuns} unique unit cells out of {self.numCandidates} "
+            f"candidate blocks, saving {self.numCandidates - numRuns} DRAGON runs. "
+            f"{len(self.xsTypes)} blocks were given new XS types so each unit cell "
+            f"has its own XS ID."
+        )
+        if self.distances:
+            distances = numpy.array(list(self.distances.values()))
+            runLog.info(
+                f"Composition distance of clustered unit cells from their "
+                f"representatives (largest relative difference in ring diameter, "
+                f"temperature, or nuclide density): mean {distances.mean():.3%}, "
+                f"max {distances.max():.3%} ({numpy.count_nonzero(distances)} blocks "
+                f"use a non-identical cell). This is not a cross section error "
+                f"estimate: changes in microscopic cross sections with temperature "
+                f"and self-shielding are not included."
+            )
+
+
+def _roundSigFigs(value, sigFigs):
+    return float(f"{value:.{sigFigs - 1}e}")
@@ -12,6 +12,9 @@ from armi.reactor import blocks
 from armi.reactor.flags import Flags
 from armi.utils import hexagon
 
+from happ import areaCache
+from happ import components
+
 
 class HallamBlock(blocks.HexBlock):
     """
@@ -24,8 +27,48 @@ class HallamBlock(blocks.HexBlock):
     """
 
     def getMaxArea(self):
+        """
+        Compute the max area from the moderator clad and gap.
+
+        The value is memoized in :py:data:`happ.areaCache.MAX_AREAS`. It is keyed on
+        the version of the moderator clad, which is bumped whenever its dimensions or
+        temperature change, and on the temperature and width of the gap.
+        """
+        modClad, gap = self._getMaxAreaComponents()
+        key = (
+            id(modClad),
+            id(gap),
+            areaCache.getVersion(modClad),
+            gap.temperatureInC,
+            gap.p.widthOuter,
+        )
+        key += areaCache.getLinkedState(modClad, components.AREA_DIMENSIONS)
+        key += areaCache.getLinkedState(gap, ("widthOuter",))
+        return areaCache.MAX_AREAS.get(
+            self, "maxArea", key, lambda: self._computeMaxArea(modClad, gap)
+        )
+
+    def _getMaxAreaComponents(self):
+        """
+        Look up the moderator clad and gap, reusing the last lookup if still valid.
+
+        Flag-based lookups walk all children, so the result is kept until the
+        children of this block change.
+        """
+        cached = getattr(self, "_maxAreaComponents", None)
+        if (
+            cached is not None
+            and cached[0] == len(self)
+            and all(c.parent is self for c in cached[1:])
+        ):
+            return cached[1:]
         modClad = self.getComponent(Flags.MODERATOR | Flags.CLAD, exact=True)
         gap = self.getComponent(Flags.MODERATOR | Flags.COOLANT | Flags.GAP, exact=True)
+        self._maxAreaComponents = (len(self), modClad, gap)
+        return modClad, gap
+
+    @staticmethod
+    def _computeMaxArea(modClad, gap):
         modPitch = modClad.getPitchData() + gap.getDimension("widthOuter")
         mult = modClad.getDimension("mult")
         if mult >= 1:
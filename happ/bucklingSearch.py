@@ -0,0 +1,84 @@
+"""
+Search for the critical buckling of a Hallam unit cell.
+
+Each DRAGON evaluation runs the B1 leakage model at a fixed buckling and returns
+k-eff. :py:func:`findCriticalBuckling` iterates on the buckling with the secant method
+until k-eff is 1 within a tolerance. Once the root is bracketed, it switches to
+regula falsi (Illinois variant), so it cannot diverge.
+
+The buckling does not change the resonance state of the cell, so every evaluation
+after the first can reuse the first one's self-shielded library (see
+:py:mod:`happ.shielding`).
+"""
+import dataclasses
+
+# Rough migration area (cm^2) of the graphite-moderated Hallam lattice, used only to
+# make the second guess from k-inf
+MIGRATION_AREA_CM2 = 400.0
+
+
+@dataclasses.dataclass
+class BucklingSearchResult:
+    """Outcome of a critical buckling search."""
+
+    buckling: float
+    keff: float
+    numRuns: int
+    converged: bool
+
+
+def findCriticalBuckling(runKeff, tolerance=1e-5, maxRuns=12, initialBuckling=0.0):
+    """
+    Find the buckling (1/cm^2) at which k-eff is 1.
+
+    Parameters
+    ----------
+    runKeff : callable
+        Takes a buckling and returns k-eff, e.g. by running DRAGON.
+    tolerance : float
+        Largest acceptable absolute difference of k-eff from 1.
+    maxRuns : int
+        Most evaluations of ``runKeff`` before giving up.
+    initialBuckling : float
+        First buckling to try. 0 gives k-inf.
+
+    Returns
+    -------
+    BucklingSearchResult
+        The last buckling tried, its k-eff, and how many evaluations were made.
+    """
+    b0 = initialBuckling
+    f0 = _residual(runKeff, b0)
+    numRuns = 1
+    if abs(f0) <= tolerance:
+        return BucklingSearchResult(b0, f0 + 1.0, numRuns, True)
+
+    # one-group estimate: k = k-inf / (1 + M^2 B^2)
+    b1 = b0 + f0 / (MIGRATION_AREA_CM2 * (f0 + 1.0))
+    f1 = _residual(runKeff, b1)
+    numRuns += 1
+    bracketed = f0 * f1 < 0
+    while abs(f1) > tolerance and numRuns < maxRuns:
+        if f1 == f0:
+            break
+        b2 = b1 - f1 * (b1 - b0) / (f1 - f0)
+        f2 = _residual(runKeff, b2)
+        numRuns += 1
+        if f2 * f1 < 0:
+            b0, f0 = b1, f1
+            bracketed = True
+        elif bracketed:
+            # keep the old end of the bracket but halve its weight (Illinois)
+            f0 /= 2.0
+        else:
+            b0, f0 = b1, f1
+        b1, f1 = b2, f2
+
+    return BucklingSearchResult(b1, f1 + 1.0, numRuns, abs(f1) <= tolerance)
+
+
+def _residual(runKeff, buckling):
+    keff = runKeff(buckling)
+    if keff is None:
+        raise RuntimeError(f"No k-eff at buckling {buckling:.6e} 1/cm^2")
+    return keff - 1.0
@@ -0,0 +1,75 @@
+"""Entry point that runs the Hallam benchmark suite and checks for regressions."""
+import tabulate
+
+from armi import runLog
+from armi.cli.entryPoint import EntryPoint
+
+
+class HallamBenchmarks(EntryPoint):
+    """Time Hallam hot paths and compare them against a stored baseline."""
+
+    name = "benchmark"
+    settingsArgument = "required"
+
+    def addOptions(self):
+        self.parser.add_argument(
+            "--output",
+            default="hallam-benchmarks.json",
+            help="Where to write the benchmark results (JSON).",
+        )
+        self.parser.add_argument(
+            "--baseline",
+            default=None,
+            help="Previous results (JSON) to check for regressions against.",
+        )
+        self.parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Fractional slowdown of a case that counts as a regression.",
+        )
+        self.parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of timed calls for each case.",
+        )
+
+    def invoke(self):
+        # pylint: disable=import-outside-toplevel ; only needed when benchmarking
+        from happ import benchmarks
+
+        results = benchmarks.runSuite(self.cs, repeat=self.args.repeat)
+        benchmarks.writeResults(results, self.args.output)
+
+        baseline = (
+            benchmarks.readResults(self.args.baseline) if self.args.baseline else {}
+        )
+        table = [
+            (
+                name,
+                f"{result['best'] * 1e3:.4f}",
+                f"{baseline[name]['best'] * 1e3:.4f}" if name in baseline else "",
+                f"{result['peakMemory'] / 1024:.1f}" if "peakMemory" in result else "",
+            )
+            for name, result in sorted(results.items())
+        ]
+        print(
+            tabulate.tabulate(
+                table, headers=["Case", "Best (ms)", "Baseline (ms)", "Peak (kB)"]
+            )
+        )
+        comparison = benchmarks.compareRingBlending(results)
+        if comparison:
+            print(comparison)
+        print(f"Wrote results to {self.args.output}")
+
+        regressions = benchmarks.findRegressions(
+            results, baseline, self.args.threshold
+        )
+        for name, old, new, change in regressions:
+            runLog.error(
+                f"{name} regressed by {100 * change:.1f}%: "
+                f"{old * 1e3:.4f} ms -> {new * 1e3:.4f} ms"
+            )
+        return 1 if regressions else 0
@@ -0,0 +1,241 @@
+"""
+Entry point that generates lattice cross sections for block designs and state points.
+
+This runs DRAGON on unit cells built straight from blueprints, without building a
+reactor or running an ARMI case. Each case gets its own directory under the output
+directory, and a manifest records which cases finished and which files they made.
+Rerunning the command after an interruption (or after adding designs or state points)
+only runs the cases that are missing, failed, or whose DRAGON input has changed.
+"""
+import json
+import os
+import re
+import time
+
+import tabulate
+
+from armi import runLog
+from armi.cli.entryPoint import EntryPoint
+
+from happ import unitCells
+from happ.plugin import CONF_HALLAM_DRAGON_WORKERS
+from happ.plugin import CONF_HALLAM_DRAGON_ASYNC
+from happ.plugin import CONF_HALLAM_DRAGON_TIMEOUT
+
+MANIFEST = "manifest.json"
+
+# Files in a case directory that make up its cross sections
+XS_FILE_PATTERN = re.compile(r"^ISOTXS")
+
+
+class MakeXSEntryPoint(EntryPoint):
+    """Generate cross sections for a list of block designs and state points."""
+
+    name = "makeXS"
+    settingsArgument = "required"
+
+    def addOptions(self):
+        self.parser.add_argument(
+            "--designs",
+            nargs="+",
+            default=[unitCells.BASIC_FUEL],
+            help="Block designs to generate cross sections for.",
+        )
+        self.parser.add_argument(
+            "--fuel-temps",
+            type=float,
+            nargs="+",
+            help="Fuel pin temperatures in C.",
+        )
+        self.parser.add_argument(
+            "--sodium-factors",
+            type=float,
+            nargs="+",
+            help="Sodium density multipliers.",
+        )
+        self.parser.add_argument(
+            "--enrichments",
+            type=float,
+            nargs="+",
+            help="U-235 mass fractions of uranium.",
+        )
+        self.parser.add_argument(
+            "--output-dir",
+            default="hallam-xs",
+            help="Where to write the cases and the manifest.",
+        )
+        self.parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of DRAGON processes to run at once. Defaults to the setting.",
+        )
+        self.parser.add_argument(
+            "--force",
+            action="store_true",
+            default=False,
+            help="Rerun every case, even those with valid outputs.",
+        )
+
+    def invoke(self):
+        # pylint: disable=import-outside-toplevel ; only needed when running
+        from happ import perturbations
+
+        grid = perturbations.makeGrid(
+            self.args.fuel_temps, self.args.sodium_factors, self.args.enrichments
+        )
+        manifest = makeXS(
+            self.cs,
+            self.args.designs,
+            grid,
+            self.args.output_dir,
+            numWorkers=self.args.workers or self.cs[CONF_HALLAM_DRAGON_WORKERS],
+            force=self.args.force,
+        )
+        table = [
+            (entry["design"], entry["state"], entry["status"], entry.get("kinf"))
+            for entry in manifest["cases"].values()
+        ]
+        print(tabulate.tabulate(table, headers=["Design", "State", "Status", "k-inf"]))
+        print(f"Wrote manifest to {os.path.join(self.args.output_dir, MANIFEST)}")
+        ok = all(entry["status"] == "ok" for entry in manifest["cases"].values())
+        return 0 if ok else 1
+
+
+def makeXS(cs, designNames, statePoints, outputDir, numWorkers=1, force=False):
+    """
+    Run DRAGON for every combination of block design and state point.
+
+    Cases are written and run in batches, and the manifest is saved after each
+    batch, so an interruption loses at most one batch of work.
+
+    Returns
+    -------
+    dict
+        The manifest. ``cases`` maps case labels to their design, state point,
+        status, input key, k-inf, and output files.
+    """
+    # pylint: disable=import-outside-toplevel ; DRAGON modules are optional
+    from happ import dragonCache
+    from happ import dragonRunner
+    from happ import latticeInterface
+    from happ import perturbations
+    from happ import stageTimer
+    from happ import unitCellConverter
+
+    # records from an earlier run in this process would otherwise pile up
+    stageTimer.TIMER.reset()
+    os.makedirs(outputDir, exist_ok=True)
+    manifest = readManifest(outputDir)
+    bp = unitCells.loadBlueprints(cs)
+    cache = dragonCache.fromSettings(cs)
+
+    pending = []
+    for designName in designNames:
+        nominal = unitCells.constructBlock(cs, bp, designName)
+        converter = unitCellConverter.HallamUnitCellConverter(nominal, quiet=True)
+        for state in statePoints:
+            label = f"{_slugify(designName)}-{state.label}"
+            case = latticeInterface.prepareStandaloneCase(
+                cs,
+                perturbations.applyStatePoint(nominal, state),
+                os.path.join(outputDir, label),
+                label,
+                converter=converter,
+            )
+            key = dragonRunner.getCaseKey(case)
+            entry = manifest["cases"].get(label)
+            if not force and isValid(entry, key, outputDir):
+                continue
+            manifest["cases"][label] = {
+                "design": designName,
+                "state": state.label,
+                "key": key,
+                "status": "pending",
+            }
+            pending.append(case)
+
+    numCases = len(designNames) * len(statePoints)
+    runLog.info(
+        f"{numCases - len(pending)} of {numCases} cases already have valid outputs "
+        f"in {outputDir}; running {len(pending)}"
+    )
+    writeManifest(outputDir, manifest)
+
+    batchSize = 4 * max(1, numWorkers)
+    for start in range(0, len(pending), batchSize):
+        batch = pending[start : start + batchSize]
+        results = dragonRunner.runCases(
+            batch,
+            numWorkers,
+            cache=cache,
+            timeoutSec=cs[CONF_HALLAM_DRAGON_TIMEOUT] or None,
+            useAsync=cs[CONF_HALLAM_DRAGON_ASYNC],
+        )
+        for case, result in zip(batch, results):
+            _recordResult(manifest["cases"][case.label], result, outputDir)
+        writeManifest(outputDir, manifest)
+
+    return manifest
+
+
+def _recordResult(entry, result, outputDir):
+    """Update a manifest entry with the outcome of running its case."""
+    # pylint: disable=import-outside-toplevel ; DRAGON modules are optional
+    from happ import dragonRunner
+
+    xsNames = sorted(
+        name for name in os.listdir(result.workingDir) if XS_FILE_PATTERN.match(name)
+    )
+    failure = result.failure
+    if result.ok and not xsNames:
+        failure = f"no ISOTXS written in {result.workingDir}"
+    elif not result.ok and failure is None:
+        failure = f"exited with code {result.returnCode}"
+
+    entry["status"] = "failed" if failure else "ok"
+    entry["failure"] = failure
+    entry["kinf"] = None if failure else dragonRunner.readKinf(result.outputPath)
+    entry["files"] = {}
+    for name in [result.outputName] + xsNames:
+        path = os.path.join(result.workingDir, name)
+        if os.path.exists(path):
+            entry["files"][os.path.relpath(path, outputDir)] = os.path.getsize(path)
+    entry["finished"] = time.time()
+
+
+def isValid(entry, key, outputDir):
+    """
+    Check whether a case's recorded outputs can be reused.
+
+    The case must have finished successfully from the same DRAGON input, and all of
+    its output files must still be there with the sizes they had when it finished.
+    """
+    if not entry or entry.get("status") != "ok" or entry.get("key") != key:
+        return False
+    for relPath, size in entry.get("files", {}).items():
+        path = os.path.join(outputDir, relPath)
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            return False
+    return True
+
+
+def readManifest(outputDir):
+    """Read the manifest in an output directory, or start an empty one."""
+    path = os.path.join(outputDir, MANIFEST)
+    if not os.path.exists(path):
+        return {"cases": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def writeManifest(outputDir, manifest):
+    """Write the manifest so that an interruption never leaves it half written."""
+    path = os.path.join(outputDir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _slugify(name):
+    return re.sub(r"[^\w-]+", "-", name)
@@ -1,11 +1,14 @@
+import time
+
 import tabulate
 
 from armi.cli.entryPoint import EntryPoint
 from armi.reactor.flags import Flags
-from armi import materials
-from armi.nucDirectory import nuclideBases as nb
 
-from happ import unitCellConverter
+from happ import unitCells
+
+# Elements in Aronchick Table 3
+TABLE_3_ELEMENTS = ("ZR", "C", "MO", "FE", "NI", "CR", "NA", "SN")
 
 
 class HallamTables(EntryPoint):
@@ -14,27 +17,70 @@ class HallamTables(EntryPoint):
     name = "tables"
     settingsArgument = "required"
 
-    def invoke(self):
-        from armi import cases
+    def addOptions(self):
+        self.parser.add_argument(
+            "--full-reactor",
+            action="store_true",
+            default=False,
+            help=(
+                "Build the full reactor and take the 5/1 cell from the core instead "
+                "of constructing the unit cells from blueprints only."
+            ),
+        )
+        self.parser.add_argument(
+            "--core-elements",
+            action="store_true",
+            default=False,
+            help=(
+                "Also summarize element number densities over every block in the "
+                "core, or over every block design without --full-reactor. This is "
+                "always done with --full-reactor."
+            ),
+        )
+        self.parser.add_argument(
+            "--export",
+            default=None,
+            help=(
+                "Write area fractions and densities of all materials in all blocks "
+                "to this .npz file."
+            ),
+        )
 
-        case = cases.Case(cs=self.cs)
-        self.o = case.initializeOperator()
+    def invoke(self):
+        start = time.perf_counter()
+        self.bFiveOne, self.basicFuel = self._getUnitCells()
+        setupTime = time.perf_counter() - start
 
         self._compareVolumeFractions()
         self._compareNumberDensities()
         self._makeFuelCellTable4()
+        if self.args.core_elements or self.args.full_reactor:
+            self._makeCoreElementTable()
+        if self.args.export:
+            exportMaterialTable(
+                buildMaterialTable(self._getSummaryBlocks()), self.args.export
+            )
+            print(f"Wrote material table to {self.args.export}")
+
+        # pylint: disable=import-outside-toplevel ; only needed for the report
+        import psutil
 
-        self.o = None
+        sinceStartup = time.time() - psutil.Process().create_time()
+        print(
+            f"\nBuilt unit cells in {setupTime:.2f} s; "
+            f"{sinceStartup:.2f} s from process startup to output"
+        )
 
     def _compareVolumeFractions(self):
         """Make table(s) to comparing our unit cell vol fracs to Aronchick's Table 2"""
-        bFiveOne, basicFuel = self._getUnitCells()
+        bFiveOne, basicFuel = self.bFiveOne, self.basicFuel
         aronchickBasicFracs = (0.044491, 0.007841, 0.11066, 0.01209, 0.82200, 0.002910)
         aronchickFiveOneFracs = (0.037076, 0.007183, 0.10492, 0.01167, 0.82200, 0.01715)
 
         matNames = ("UMo", "SS304", "Sodium", "Zircaloy2", "Graphite", "Void")
         header = ["Material", "Aronchick", "ARMI", "diff (%)"]
-        fracs = getAreaFracsByMaterial(basicFuel, matNames)
+        basicFuelIndex = getMaterialIndex(basicFuel)
+        fracs = getAreaFracsByMaterial(basicFuel, matNames, basicFuelIndex)
         print("Unit Cell Comparison for Basic Fuel Cell")
         table = []
         for mat, ref in zip(matNames, aronchickBasicFracs):
@@ -50,18 +96,23 @@ class HallamTables(EntryPoint):
         print(tabulate.tabulate(table, headers=header))
         print(bFiveOne.getMaxArea())
 
-        print(getMatDensities(basicFuel, matNames))
+        print(getMatDensities(basicFuel, matNames, basicFuelIndex))
 
     def _makeFuelCellTable4(self):
         """Make Table 4 showing the basic fuel cell regions"""
-        _bFiveOne, basicFuel = self._getUnitCells()
+        # pylint: disable=import-outside-toplevel ; only needed for this table
+        from happ import unitCellConverter
+
+        basicFuel = self.basicFuel
         conv = unitCellConverter.HallamUnitCellConverter(basicFuel)
         bs2 = conv.convert()
         print("Basic fuel Cell Materials (c.f. Table 4)")
         table = []
         for ri, ring in enumerate(bs2):
-            mats = getAllMaterials(ring)
-            fracs = [getAreaFracsByMaterial(ring, mats)[mat] for mat in mats]
+            index = getMaterialIndex(ring)
+            mats = getAllMaterials(ring, index)
+            fracsByMat = getAreaFracsByMaterial(ring, mats, index)
+            fracs = [fracsByMat[mat] for mat in mats]
             row = [
                 ri + 1,
                 f"{ring.getArea()/(2.54**2):5.3f}",
@@ -82,51 +133,105 @@ class HallamTables(EntryPoint):
         print(tabulate.tabulate(table, headers=header))
 
     def _compareNumberDensities(self):
-        bFiveOne, basicFuel = self._getUnitCells()
-        self._makeNumberDensityTable(bFiveOne)
-        self._makeNumberDensityTable(basicFuel)
+        """
+        Make a table of number densities by element for the unit cells.
+
+        C.f. Aronchick Table 3
+        """
+        # pylint: disable=import-outside-toplevel ; only needed for the element tables
+        from happ import elementIndex
+
+        cells = [self.bFiveOne, self.basicFuel]
+        index = elementIndex.ElementIndex.fromBlocks(TABLE_3_ELEMENTS, cells)
+        densities = index.getElementDensities(cells)
+        table = [
+            (name, *[f"{nd:10.5e}" for nd in row])
+            for name, row in zip(index.rowLabels, densities)
+            if row.any()
+        ]
+        print(tabulate.tabulate(table, headers=["Element", "5/1 Cell", "Basic Fuel"]))
+
+    def _makeCoreElementTable(self):
+        """Summarize element number densities over all blocks in one pass."""
+        # pylint: disable=import-outside-toplevel ; only needed for the element tables
+        from happ import elementIndex
+
+        blocks = self._getSummaryBlocks()
+        index = elementIndex.ElementIndex.fromBlocks(TABLE_3_ELEMENTS, blocks)
+        densities = index.getElementDensities(blocks)
+        print(f"\nElement number densities over {len(blocks)} blocks")
+        table = [
+            (name, row.min(), row.mean(), row.max())
+            for name, row in zip(index.rowLabels, densities)
+            if row.any()
+        ]
+        print(
+            tabulate.tabulate(
+                table, headers=["Element", "Min", "Mean", "Max"], floatfmt="10.5e"
+            )
+        )
 
     def _getUnitCells(self):
-        core = self.o.r.core
-        bFiveOne = core.getFirstBlock(Flags.FUEL | Flags.INNER)
-        basicFuelDesign = self.o.r.blueprints.blockDesigns["basic fuel"]
-        basicFuel = basicFuelDesign.construct(
-            self.o.cs, self.o.r.blueprints, 0, 1, 10, "A", {}
+        """
+        Build the 5/1 and basic fuel cells once for all tables.
+
+        By default only the blueprints are loaded, and the 5/1 cell is the first
+        inner fuel block of an inner fuel assembly built from its design. With
+        ``--full-reactor``, the operator and reactor are built and the 5/1 cell is
+        taken from the core. The basic fuel cell is built from its block design at
+        :py:data:`~happ.unitCells.BASIC_FUEL_HEIGHT` either way.
+        """
+        if not self.args.full_reactor:
+            self.bp = unitCells.loadBlueprints(self.cs)
+            self.coreBlocks = None
+            return unitCells.constructUnitCells(self.cs, self.bp)
+
+        from armi import cases
+
+        case = cases.Case(cs=self.cs)
+        o = case.initializeOperator()
+        self.coreBlocks = o.r.core.getBlocks()
+        bFiveOne = o.r.core.getFirstBlock(Flags.FUEL | Flags.INNER)
+        basicFuel = unitCells.constructBlock(
+            o.cs, o.r.blueprints, unitCells.BASIC_FUEL, unitCells.BASIC_FUEL_HEIGHT
         )
         return bFiveOne, basicFuel
 
-    def _makeNumberDensityTable(self, b):
+    def _getSummaryBlocks(self):
         """
-        Make a table of number densities by element. 
+        Get the blocks summarized in the whole-core tables.
 
-        C.f. Aronchick Table 3
+        These are the blocks in the core with ``--full-reactor``. Otherwise every
+        block design is constructed, only when one of these tables is asked for.
         """
-        elements = ("ZR", "C", "MO", "FE", "NI", "CR", "NA", "SN")
-        ndens = b.getNumberDensities()
-        totals = {}
-        for el in elements:
-            totalNumDens = 0.0
-            eb = nb.byName[el]
-            for nucBase in eb.getNaturalIsotopics():
-                totalNumDens += ndens.pop(nucBase.name, 0.0)
-            totals[el] = totalNumDens
-
-        # grab the leftovers:
-        for nucName, nd in sorted(ndens.items()):
-            totals[nucName] = nd
-
-        for name, ndens in totals.items():
-            if not ndens:
-                continue
-            print(f"{name:6s} {ndens:10.5e}")
-
-
-def getAreaFracsByMaterial(b, matNames):
+        if self.coreBlocks is None:
+            self.coreBlocks = [
+                unitCells.constructBlock(self.cs, self.bp, design.name)
+                for design in self.bp.blockDesigns
+            ]
+        return self.coreBlocks
+
+
+def getMaterialIndex(obj):
+    """
+    Map material names to the components made of them, in one traversal.
+
+    The index can be passed to the other functions here so that a block is not
+    traversed again for every material.
+    """
+    index = {}
+    for child in obj.getChildren(deep=True):
+        if hasattr(child, "material"):
+            index.setdefault(child.material.name, []).append(child)
+    return index
+
+
+def getAreaFracsByMaterial(b, matNames, index=None):
+    index = index if index is not None else getMaterialIndex(b)
     areas = {}
     total = 0.0
     for matName in matNames:
-        comps = b.getComponentsOfMaterial(materialName=matName)
-        area = sum([c.getArea() for c in comps])
+        area = sum([c.getArea() for c in index.get(matName, [])])
         areas[matName] = area
         total += area
 
@@ -136,16 +241,23 @@ def getAreaFracsByMaterial(b, matNames):
     return areas
 
 
-def getMatDensities(b, matNames):
-    """Get mass densities of a list of material names"""
+def getMatDensities(b, matNames, index=None):
+    """
+    Get mass densities of a list of material names
+
+    Materials that are not in the block get None.
+    """
+    index = index if index is not None else getMaterialIndex(b)
     densities = {}
     for matName in matNames:
-        comps = b.getComponentsOfMaterial(materialName=matName)
-        densities[matName] = comps[0].material.density3(Tc=comps[0].p.temperatureInC)
+        comps = index.get(matName)
+        densities[matName] = (
+            comps[0].material.density3(Tc=comps[0].p.temperatureInC) if comps else None
+        )
     return densities
 
 
-def getAllMaterials(obj):
+def getAllMaterials(obj, index=None):
     """
     Get set of all material names in composite
 
@@ -153,8 +265,52 @@ def getAllMaterials(obj):
     -----
     Uses names instead of objects to keep them unique.
     """
-    mats = set()
-    for child in obj.getChildren(deep=True):
-        if hasattr(child, "material"):
-            mats.add(child.material.name)
-    return mats
+    index = index if index is not None else getMaterialIndex(obj)
+    return set(index)
+
+
+def buildMaterialTable(blocks):
+    """
+    Compute area fractions and densities of every material in every block.
+
+    Each block is traversed once. The result is columnar: one row per block and one
+    column per material (the union over all blocks).
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        ``blockNames``, ``materialNames``, ``areaFractions`` (block x material),
+        and ``densities`` (block x material, g/cc, NaN where a material is absent).
+    """
+    # pylint: disable=import-outside-toplevel ; only needed with --export
+    import numpy
+
+    indices = [getMaterialIndex(b) for b in blocks]
+    matNames = sorted(set().union(*indices))
+    areaFracs = numpy.zeros((len(blocks), len(matNames)))
+    densities = numpy.full((len(blocks), len(matNames)), numpy.nan)
+    for i, (b, index) in enumerate(zip(blocks, indices)):
+        fracs = getAreaFracsByMaterial(b, matNames, index)
+        dens = getMatDensities(b, matNames, index)
+        for j, matName in enumerate(matNames):
+            areaFracs[i, j] = fracs[matName]
+            if dens[matName] is not None:
+                densities[i, j] = dens[matName]
+    return {
+        "blockNames": numpy.array([b.getName() for b in blocks]),
+        "materialNames": numpy.array(matNames),
+        "areaFractions": areaFracs,
+        "densities": densities,
+    }
+
+
+def exportMaterialTable(table, path):
+    """
+    Write a material table to a compressed NumPy ``.npz`` file.
+
+    It can be read back with ``numpy.load(path)`` without ARMI or a reactor.
+    """
+    # pylint: disable=import-outside-toplevel ; only needed with --export
+    import numpy
+
+    numpy.savez_compressed(path, **table)
@@ -0,0 +1,172 @@
+"""Entry point that sweeps Hallam unit cell state points for power coefficients."""
+import contextlib
+import csv
+import os
+
+import tabulate
+
+from armi import runLog
+from armi.cli.entryPoint import EntryPoint
+
+from happ import unitCells
+from happ.plugin import CONF_HALLAM_DRAGON_WORKERS
+from happ.plugin import CONF_HALLAM_DRAGON_ASYNC
+from happ.plugin import CONF_HALLAM_DRAGON_TIMEOUT
+
+
+class HallamSweep(EntryPoint):
+    """
+    Run lattice cases over a grid of fuel temperatures, sodium densities, enrichments.
+
+    The unit cell is built from blueprints once, and each state point is applied to a
+    copy of it. State points that render identical DRAGON inputs are only run once.
+    k-inf, reactivity relative to the reference (first) state point, and reactivity
+    coefficients for state points that change a single parameter are tabulated.
+    """
+
+    name = "sweep"
+    settingsArgument = "required"
+
+    def addOptions(self):
+        self.parser.add_argument(
+            "--design",
+            default=unitCells.BASIC_FUEL,
+            help="Block design to sweep.",
+        )
+        self.parser.add_argument(
+            "--fuel-temps",
+            type=float,
+            nargs="+",
+            help="Fuel pin temperatures in C. The first is the reference.",
+        )
+        self.parser.add_argument(
+            "--sodium-factors",
+            type=float,
+            nargs="+",
+            help="Sodium density multipliers. The first is the reference.",
+        )
+        self.parser.add_argument(
+            "--enrichments",
+            type=float,
+            nargs="+",
+            help="U-235 mass fractions of uranium. The first is the reference.",
+        )
+        self.parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of DRAGON processes to run at once. Defaults to the setting.",
+        )
+        self.parser.add_argument(
+            "--output", default=None, help="Also write the table to this CSV file."
+        )
+
+    def invoke(self):
+        # pylint: disable=import-outside-toplevel ; only needed when sweeping
+        from happ import perturbations
+
+        grid = perturbations.makeGrid(
+            self.args.fuel_temps, self.args.sodium_factors, self.args.enrichments
+        )
+        bp = unitCells.loadBlueprints(self.cs)
+        nominal = unitCells.constructBlock(self.cs, bp, self.args.design)
+        kinfs = runStatePoints(
+            self.cs,
+            nominal,
+            grid,
+            numWorkers=self.args.workers or self.cs[CONF_HALLAM_DRAGON_WORKERS],
+        )
+        table = makeCoefficientTable(grid, kinfs)
+        header = ["State", "k-inf", "rho (pcm)", "d rho (pcm)", "Coefficient"]
+        print(tabulate.tabulate(table, headers=header))
+        if self.args.output:
+            with open(self.args.output, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(table)
+
+
+def runStatePoints(cs, nominal, statePoints, numWorkers=1, runRoot=None):
+    """
+    Run DRAGON for each state point applied to a nominal block.
+
+    The cases are run under ``runRoot`` if given. Otherwise they are run in a
+    directory made by :py:func:`happ.latticeInterface.makeRunDir`, which is removed
+    afterwards unless the settings ask to keep DRAGON working directories.
+
+    Returns
+    -------
+    list of float
+        k-inf for each state point (None where DRAGON failed).
+    """
+    # pylint: disable=import-outside-toplevel ; DRAGON modules are optional
+    from happ import dragonCache
+    from happ import dragonRunner
+    from happ import latticeInterface
+    from happ import perturbations
+    from happ import stageTimer
+    from happ import unitCellConverter
+
+    # records from an earlier sweep in this process would otherwise pile up
+    stageTimer.TIMER.reset()
+    with contextlib.ExitStack() as stack:
+        if runRoot is None:
+            # removed once the outputs are read, unless DRAGON directories are kept
+            runRoot = stack.enter_context(
+                latticeInterface.makeRunDir(cs, "hallam-sweep-")
+            )
+        # one converter for all state points, so each only re-blends rings it changed
+        converter = unitCellConverter.HallamUnitCellConverter(nominal, quiet=True)
+        cases = [
+            latticeInterface.prepareStandaloneCase(
+                cs,
+                perturbations.applyStatePoint(nominal, state),
+                os.path.join(runRoot, f"{i:04d}-{state.label}"),
+                f"sweep-{state.label}",
+                converter=converter,
+            )
+            for i, state in enumerate(statePoints)
+        ]
+        results = dragonRunner.runCases(
+            cases,
+            numWorkers,
+            cache=dragonCache.fromSettings(cs),
+            timeoutSec=cs[CONF_HALLAM_DRAGON_TIMEOUT] or None,
+            useAsync=cs[CONF_HALLAM_DRAGON_ASYNC],
+        )
+        numUnique = sum(1 for result in results if result.duplicateOf is None)
+        runLog.info(
+            f"Swept {len(cases)} state points with {numUnique} unique DRAGON inputs "
+            f"in {runRoot}"
+        )
+        return [
+            dragonRunner.readKinf(result.outputPath) if result.ok else None
+            for result in results
+        ]
+
+
+def makeCoefficientTable(statePoints, kinfs):
+    """
+    Tabulate k-inf, reactivity, and reactivity coefficients of a sweep.
+
+    Coefficients (pcm per unit of the changed parameter) are only given for state
+    points that differ from the reference (first) state point in one parameter.
+    """
+    # pylint: disable=import-outside-toplevel ; only needed when sweeping
+    from happ import perturbations
+
+    reference, kRef = statePoints[0], kinfs[0]
+    table = []
+    for state, k in zip(statePoints, kinfs):
+        if k is None or kRef is None:
+            table.append((state.label, k, None, None, None))
+            continue
+        rho = perturbations.reactivity(k)
+        dRho = rho - perturbations.reactivity(kRef)
+        coefficient = None
+        changed = state.changedParameters(reference)
+        if len(changed) == 1:
+            delta = getattr(state, changed[0]) - getattr(reference, changed[0])
+            coefficient = f"{1e5 * dRho / delta:.4g} pcm per unit {changed[0]}"
+        table.append((state.label, k, 1e5 * rho, 1e5 * dRho, coefficient))
+    return table
@@ -4,15 +4,21 @@ Hallam-specific components.
 
 import math
 
+import numpy
+
 from armi.reactor import parameters
 from armi.reactor.components import basicShapes
 from armi.reactor.components import ShapedComponent
 
+from happ import areaCache
+
 SCALLOP_RADIUS = "sradius"
 SCALLOP_OFFSET = "offset"
 
 ONE_THIRD = 2.0 * math.pi / 3.0
 
+AREA_DIMENSIONS = ("op", "ip", SCALLOP_RADIUS, SCALLOP_OFFSET, "mult")
+
 
 def getScallopedHexParamDefs():
     """
@@ -83,6 +89,14 @@ class ScallopedHex(basicShapes.Hexagon):
             modArea=modArea,
         )
 
+    def setDimension(self, key, val, *args, **kwargs):
+        ShapedComponent.setDimension(self, key, val, *args, **kwargs)
+        areaCache.invalidate(self)
+
+    def setTemperature(self, temperatureInC):
+        ShapedComponent.setTemperature(self, temperatureInC)
+        areaCache.invalidate(self)
+
     def getComponentArea(self, cold=False):
         """
         The scallop radius represents a subtraction of 6 thirds of circles.
@@ -102,40 +116,100 @@ class ScallopedHex(basicShapes.Hexagon):
             hex, you get area fractions that match Aronchick to 0.6% or less. If
             you include them you are off on SS304 by 20%. I believe Aronchick
             was wrong in this case. We can do sensitivity studies later.
+
+        Results are memoized in :py:data:`happ.areaCache.SCALLOPED_HEX_AREAS` until
+        a dimension or temperature of this component (or of a component one of its
+        dimensions is linked to) changes. Use :py:func:`getScallopedHexAreas` to
+        evaluate many components at once.
         """
-        area = basicShapes.Hexagon.getComponentArea(self, cold=cold)
-        ip = self.getDimension("ip", cold=cold)
-        mult = self.getDimension("mult")
-        radius = self.getDimension(SCALLOP_RADIUS, cold=cold)
-        offset = self.getDimension(SCALLOP_OFFSET, cold=cold)
-        scallopArea = _computeScallopArea(radius, offset)
-
-        area -= scallopArea * mult
-
-        if ip:
-            # recompute scallops different offset for "annular" scalloped hexes
-            # inner hexagon itself is already subtracted off by the parent class
-            op = self.getDimension("op", cold=cold)
-            thickness = (op - ip) / 2.0
-            # compute the scallops of the smaller inner hexagon
-            # radius += thickness
-            # offset += thickness
-            scallopArea = _computeScallopArea(radius, offset)
-            # addition here because overall formula is (hex1-scallop1) - (hex2-scallop2)
-            # or equivalently (hex1 - hex2) - scallop1 + scallop2
-            area += scallopArea * mult
-
-        return area
-
-
-def _computeScallopArea(radius, offset):
+        return areaCache.SCALLOPED_HEX_AREAS.get(
+            self,
+            cold,
+            areaCache.getLinkedState(self, AREA_DIMENSIONS),
+            lambda: self._computeComponentArea(cold),
+        )
+
+    def _computeComponentArea(self, cold):
+        """Evaluate the area with the batch kernel, as a batch of one."""
+        return float(getScallopedHexAreas([self], cold=cold)[0])
+
+
+def getScallopedHexAreas(comps, cold=False, Tc=None):
+    """
+    Compute the areas of many scalloped hexes in one vectorized pass.
+
+    Dimensions are gathered from each component at its own temperature state
+    (hot unless ``cold`` is set, or at ``Tc`` if given) and then handed to
+    :py:func:`computeScallopedHexAreas`. :py:meth:`ScallopedHex.getComponentArea`
+    goes through here as well, one component at a time.
+
+    Parameters
+    ----------
+    comps : list of ScallopedHex
+        Components to evaluate.
+    cold : bool, optional
+        Use cold (input) dimensions rather than thermally-expanded ones.
+    Tc : float, optional
+        Temperature in C to evaluate the dimensions of all components at, e.g. to
+        see the areas of a block at another temperature without changing it.
+
+    Returns
+    -------
+    areas : numpy.ndarray
+        Area of each component in cm^2, in the same order as ``comps``.
+    """
+    dims = numpy.array(
+        [
+            (
+                c.getDimension("op", Tc=Tc, cold=cold),
+                c.getDimension("ip", Tc=Tc, cold=cold) or 0.0,
+                c.getDimension(SCALLOP_RADIUS, Tc=Tc, cold=cold),
+                c.getDimension(SCALLOP_OFFSET, Tc=Tc, cold=cold),
+                c.getDimension("mult"),
+            )
+            for c in comps
+        ],
+        dtype=float,
+    ).reshape(-1, 5)
+    return computeScallopedHexAreas(*dims.T)
+
+
+def computeScallopedHexAreas(op, ip, sradius, offset, mult):
+    """
+    Compute scalloped hex areas from arrays of dimensions in cm.
+
+    Everything, including the arctangent, is evaluated with NumPy array operations.
+    Dimensions must already be at the temperature of interest.
+    """
+    op = numpy.asarray(op, dtype=float)
+    ip = numpy.asarray(ip, dtype=float)
+    mult = numpy.asarray(mult, dtype=float)
+    # as in basicShapes.Hexagon.getComponentArea
+    area = math.sqrt(3.0) / 2.0 * (numpy.square(op) - numpy.square(ip))
+    area *= mult
+    scallopArea = _computeScallopAreas(
+        numpy.asarray(sradius, dtype=float), numpy.asarray(offset, dtype=float)
+    )
+
+    area -= scallopArea * mult
+
+    # add the scallops back for "annular" scalloped hexes (where ip is defined);
+    # the inner hexagon itself is already subtracted off above, and the overall
+    # formula is (hex1 - scallop1) - (hex2 - scallop2)
+    annular = ip != 0.0
+    area[annular] += scallopArea[annular] * mult[annular]
+
+    return area
+
+
+def _computeScallopAreas(radius, offset):
     """
-    Compute how much area should be subtracted given a radius and offset in cm.
+    Compute how much area should be subtracted given radii and offsets in cm.
 
-    You really need to draw the triangles here to see what's going on. 
+    You really need to draw the triangles here to see what's going on.
     """
-    circleArea = math.pi * radius ** 2
-    angleInRadians = math.atan(offset / radius)
+    circleArea = math.pi * numpy.square(radius)
+    angleInRadians = numpy.arctan(offset / radius)
     # what fraction of 6/3 (2) circles is subtracted off?
     circleFraction = 2.0 * (ONE_THIRD - angleInRadians) / ONE_THIRD
     return circleFraction * circleArea
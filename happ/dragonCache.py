@@ -0,0 +1,179 @@
+"""
+Content-addressed on-disk cache of DRAGON results.
+
+A rendered DRAGON input fully determines the output for a given nuclear data library
+and executable, so the cache key is a hash of those three things. Hits copy the stored
+ISOTXS and log files into the case's working directory and skip execution entirely.
+
+Each entry is a directory named by its key, holding the output files and a small
+manifest. The manifest's modification time records when the entry was last used, and
+the least recently used entries are evicted once the cache grows beyond its size limit.
+The entries are only scanned when the cache is opened; after that, an in-memory index
+of their sizes and last use keeps track of the total size.
+
+The cache is off by default (see the ``hallamDragonCache`` setting). When it is turned
+on without a directory, it is kept in ``~/.happ/dragonCache`` so that it can be shared
+between cases.
+"""
+import fnmatch
+import json
+import os
+import shutil
+import time
+
+from armi import runLog
+
+from happ import dragonRunner
+from happ import shielding
+from happ.plugin import CONF_HALLAM_DRAGON_CACHE
+from happ.plugin import CONF_HALLAM_DRAGON_CACHE_DIR
+from happ.plugin import CONF_HALLAM_DRAGON_CACHE_SIZE
+
+MANIFEST = "manifest.json"
+
+# Files in the working directory that are saved along with the output log.
+OUTPUT_PATTERNS = ("ISOTXS*", shielding.SHIELDED_LIBRARY)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".happ", "dragonCache")
+
+
+class DragonResultCache:
+    """
+    On-disk, size-limited LRU cache of DRAGON outputs.
+
+    Parameters
+    ----------
+    root : str
+        Directory holding the cache entries. Created if needed.
+    maxSizeMB : float
+        Total size above which the least recently used entries are evicted.
+    """
+
+    def __init__(self, root, maxSizeMB):
+        self.root = root
+        self.maxSizeBytes = maxSizeMB * 1024 ** 2
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+        # last use and size of each entry, by entry directory
+        self._index = {}
+        self._totalBytes = 0
+        for manifestPath in self._manifests():
+            with open(manifestPath) as f:
+                size = json.load(f)["sizeBytes"]
+            self._addToIndex(
+                os.path.dirname(manifestPath), os.path.getmtime(manifestPath), size
+            )
+
+    @staticmethod
+    def makeKey(case):
+        """Key a case on its rendered input, nuclear data, and executable."""
+        return dragonRunner.getCaseKey(case)
+
+    def _entryDir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def fetch(self, case):
+        """
+        Copy cached outputs for a case into its working directory.
+
+        Returns
+        -------
+        bool
+            True on a hit. On a miss nothing is copied.
+        """
+        entry = self._entryDir(self.makeKey(case))
+        manifestPath = os.path.join(entry, MANIFEST)
+        if not os.path.exists(manifestPath):
+            self.misses += 1
+            return False
+        with open(manifestPath) as f:
+            manifest = json.load(f)
+        for fileName in manifest["files"]:
+            shutil.copy(os.path.join(entry, fileName), case.workingDir)
+        # cached log is stored under its own name; give it the name this case expects
+        if manifest["outputName"] != case.outputName:
+            shutil.copy(
+                os.path.join(entry, manifest["outputName"]),
+                os.path.join(case.workingDir, case.outputName),
+            )
+        os.utime(manifestPath)
+        if entry in self._index:
+            self._index[entry] = (time.time(), self._index[entry][1])
+        self.hits += 1
+        return True
+
+    def store(self, case):
+        """Save the outputs of a successfully run case, then enforce the size limit."""
+        entry = self._entryDir(self.makeKey(case))
+        if os.path.exists(os.path.join(entry, MANIFEST)):
+            return
+        os.makedirs(entry, exist_ok=True)
+        fileNames = [case.outputName] + [
+            name
+            for name in sorted(os.listdir(case.workingDir))
+            if any(fnmatch.fnmatch(name, pattern) for pattern in OUTPUT_PATTERNS)
+        ]
+        size = 0
+        for fileName in fileNames:
+            shutil.copy(os.path.join(case.workingDir, fileName), entry)
+            size += os.path.getsize(os.path.join(entry, fileName))
+        # write the manifest last so partially written entries are never hits
+        with open(os.path.join(entry, MANIFEST), "w") as f:
+            json.dump(
+                {
+                    "label": case.label,
+                    "outputName": case.outputName,
+                    "files": fileNames,
+                    "sizeBytes": size,
+                    "created": time.time(),
+                },
+                f,
+            )
+        self._addToIndex(entry, time.time(), size)
+        if self._totalBytes > self.maxSizeBytes:
+            self.evict()
+
+    def _addToIndex(self, entry, lastUsed, size):
+        if entry in self._index:
+            self._totalBytes -= self._index[entry][1]
+        self._index[entry] = (lastUsed, size)
+        self._totalBytes += size
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its size limit."""
+        byLastUse = sorted(self._index.items(), key=lambda item: item[1][0])
+        for entry, (_lastUsed, size) in byLastUse:
+            if self._totalBytes <= self.maxSizeBytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            del self._index[entry]
+            self._totalBytes -= size
+            runLog.debug(f"Evicted DRAGON cache entry {entry}")
+
+    def _manifests(self):
+        for prefix in os.listdir(self.root):
+            prefixDir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefixDir):
+                continue
+            for key in os.listdir(prefixDir):
+                manifestPath = os.path.join(prefixDir, key, MANIFEST)
+                if os.path.exists(manifestPath):
+                    yield manifestPath
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} {self.root}: {len(self._index)} entries, "
+            f"{self._totalBytes / 1024 ** 2:.1f} MB, {self.hits} hits, "
+            f"{self.misses} misses>"
+        )
+
+
+def fromSettings(cs):
+    """Make the result cache described by the settings, or None if it is disabled."""
+    if not cs[CONF_HALLAM_DRAGON_CACHE]:
+        return None
+    return DragonResultCache(
+        cs[CONF_HALLAM_DRAGON_CACHE_DIR] or DEFAULT_CACHE_DIR,
+        cs[CONF_HALLAM_DRAGON_CACHE_SIZE],
+    )
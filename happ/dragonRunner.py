@@ -0,0 +1,469 @@
+"""
+Run DRAGON cases in isolated working directories, optionally in parallel.
+
+Writing inputs and reading outputs need the ARMI data model, so those stay in the main
+process. Only the DRAGON executable runs in the workers, which keeps what crosses the
+process boundary down to a few paths. Any executable that reads an input on stdin can
+stand in for DRAGON, which is handy for testing on machines without it.
+
+Cases with byte-for-byte identical inputs are only run once, and the outputs of that
+run are copied into the working directories of the others. When a
+:py:class:`~happ.dragonCache.DragonResultCache` is given, cases whose rendered inputs
+have been run before are filled from the cache instead of being run.
+
+Cases can also be run as asyncio subprocesses of the calling process (see
+:py:func:`runCasesAsync`). Their output is then followed line by line as it is
+written, so a case that hits a fatal error is killed right away rather than when it
+eventually exits, and a case that hangs is killed when it runs past its timeout.
+"""
+import asyncio
+import concurrent.futures
+import dataclasses
+import functools
+import hashlib
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+
+KINF_PATTERN = re.compile(r"K-(?:INFINITY|EFFECTIVE)\s*=?\s*([-+0-9.EeDd]+)")
+# DRAGON echoes each statement before running it, e.g. ``LIBRARY := SHI: LIBRARY ...``
+MODULE_PATTERN = re.compile(r":=\s*([A-Z][A-Z0-9]*):|^\s*(END):")
+# Messages after which DRAGON will not produce anything useful
+FATAL_PATTERN = re.compile(r"XABORT|Segmentation fault")
+
+
+@dataclasses.dataclass
+class DragonCase:
+    """Everything a worker needs to run one DRAGON case."""
+
+    label: str
+    workingDir: str
+    executablePath: str
+    inputName: str
+    outputName: str
+    nuclearDataPath: str = None
+
+
+@dataclasses.dataclass
+class DragonResult:
+    """Outcome of running one DRAGON case."""
+
+    label: str
+    workingDir: str
+    outputName: str
+    returnCode: int
+    wallTimeSec: float = 0.0
+    fromCache: bool = False
+    failure: str = None
+    lastModule: str = None
+    # label of the earlier case with the same input whose outputs were copied
+    duplicateOf: str = None
+    # peak resident set of the DRAGON process, where the platform reports it
+    peakMemoryMB: float = None
+
+    @property
+    def outputPath(self):
+        return os.path.join(self.workingDir, self.outputName)
+
+    @property
+    def ok(self):
+        """True if DRAGON exited cleanly without printing a fatal error."""
+        return self.returnCode == 0 and self.failure is None
+
+    def check(self):
+        """Raise :py:class:`DragonCaseError` if the case did not finish cleanly."""
+        if not self.ok:
+            reason = self.failure or f"exited with code {self.returnCode}"
+            raise DragonCaseError(
+                f"DRAGON case {self.label} failed in {self.lastModule}: {reason}. "
+                f"See {self.outputPath}"
+            )
+
+
+class DragonCaseError(RuntimeError):
+    """A DRAGON case failed, so it has no results to read."""
+
+
+class DragonLogMonitor:
+    """
+    Follow DRAGON output line by line.
+
+    Keeps track of the last module DRAGON started, which tells how far a case got,
+    and of the first fatal error message.
+    """
+
+    def __init__(self):
+        self.lastModule = None
+        self.fatal = None
+
+    def feed(self, line):
+        """
+        Take one line of output.
+
+        Returns
+        -------
+        bool
+            True if the line is a fatal error, after which the case can be killed.
+        """
+        if self.fatal is None and FATAL_PATTERN.search(line):
+            self.fatal = line.strip()
+            return True
+        match = MODULE_PATTERN.search(line)
+        if match:
+            self.lastModule = match.group(1) or match.group(2)
+        return False
+
+
+def runCase(case: DragonCase, timeoutSec=None) -> DragonResult:
+    """
+    Run DRAGON on one case, feeding the input on stdin and capturing stdout.
+
+    The process is killed if it is still running after ``timeoutSec`` seconds. The
+    output is checked for fatal errors once the process has exited.
+    """
+    start = time.perf_counter()
+    inputPath = os.path.join(case.workingDir, case.inputName)
+    outputPath = os.path.join(case.workingDir, case.outputName)
+    failure = None
+    with open(inputPath) as inp, open(outputPath, "w") as out:
+        proc = subprocess.Popen(
+            [case.executablePath],
+            stdin=inp,
+            stdout=out,
+            stderr=subprocess.STDOUT,
+            cwd=case.workingDir,
+            start_new_session=True,
+        )
+        try:
+            peakMemoryMB = _waitWithUsage(proc, timeoutSec)
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            peakMemoryMB = _waitWithUsage(proc)
+            failure = f"timed out after {timeoutSec:g} s"
+
+    monitor = DragonLogMonitor()
+    with open(outputPath, errors="replace") as output:
+        for line in output:
+            monitor.feed(line)
+    return DragonResult(
+        case.label,
+        case.workingDir,
+        case.outputName,
+        proc.returncode,
+        time.perf_counter() - start,
+        failure=failure or monitor.fatal,
+        lastModule=monitor.lastModule,
+        peakMemoryMB=peakMemoryMB,
+    )
+
+
+def _waitWithUsage(proc, timeoutSec=None):
+    """
+    Wait for a process to exit and return its peak resident set in MB.
+
+    The process is reaped with ``os.wait4``, which reports the resource usage of
+    that process alone. Where that is not available, this is a plain wait and the
+    peak is None.
+
+    Raises
+    ------
+    subprocess.TimeoutExpired
+        If the process is still running after ``timeoutSec`` seconds.
+    """
+    if not hasattr(os, "wait4"):
+        proc.wait(timeout=timeoutSec)
+        return None
+    deadline = None if timeoutSec is None else time.monotonic() + timeoutSec
+    delay = 0.001
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # kilobytes on Linux, bytes on macOS
+            scale = 1024 ** 2 if sys.platform == "darwin" else 1024
+            return usage.ru_maxrss / scale
+        if deadline is not None and time.monotonic() >= deadline:
+            raise subprocess.TimeoutExpired(proc.args, timeoutSec)
+        time.sleep(delay)
+        delay = min(2 * delay, 0.1)
+
+
+async def runCaseAsync(case: DragonCase, timeoutSec=None, onProgress=None):
+    """
+    Run DRAGON on one case as an asyncio subprocess, following its output.
+
+    Output is copied to the case's output file as it arrives. The process is killed
+    as soon as it prints a fatal error or runs past ``timeoutSec`` seconds. The
+    event loop reaps the process itself, so its peak memory is not reported.
+
+    Parameters
+    ----------
+    case : DragonCase
+        Case to run.
+    timeoutSec : float, optional
+        Wall-clock limit for the case. None means no limit.
+    onProgress : callable, optional
+        Called with the case label and module name each time DRAGON starts a module.
+    """
+    start = time.perf_counter()
+    inputPath = os.path.join(case.workingDir, case.inputName)
+    outputPath = os.path.join(case.workingDir, case.outputName)
+    monitor = DragonLogMonitor()
+    failure = None
+    with open(inputPath, "rb") as inp, open(outputPath, "w") as out:
+        proc = await asyncio.create_subprocess_exec(
+            case.executablePath,
+            stdin=inp,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=case.workingDir,
+            start_new_session=True,
+        )
+        try:
+            await asyncio.wait_for(
+                _followOutput(proc, out, monitor, case.label, onProgress), timeoutSec
+            )
+        except asyncio.TimeoutError:
+            failure = f"timed out after {timeoutSec:g} s"
+        if proc.returncode is None and (failure or monitor.fatal):
+            _kill(proc)
+        returnCode = await proc.wait()
+
+    return DragonResult(
+        case.label,
+        case.workingDir,
+        case.outputName,
+        returnCode,
+        time.perf_counter() - start,
+        failure=failure or monitor.fatal,
+        lastModule=monitor.lastModule,
+    )
+
+
+def _kill(proc):
+    """
+    Kill a case along with anything it started.
+
+    Cases run in their own session, so on POSIX the whole process group is killed
+    and no orphan is left holding the output pipe open.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass  # it exited on its own in the meantime
+
+
+async def _followOutput(proc, out, monitor, label, onProgress):
+    """Copy output to a file until the process closes it or prints a fatal error."""
+    while True:
+        line = await proc.stdout.readline()
+        if not line:
+            return
+        text = line.decode(errors="replace")
+        out.write(text)
+        lastModule = monitor.lastModule
+        if monitor.feed(text):
+            return
+        if onProgress is not None and monitor.lastModule != lastModule:
+            onProgress(label, monitor.lastModule)
+
+
+def runCasesAsync(cases, maxConcurrent=1, timeoutSec=None, onProgress=None):
+    """
+    Run DRAGON cases as concurrent asyncio subprocesses of this process.
+
+    No thread or worker process is used per case: one event loop follows the output
+    of every running case.
+
+    Parameters
+    ----------
+    cases : list of DragonCase
+        Cases to run. Each must have its own working directory.
+    maxConcurrent : int
+        Maximum number of DRAGON processes running at once.
+    timeoutSec : float, optional
+        Wall-clock limit for each case. None means no limit.
+    onProgress : callable, optional
+        See :py:func:`runCaseAsync`.
+
+    Returns
+    -------
+    list of DragonResult
+        One per case, in the same order as ``cases``.
+    """
+
+    async def runAll():
+        semaphore = asyncio.Semaphore(max(1, maxConcurrent))
+
+        async def runBounded(case):
+            async with semaphore:
+                return await runCaseAsync(case, timeoutSec, onProgress)
+
+        return await asyncio.gather(*(runBounded(case) for case in cases))
+
+    return list(asyncio.run(runAll()))
+
+
+def runCases(
+    cases, numWorkers=1, cache=None, timeoutSec=None, useAsync=False, onProgress=None
+):
+    """
+    Run many DRAGON cases on a bounded pool of local worker processes.
+
+    Parameters
+    ----------
+    cases : list of DragonCase
+        Cases to run. Each must have its own working directory.
+    numWorkers : int
+        Maximum number of DRAGON processes running at once. 1 runs serially.
+    cache : DragonResultCache, optional
+        Fill cases from this cache when possible and store newly run ones in it.
+    timeoutSec : float, optional
+        Wall-clock limit for each case, after which it is killed. None means no limit.
+    useAsync : bool
+        Run the cases as asyncio subprocesses of this process instead of on a pool
+        of worker processes (see :py:func:`runCasesAsync`).
+    onProgress : callable, optional
+        Called with the case label and module name as DRAGON starts each module.
+        Only used with ``useAsync``.
+
+    Returns
+    -------
+    list of DragonResult
+        One per case, in the same order as ``cases`` regardless of completion order.
+        Cases with the same input as an earlier case get a copy of its result and
+        its output files, under their own label and working directory.
+    """
+    keys = [getCaseKey(case) for case in cases]
+    firstByKey = {}
+    for i, key in enumerate(keys):
+        firstByKey.setdefault(key, i)
+    uniqueIndices = sorted(firstByKey.values())
+
+    results = {}
+    toRun = []
+    for i in uniqueIndices:
+        case = cases[i]
+        if cache is not None and cache.fetch(case):
+            results[i] = DragonResult(
+                case.label, case.workingDir, case.outputName, 0, fromCache=True
+            )
+        else:
+            toRun.append(i)
+
+    toRunCases = [cases[i] for i in toRun]
+    if useAsync:
+        newResults = runCasesAsync(toRunCases, numWorkers, timeoutSec, onProgress)
+    else:
+        newResults = _runUncached(toRunCases, numWorkers, timeoutSec)
+    for i, result in zip(toRun, newResults):
+        results[i] = result
+        if cache is not None and result.ok:
+            cache.store(cases[i])
+
+    for i, (key, case) in enumerate(zip(keys, cases)):
+        if i not in results:
+            results[i] = _copyResult(results[firstByKey[key]], case)
+    return [results[i] for i in range(len(cases))]
+
+
+def _copyResult(result, case):
+    """Give a case the outputs and result of an earlier case with the same input."""
+    existing = set(os.listdir(case.workingDir))
+    for name in os.listdir(result.workingDir):
+        source = os.path.join(result.workingDir, name)
+        if name not in existing and os.path.isfile(source):
+            shutil.copy(source, case.workingDir)
+    if case.outputName != result.outputName and os.path.exists(result.outputPath):
+        shutil.copy(result.outputPath, os.path.join(case.workingDir, case.outputName))
+    return dataclasses.replace(
+        result,
+        label=case.label,
+        workingDir=case.workingDir,
+        outputName=case.outputName,
+        wallTimeSec=0.0,
+        duplicateOf=result.label,
+        peakMemoryMB=None,
+    )
+
+
+def getCaseKey(case):
+    """
+    Hash the rendered input, nuclear data library, and executable of a case.
+
+    The library and executable are identified by path, size, and modification time
+    so rebuilding either changes the key.
+    """
+    digest = hashlib.sha256()
+    with open(os.path.join(case.workingDir, case.inputName), "rb") as inp:
+        digest.update(inp.read())
+    for path in (case.nuclearDataPath, case.executablePath):
+        digest.update(repr(getFileIdentity(path)).encode())
+    return digest.hexdigest()
+
+
+def _runUncached(cases, numWorkers, timeoutSec=None):
+    if numWorkers <= 1 or len(cases) <= 1:
+        return [runCase(case, timeoutSec) for case in cases]
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(numWorkers, len(cases))
+    ) as pool:
+        return list(pool.map(functools.partial(runCase, timeoutSec=timeoutSec), cases))
+
+
+def stageFile(source, workingDir, destName=None):
+    """
+    Make a file available in a working directory without copying if possible.
+
+    Nuclear data libraries are large, so a symlink is tried first.
+    """
+    dest = os.path.join(workingDir, destName or os.path.basename(source))
+    if os.path.exists(dest):
+        return dest
+    try:
+        os.symlink(os.path.abspath(source), dest)
+    except (OSError, NotImplementedError):
+        shutil.copy(source, dest)
+    return dest
+
+
+def readKinf(outputPath):
+    """
+    Read the last k-infinity (or k-effective) printed in a DRAGON output log.
+
+    Returns None if none was printed (e.g. the run failed).
+    """
+    kinf = None
+    with open(outputPath, errors="replace") as output:
+        for line in output:
+            match = KINF_PATTERN.search(line)
+            if match:
+                kinf = float(match.group(1).upper().replace("D", "E"))
+    return kinf
+
+
+def getFileIdentity(path):
+    """
+    Identify a file by its absolute path, size, and modification time.
+
+    Executables are looked up on the ``PATH`` if needed. Files that do not exist are
+    identified by path alone.
+    """
+    if not path:
+        return None
+    if not os.path.exists(path):
+        path = shutil.which(path) or path
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        return (path,)
+    stat = os.stat(path)
+    return (path, stat.st_size, stat.st_mtime)
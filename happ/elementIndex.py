@@ -0,0 +1,71 @@
+"""
+Aggregate nuclide number densities into elements for many blocks at once.
+
+The mapping from nuclides to elements is worked out once and stored as an index
+array, so collapsing the number densities of any number of blocks is a single
+vectorized operation.
+"""
+import numpy
+
+from armi.nucDirectory import nuclideBases as nb
+
+
+class ElementIndex:
+    """
+    Map from nuclides to rows of an element-by-block number density matrix.
+
+    Nuclides that are natural isotopes of one of the requested elements are summed
+    into that element's row. Any other nuclide gets a row of its own, after the
+    elements, so nothing is lost.
+
+    Parameters
+    ----------
+    elementSymbols : list of str
+        Elements to aggregate, e.g. ``("ZR", "C", "FE")``.
+    nucNames : list of str
+        All nuclides that may appear in the number densities to be collapsed.
+    """
+
+    def __init__(self, elementSymbols, nucNames):
+        rowOfNuc = {}
+        for row, symbol in enumerate(elementSymbols):
+            for nucBase in nb.byName[symbol].getNaturalIsotopics():
+                rowOfNuc[nucBase.name] = row
+
+        self.nucNames = list(nucNames)
+        leftovers = sorted(name for name in self.nucNames if name not in rowOfNuc)
+        self.rowLabels = list(elementSymbols) + leftovers
+        for row, name in enumerate(leftovers, start=len(elementSymbols)):
+            rowOfNuc[name] = row
+        self._nucColumn = {name: i for i, name in enumerate(self.nucNames)}
+        self.rowIndex = numpy.array(
+            [rowOfNuc[name] for name in self.nucNames], dtype=int
+        )
+
+    @classmethod
+    def fromBlocks(cls, elementSymbols, blocks):
+        """Build an index covering every nuclide present in any of the blocks."""
+        nucNames = sorted({name for b in blocks for name in b.getNuclides()})
+        return cls(elementSymbols, nucNames)
+
+    def getNumberDensityMatrix(self, blocks):
+        """Gather number densities of blocks into a nuclide-by-block matrix."""
+        matrix = numpy.zeros((len(self.nucNames), len(blocks)))
+        for j, b in enumerate(blocks):
+            for nucName, ndens in b.getNumberDensities().items():
+                matrix[self._nucColumn[nucName], j] = ndens
+        return matrix
+
+    def collapse(self, ndensMatrix):
+        """
+        Collapse a nuclide-by-block number density matrix to element-by-block.
+
+        Rows of the result are labeled by :py:attr:`rowLabels`.
+        """
+        collapsed = numpy.zeros((len(self.rowLabels),) + ndensMatrix.shape[1:])
+        numpy.add.at(collapsed, self.rowIndex, ndensMatrix)
+        return collapsed
+
+    def getElementDensities(self, blocks):
+        """Element-by-block number densities (atoms/bn-cm) of a list of blocks."""
+        return self.collapse(self.getNumberDensityMatrix(blocks))
@@ -1,6 +1,17 @@
 """A subclass of the Dragon lattice physics plugin's interface that runs Hallam XS"""
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import jinja2
+
 from armi import runLog
 from armi.reactor.flags import Flags
+from armi.utils import directoryChangers
 
 from terrapower.physics.neutronics.dragon import dragonInterface
 from terrapower.physics.neutronics.dragon import dragonWriter
@@ -8,7 +19,37 @@ from terrapower.physics.neutronics.dragon import dragonExecutor
 from terrapower.physics.neutronics.dragon.dragonFactory import dragonFactory
 
 from .plugin import CONF_OPT_HALLAM_DRAGON
+from .plugin import CONF_HALLAM_LATTICE_SELECTION
+from .plugin import CONF_HALLAM_CLUSTER_TOLERANCE
+from .plugin import LATTICE_SELECTION_CORE
+from .plugin import CONF_HALLAM_DRAGON_WORKERS
+from .plugin import CONF_HALLAM_DRAGON_ASYNC
+from .plugin import CONF_HALLAM_DRAGON_TIMEOUT
+from .plugin import CONF_HALLAM_KEEP_DRAGON_DIRS
+from .plugin import CONF_HALLAM_ADAPTIVE_MESH
+from .plugin import CONF_HALLAM_MESH_TOLERANCE
+from .plugin import CONF_HALLAM_MESH_CACHE
+from .plugin import CONF_HALLAM_SHIELDING_REUSE
+from .plugin import CONF_HALLAM_SHIELDING_TOLERANCE
+from .plugin import CONF_HALLAM_BUCKLING_SEARCH
+from .plugin import CONF_HALLAM_BUCKLING_TOLERANCE
+from .plugin import CONF_HALLAM_PRUNE
+from .plugin import CONF_HALLAM_PRUNE_THRESHOLD
+from .plugin import CONF_HALLAM_PRUNE_PRESERVE_MASS
+from .plugin import CONF_HALLAM_MERGE_MIXTURES
+from .plugin import CONF_HALLAM_MERGE_TOLERANCE
 from . import unitCellConverter
+from . import areaCache
+from . import blockSelection
+from . import bucklingSearch
+from . import dragonRunner
+from . import dragonCache
+from . import meshAdaptation
+from . import nuclidePruning
+from . import perturbations
+from . import shielding
+from . import stageTimer
+from .stageTimer import TIMER
 
 
 class HallamLatticeInterface(dragonInterface.DragonInterface):
@@ -25,24 +66,455 @@ class HallamLatticeInterface(dragonInterface.DragonInterface):
         """
         dragonInterface.DragonInterface.__init__(self, r, cs)
         _registerHallamDragonSubclasses()
+        self.selection = None
+        self.criticalBucklings = {}
+        self.pruneReports = []
+        # calibrated reactivity effect of pruning (pcm per removed atom fraction)
+        self._pruneSensitivities = {}
+        self.cache = dragonCache.fromSettings(cs)
+        # unit cell converters by block design, kept so reconversions are incremental
+        self._converters = {}
+        # XS types of blocks that were given their own for the current selection
+        self._originalXSTypes = {}
+        # adapted radial meshes by block design, adapted once per run
+        self._meshSplits = {}
+        self._basicFuel = None
+        # directories that live as long as the interface, removed at EOL
+        self._runDirs = contextlib.ExitStack()
+        self.shieldingStore = None
+        if cs[CONF_HALLAM_SHIELDING_REUSE]:
+            self.shieldingStore = shielding.ShieldedLibraryStore(
+                self._runDirs.enter_context(makeRunDir(cs, "hallam-shielded-")),
+                cs[CONF_HALLAM_SHIELDING_TOLERANCE],
+            )
+        TIMER.reset()
+
+    def interactEOC(self, cycle=None):
+        """Print where the lattice physics time went this cycle and save the details."""
+        dragonInterface.DragonInterface.interactEOC(self, cycle)
+        if not TIMER.records:
+            return
+        runLog.info(f"Hallam lattice physics timing for cycle {cycle}:")
+        runLog.info(TIMER.makeTable(cycle))
+        timingPath = f"{self.cs.caseTitle}-lattice-timing.json"
+        TIMER.writeJson(timingPath)
+        runLog.info(f"Wrote lattice physics timing to {timingPath}")
+
+    def interactEOL(self):
+        """Report how well the area caches paid off over the run and clean up."""
+        dragonInterface.DragonInterface.interactEOL(self)
+        areaCache.report()
+        self._runDirs.close()
 
     def selectObjsToRun(self):
         """
         Choose blocks that will be passed for DRAGON analysis.
 
-        For starters we will hard-code the blueprint-derived basic fuel cell.
-        """
-        basicFuelDesign = self.o.r.blueprints.blockDesigns["basic fuel"]
-        basicFuel = basicFuelDesign.construct(
-            self.o.cs,
-            self.o.r.blueprints,
-            0,
-            1,
-            height=1,
-            xsType="A",
-            materialInput={},
+        By default this is the blueprint-derived basic fuel cell, which is built
+        once and reused at every time node. In ``core`` mode,
+        every convertible fuel block in the core is a candidate, and only one
+        representative of each group of identical (or, with a clustering tolerance,
+        similar) unit cells with the same XS ID is returned, so every XS ID in the
+        core gets cross sections. Groups that share an XS ID with another group get
+        an XS ID of their own, which every block in the group is given, so the cross
+        sections of each run apply to exactly the blocks it represents. Blocks get
+        their original XS types back before the next selection. Use
+        :py:meth:`getRepresentative` to find which run applies to a given block.
+        """
+        if self.cs[CONF_HALLAM_LATTICE_SELECTION] == LATTICE_SELECTION_CORE:
+            self._restoreXSTypes()
+            candidates = blockSelection.getCandidateBlocks(self.r.core)
+            usedXSTypes = {b.p.xsType for b in self.r.core.getBlocks()}
+            self.selection = blockSelection.BlockSelection.fromBlocks(
+                candidates,
+                tolerance=self.cs[CONF_HALLAM_CLUSTER_TOLERANCE],
+                usedXSTypes=usedXSTypes,
+            )
+            for b in candidates:
+                xsType = self.selection.xsTypes.get(b.getName())
+                if xsType is not None:
+                    self._originalXSTypes[b] = b.p.xsType
+                    b.p.xsType = xsType
+            self.selection.logSummary()
+            return self.selection.representatives
+
+        if self._basicFuel is None:
+            basicFuelDesign = self.o.r.blueprints.blockDesigns["basic fuel"]
+            self._basicFuel = basicFuelDesign.construct(
+                self.o.cs,
+                self.o.r.blueprints,
+                0,
+                1,
+                height=1,
+                xsType="A",
+                materialInput={},
+            )
+        # no need to fingerprint a single block
+        self.selection = blockSelection.BlockSelection({None: [self._basicFuel]})
+        return [self._basicFuel]
+
+    def getRepresentative(self, b):
+        """Return the block whose lattice results apply to ``b``."""
+        return self.selection.getRepresentative(b)
+
+    def _restoreXSTypes(self):
+        """Give blocks back the XS types they had before the last selection."""
+        for b, xsType in self._originalXSTypes.items():
+            b.p.xsType = xsType
+        self._originalXSTypes = {}
+
+    def run(self):
+        """
+        Run DRAGON on the selected blocks.
+
+        This replaces the one-case-at-a-time loop of the base interface so cases can
+        be dispatched to a pool of local worker processes.
+        """
+        TIMER.startNode(self.r.p.cycle, self.r.p.timeNode)
+        with TIMER.time(stageTimer.SELECTION):
+            blocks = self.selectObjsToRun()
+        executers = [
+            dragonFactory.makeExecuter(self._makeOptions(b), b) for b in blocks
+        ]
+        if self.cs[CONF_HALLAM_PRUNE]:
+            self._reportPruning(blocks, executers)
+        if self.cs[CONF_HALLAM_ADAPTIVE_MESH]:
+            self._adaptGeomSplits(blocks, executers)
+        if self.cs[CONF_HALLAM_BUCKLING_SEARCH]:
+            for b, executer in zip(blocks, executers):
+                search = self.searchCriticalBuckling(
+                    b, geomSplits=getattr(executer.options, "geomSplits", None)
+                )
+                executer.options.fixedBuckling = search.buckling
+        return self._runExecuters(executers)
+
+    def _makeOptions(self, b):
+        label = re.sub(r"[^\w-]+", "-", f"hallam-{b.getName()}")
+        options = makeOptions(self.cs, b, label)
+        options.fromReactor(self.r)
+        options.shieldingStore = self.shieldingStore
+        options.unitCellConverter = self._getConverter(b)
+        return options
+
+    def _getConverter(self, b):
+        """
+        Get the unit cell converter for a block's design.
+
+        One converter is kept per design for the whole run, so converting a block
+        again (at a later time node, or for another run of a search) or converting
+        another block of the design only re-blends the rings that changed.
+        """
+        converter = self._converters.get(b.getType())
+        if converter is None:
+            converter = unitCellConverter.HallamUnitCellConverter(b)
+            self._converters[b.getType()] = converter
+        return converter
+
+    def _reportPruning(self, blocks, executers):
+        """
+        Estimate the reactivity effect of trace nuclide pruning and report it.
+
+        For each block design, the block that lost the largest fraction of atoms is
+        run once pruned and once unpruned (the first time the design is seen). The
+        reactivity difference per removed atom fraction then scales the estimate
+        for every case of that design. The reports are logged and written to a
+        JSON file.
+        """
+        reports = {}
+        for b, executer in zip(blocks, executers):
+            if executer.pruneReport is not None:
+                reports.setdefault(b.getType(), []).append((b, executer.pruneReport))
+
+        for design, designReports in reports.items():
+            if design not in self._pruneSensitivities:
+                b, report = max(designReports, key=lambda item: item[1].atomFraction)
+                self._pruneSensitivities[design] = self._calibratePruning(b, report)
+            sensitivity = self._pruneSensitivities[design]
+            for _b, report in designReports:
+                if sensitivity is not None:
+                    report.estimateReactivity(sensitivity)
+                runLog.info(
+                    f"Pruned {len(report.removed)} trace nuclides from {report.label} "
+                    f"({report.atomFraction:.3e} of atoms, {report.massFraction:.3e} "
+                    f"of mass; {report.numNuclides} left). Estimated reactivity "
+                    f"effect: {report.reactivityPcm} pcm"
+                )
+                self.pruneReports.append(
+                    dict(
+                        report.asDict(), cycle=self.r.p.cycle, node=self.r.p.timeNode
+                    )
+                )
+
+        reportPath = f"{self.cs.caseTitle}-pruning.json"
+        with open(reportPath, "w") as f:
+            json.dump(self.pruneReports, f, indent=1)
+
+    def _calibratePruning(self, b, report):
+        """Return the reactivity effect of pruning a block per removed atom fraction."""
+        if not report.atomFraction:
+            return None
+        try:
+            kinfFull = self._runStandalone(b, pruneThreshold=None)
+            kinfPruned = self._runStandalone(b)
+        except dragonRunner.DragonCaseError as error:
+            # the estimate is only informative, so the case goes on without it
+            runLog.warning(f"Could not estimate the effect of pruning: {error}")
+            return None
+        if kinfFull is None or kinfPruned is None:
+            return None
+        deltaRho = perturbations.reactivity(kinfPruned) - perturbations.reactivity(
+            kinfFull
         )
-        return [basicFuel]
+        return 1e5 * deltaRho / report.atomFraction
+
+    def _adaptGeomSplits(self, blocks, executers):
+        """
+        Give each executer the adapted radial mesh of its block design.
+
+        The mesh of a design is found the first time the design is seen in this run
+        and kept for the rest of it. It is read from the split cache if a mesh was
+        saved for the same unit cell and nuclear data (see :py:func:`getMeshKey`).
+        Otherwise the block is used to adapt one, which is then saved for later runs.
+        """
+        tolerance = self.cs[CONF_HALLAM_MESH_TOLERANCE] * 1e-5
+        splitCache = meshAdaptation.SplitCache(
+            self.cs[CONF_HALLAM_MESH_CACHE] or meshAdaptation.DEFAULT_CACHE_PATH
+        )
+        for b, executer in zip(blocks, executers):
+            design = b.getType()
+            if design not in self._meshSplits:
+                key = getMeshKey(design, executer.block, self.cs["dragonDataPath"])
+                splits = splitCache.get(key, len(executer.block), tolerance)
+                if splits is None:
+                    splits, kinf, numRuns = meshAdaptation.adaptSplits(
+                        lambda splits, b=b: self._runStandalone(b, geomSplits=splits),
+                        getDefaultGeomSplits(executer.block),
+                        tolerance,
+                    )
+                    splitCache.set(key, splits, tolerance, kinf)
+                    runLog.info(
+                        f"Adapted radial mesh of {design} to {splits} "
+                        f"({sum(splits)} regions) in {numRuns} DRAGON runs"
+                    )
+                self._meshSplits[design] = splits
+            executer.options.geomSplits = self._meshSplits[design]
+
+    def searchCriticalBuckling(self, b, geomSplits=None):
+        """
+        Find the buckling at which a block's unit cell is critical.
+
+        Every DRAGON run after the first restarts from the first one's self-shielded
+        library. The number of DRAGON runs the search took is logged and kept in
+        :py:attr:`criticalBucklings` along with the result.
+
+        Returns
+        -------
+        BucklingSearchResult
+        """
+        with contextlib.ExitStack() as stack:
+            store = self.shieldingStore or shielding.ShieldedLibraryStore(
+                stack.enter_context(makeRunDir(self.cs, "hallam-shielded-")), 0.0
+            )
+            search = bucklingSearch.findCriticalBuckling(
+                lambda buckling: self._runStandalone(
+                    b,
+                    fixedBuckling=buckling,
+                    geomSplits=geomSplits,
+                    shieldingStore=store,
+                ),
+                tolerance=self.cs[CONF_HALLAM_BUCKLING_TOLERANCE] * 1e-5,
+            )
+        self.criticalBucklings[b.getName()] = search
+        log = runLog.info if search.converged else runLog.warning
+        log(
+            f"Critical buckling search for {b.getName()} "
+            f"{'converged' if search.converged else 'did not converge'}: "
+            f"B^2 = {search.buckling:.6e} 1/cm^2, k-eff = {search.keff:.6f} "
+            f"in {search.numRuns} DRAGON runs"
+        )
+        return search
+
+    def _runStandalone(self, b, **optionValues):
+        """
+        Run DRAGON on a block outside the main batch and return k-inf (or k-eff).
+
+        Raises :py:class:`~happ.dragonRunner.DragonCaseError` if the case fails, as
+        the main batch does.
+
+        Parameters
+        ----------
+        b : Block
+            Block to run.
+        optionValues : dict
+            Attributes to set on the DRAGON options, e.g. ``geomSplits``.
+        """
+        options = self._makeOptions(b)
+        options.applyResultsToReactor = False
+        for name, value in optionValues.items():
+            setattr(options, name, value)
+        executer = dragonFactory.makeExecuter(options, b)
+        with makeRunDir(self.cs, "hallam-standalone-") as workingDir:
+            case = executer.prepareCase(
+                workingDir, nuclearDataPath=self.cs["dragonDataPath"]
+            )
+            (result,) = dragonRunner.runCases(
+                [case],
+                cache=self.cache,
+                timeoutSec=self.cs[CONF_HALLAM_DRAGON_TIMEOUT] or None,
+            )
+            result.check()
+            executer.saveShieldedLibrary(result)
+            return dragonRunner.readKinf(result.outputPath)
+
+    def _runExecuters(self, executers):
+        """
+        Run executers serially, on a pool of worker processes, or asynchronously.
+
+        In parallel, cached, async, time-limited, or library-reuse mode, inputs are
+        written and outputs read in this process, each case in its own working
+        directory. Only DRAGON itself runs in the workers (or as asyncio
+        subprocesses), and cases found in the result cache are not run at all.
+        Results come back in the same order as ``executers``.
+
+        When self-shielded libraries are reused, cases that could reuse the library
+        of another case in the same batch wait for it to finish, so only one case
+        per resonance state does the self-shielding.
+        """
+        numWorkers = self.cs[CONF_HALLAM_DRAGON_WORKERS]
+        useAsync = self.cs[CONF_HALLAM_DRAGON_ASYNC]
+        timeoutSec = self.cs[CONF_HALLAM_DRAGON_TIMEOUT] or None
+        if (
+            self.cache is None
+            and self.shieldingStore is None
+            and not useAsync
+            and timeoutSec is None
+            and (numWorkers <= 1 or len(executers) <= 1)
+        ):
+            outputs = []
+            for executer in executers:
+                # in this mode, rendering and read-back are included in DRAGON
+                with TIMER.time(stageTimer.DRAGON, executer.options.label):
+                    outputs.append(executer.run())
+            return outputs
+
+        with makeRunDir(self.cs, "hallam-dragon-") as runRoot:
+            outputs = self._runCases(executers, runRoot)
+
+        if self.cache is not None:
+            runLog.info(f"DRAGON result cache: {self.cache}")
+        if self.shieldingStore is not None:
+            runLog.info(f"Self-shielded libraries: {self.shieldingStore}")
+        return outputs
+
+    def _runCases(self, executers, runRoot):
+        """
+        Write, run, and read back cases in directories under ``runRoot``.
+
+        Every case is run and read back even if some fail, and then
+        :py:class:`~happ.dragonRunner.DragonCaseError` is raised for the failures,
+        as it is when a standalone run fails.
+        """
+        numWorkers = self.cs[CONF_HALLAM_DRAGON_WORKERS]
+        outputs = [None] * len(executers)
+        failures = []
+        states = None
+        if self.shieldingStore is not None:
+            states = [executer.getResonanceState() for executer in executers]
+        pending = list(range(len(executers)))
+        while pending:
+            runNow, pending = self._splitShieldingPhases(pending, states)
+            # only cases that run now are written, so waiting ones are written once
+            # with the library they will reuse
+            cases = {
+                i: executers[i].prepareCase(
+                    os.path.join(runRoot, f"{i:04d}-{executers[i].options.label}"),
+                    nuclearDataPath=self.cs["dragonDataPath"],
+                )
+                for i in runNow
+            }
+            runLog.info(
+                f"Running {len(runNow)} DRAGON cases on {numWorkers} workers in "
+                f"{runRoot}"
+            )
+            with TIMER.time(stageTimer.DRAGON):
+                results = dragonRunner.runCases(
+                    [cases[i] for i in runNow],
+                    numWorkers,
+                    cache=self.cache,
+                    timeoutSec=self.cs[CONF_HALLAM_DRAGON_TIMEOUT] or None,
+                    useAsync=self.cs[CONF_HALLAM_DRAGON_ASYNC],
+                    onProgress=_logProgress,
+                )
+            for result in results:
+                if not result.fromCache and result.duplicateOf is None:
+                    TIMER.add(
+                        stageTimer.DRAGON_CASE,
+                        result.label,
+                        result.wallTimeSec,
+                        peakMemoryMB=result.peakMemoryMB,
+                    )
+            for i, result in zip(runNow, results):
+                try:
+                    outputs[i] = executers[i].collectResult(result)
+                except dragonRunner.DragonCaseError as error:
+                    failures.append(str(error))
+        if failures:
+            for failure in failures:
+                runLog.error(failure)
+            raise dragonRunner.DragonCaseError(
+                f"{len(failures)} of {len(executers)} DRAGON cases failed; "
+                f"see the errors above"
+            )
+        return outputs
+
+    def _splitShieldingPhases(self, indices, states):
+        """
+        Split cases into those to run now and those that should wait for a library.
+
+        A case that has to do its own self-shielding waits if an earlier case in the
+        batch also does and has a matching resonance state. Once that one is done,
+        the waiting case is written and reuses its library.
+
+        Parameters
+        ----------
+        indices : list of int
+            Cases still to run.
+        states : list of dict
+            Resonance state of every case, or None if libraries are not reused.
+        """
+        if self.shieldingStore is None:
+            return list(indices), []
+        runNow, deferred = [], []
+        savingStates = []
+        for i in indices:
+            state = states[i]
+            _key, libraryPath = self.shieldingStore.find(state)
+            if libraryPath is not None:
+                runNow.append(i)
+            elif any(
+                self.shieldingStore.matches(state, saving) for saving in savingStates
+            ):
+                deferred.append(i)
+            else:
+                runNow.append(i)
+                savingStates.append(state)
+        return runNow, deferred
+
+
+def _logProgress(label, module):
+    runLog.debug(f"DRAGON case {label} started {module}")
+
+
+def makeRunDir(cs, prefix):
+    """
+    Make a directory for DRAGON cases in the current directory, as a context manager.
+
+    The directory is removed on exit, unless the settings ask to keep DRAGON
+    working directories for debugging.
+    """
+    if cs[CONF_HALLAM_KEEP_DRAGON_DIRS]:
+        return contextlib.nullcontext(tempfile.mkdtemp(prefix=prefix, dir=os.getcwd()))
+    return tempfile.TemporaryDirectory(prefix=prefix, dir=os.getcwd())
 
 
 def _registerHallamDragonSubclasses():
@@ -57,14 +529,192 @@ def _registerHallamDragonSubclasses():
     dragonFactory.registerExecuter(CONF_OPT_HALLAM_DRAGON, HallamDragonExecuter)
 
 
+def makeOptions(cs, b, label):
+    """Make DRAGON options for a block from user settings."""
+    options = dragonExecutor.DragonOptions(label)
+    options.fromUserSettings(cs)
+    options.fromBlock(b)
+    options.pruneThreshold = (
+        cs[CONF_HALLAM_PRUNE_THRESHOLD] if cs[CONF_HALLAM_PRUNE] else None
+    )
+    options.prunePreserveMass = cs[CONF_HALLAM_PRUNE_PRESERVE_MASS]
+    options.mixtureMergeTolerance = (
+        cs[CONF_HALLAM_MERGE_TOLERANCE] if cs[CONF_HALLAM_MERGE_MIXTURES] else None
+    )
+    return options
+
+
+def prepareStandaloneCase(cs, b, workingDir, label, converter=None):
+    """
+    Write a DRAGON case for a block that is not part of a running ARMI case.
+
+    This is for drivers (sweeps, XS generation) that build blocks from blueprints
+    rather than from a reactor. Drivers that write many perturbations of one block
+    can pass the same unit cell converter for each, so only the rings that differ
+    are re-blended. The returned case can be run with
+    :py:func:`happ.dragonRunner.runCases`.
+    """
+    _registerHallamDragonSubclasses()
+    options = makeOptions(cs, b, label)
+    options.applyResultsToReactor = False
+    options.unitCellConverter = converter
+    executer = dragonFactory.makeExecuter(options, b)
+    return executer.prepareCase(workingDir, nuclearDataPath=cs["dragonDataPath"])
+
+
+# Compiled DRAGON templates, keyed on absolute path and modification time
+_TEMPLATES = {}
+
+
+def getTemplate(path):
+    """
+    Get the compiled Jinja template at a path, compiling it only once per process.
+
+    Editing the template file changes its modification time, so it is recompiled.
+    """
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path))
+    template = _TEMPLATES.get(key)
+    if template is None:
+        with open(path) as templateFile:
+            template = jinja2.Template(templateFile.read())
+        for staleKey in [k for k in _TEMPLATES if k[0] == path]:
+            del _TEMPLATES[staleKey]
+        _TEMPLATES[key] = template
+    return template
+
+
+def mergeMixtures(mixtures, tolerance=0.0):
+    """
+    Merge DRAGON mixtures with matching compositions and temperatures.
+
+    Each mixture is compared with the unique ones found before it and shares the
+    first one that matches, so a merged mixture takes the composition of its first
+    ring.
+
+    Parameters
+    ----------
+    mixtures : list
+        Template mixtures, one per ring.
+    tolerance : float
+        Largest relative difference in temperature and in each number density at
+        which two mixtures match. They must always have the same nuclides.
+
+    Returns
+    -------
+    unique : list
+        The mixtures to write.
+    ringMixtures : list of int
+        The 1-based index in ``unique`` of the mixture of each ring.
+    """
+    unique, keys, ringMixtures = [], [], []
+    for mixture in mixtures:
+        key = _getMixtureKey(mixture)
+        for index, uniqueKey in enumerate(keys, start=1):
+            if _mixtureKeysMatch(key, uniqueKey, tolerance):
+                ringMixtures.append(index)
+                break
+        else:
+            unique.append(mixture)
+            keys.append(key)
+            ringMixtures.append(len(unique))
+    return unique, ringMixtures
+
+
+def _getMixtureKey(mixture):
+    densities = {}
+    for mixNuc in mixture.getMixVector():
+        nucKey = (mixNuc.armiName, mixNuc.xsid, mixNuc.dragName, str(mixNuc.selfshield))
+        densities[nucKey] = float(mixNuc.ndens)
+    return float(mixture.getTempInK()), densities
+
+
+def _mixtureKeysMatch(key, other, tolerance):
+    (temp, densities), (otherTemp, otherDensities) = key, other
+    if densities.keys() != otherDensities.keys():
+        return False
+    if abs(temp - otherTemp) > tolerance * abs(otherTemp):
+        return False
+    return all(
+        abs(nd - otherDensities[nuc]) <= tolerance * abs(otherDensities[nuc])
+        for nuc, nd in densities.items()
+    )
+
+
 class HallamDragonWriter(dragonWriter.DragonWriterHomogenized):
+    def write(self):
+        """
+        Render the input straight to disk with the cached, precompiled template.
+
+        Rendering streams the template output to the file piece by piece, so the
+        (potentially long) input is never held in memory as one string.
+        """
+        with TIMER.time(stageTimer.RENDER, self.options.label):
+            templateData = self._buildTemplateData()
+            store = getattr(self.options, "shieldingStore", None)
+            if store is not None:
+                self._chooseShielding(templateData, store)
+            template = getTemplate(self.options.templatePath)
+            with open(self.options.inputFile, "w") as dragonInput:
+                template.stream(**templateData).dump(dragonInput)
+
     def _buildTemplateData(self):
-        """Add 1-D geometry information to the template data."""
+        """
+        Add 1-D geometry information to the template data.
+
+        ``ringMixtures`` gives the (1-based) mixture of each ring. Unless mixtures
+        are merged, each ring has its own. The assignment is kept on the options as
+        well, so results can be traced back to rings.
+        """
         templateData = dragonWriter.DragonWriterHomogenized._buildTemplateData(self)
         templateData["radii"] = self._makeRadii()
         templateData["geomsplits"] = self._makeGeomSplits()
+        mixtures = templateData["mixtures"]
+        ringMixtures = list(range(1, len(mixtures) + 1))
+        tolerance = getattr(self.options, "mixtureMergeTolerance", None)
+        if tolerance is not None:
+            mixtures, ringMixtures = mergeMixtures(mixtures, tolerance)
+            if len(mixtures) < len(ringMixtures):
+                runLog.debug(
+                    f"Merged {len(ringMixtures)} rings of {self.options.label} into "
+                    f"{len(mixtures)} mixtures: {ringMixtures}"
+                )
+        templateData["mixtures"] = mixtures
+        templateData["ringMixtures"] = ringMixtures
+        self.options.ringMixtures = ringMixtures
+        fixedBuckling = getattr(self.options, "fixedBuckling", None)
+        if fixedBuckling is not None:
+            templateData["fixedBuckling"] = fixedBuckling
         return templateData
 
+    def getResonanceState(self):
+        """Get what self-shielding depends on, without rendering the input."""
+        return shielding.getResonanceState(self._buildTemplateData())
+
+    def _chooseShielding(self, templateData, store):
+        """
+        Reuse a saved self-shielded library if one matches, or else save one.
+
+        A matching library is staged next to the input, and its content hash is
+        written into the input so that the result cache tells libraries apart.
+        Inputs are only written for cases about to run, so this is where a library
+        is counted as reused.
+        """
+        state = shielding.getResonanceState(templateData)
+        key, libraryPath = store.find(state)
+        if libraryPath is None:
+            mode = shielding.MODE_SAVE
+        else:
+            mode = shielding.MODE_REUSE
+            store.reused += 1
+            inputDir = os.path.dirname(os.path.abspath(self.options.inputFile))
+            # copied rather than linked, since DRAGON opens it for writing
+            shutil.copy(libraryPath, os.path.join(inputDir, shielding.SHIELDED_LIBRARY))
+            templateData["shieldedLibraryKey"] = key
+        templateData["shielding"] = mode
+        self.options.shielding = mode
+        self.options.resonanceState = state
+
     def _makeRadii(self):
         radii = []
         for obj in sorted(self.armiObjs):
@@ -72,12 +722,29 @@ class HallamDragonWriter(dragonWriter.DragonWriterHomogenized):
         return radii
 
     def _makeGeomSplits(self):
-        """Say how many times to split each ring"""
-        splits = [
-            5 if obj.hasFlags([Flags.FUEL, Flags.MODERATOR]) else 1
-            for obj in self.armiObjs
-        ]
-        return splits
+        """Say how many times to split each ring, preferring an adapted mesh if set."""
+        splits = getattr(self.options, "geomSplits", None)
+        if splits:
+            return list(splits)
+        return getDefaultGeomSplits(self.armiObjs)
+
+
+def getMeshKey(design, convertedBlock, nuclearDataPath):
+    """
+    Key an adapted radial mesh by what it was converged for.
+
+    This is the block design along with a hash of the converted unit cell's ring
+    geometry and composition and of the nuclear data library, so a mesh is not
+    reused after either changes.
+    """
+    digest = hashlib.sha1(blockSelection.getFingerprint(convertedBlock).encode())
+    digest.update(repr(dragonRunner.getFileIdentity(nuclearDataPath)).encode())
+    return f"{design}:{digest.hexdigest()}"
+
+
+def getDefaultGeomSplits(rings):
+    """Split fuel and moderator rings in 5 and leave the rest whole."""
+    return [5 if obj.hasFlags([Flags.FUEL, Flags.MODERATOR]) else 1 for obj in rings]
 
 
 class HallamDragonExecuter(dragonExecutor.DragonExecuter):
@@ -88,11 +755,103 @@ class HallamDragonExecuter(dragonExecutor.DragonExecuter):
         self._transformToUnitCell()
 
     def _transformToUnitCell(self):
-        """Replace this Executer's block with a 1-D converted form."""
-        conv = unitCellConverter.HallamUnitCellConverter(self.block)
-        self.block = conv.convert()
+        """
+        Replace this Executer's block with a 1-D converted form.
+
+        If the options carry a converter (kept by the caller across perturbations),
+        it is pointed at this block so only rings that changed are re-blended.
+        Trace nuclides are pruned from the converted rings if the options ask for it.
+        """
+        self.pruneReport = None
+        with TIMER.time(stageTimer.TRANSFORM, self.options.label):
+            conv = getattr(self.options, "unitCellConverter", None)
+            if conv is None:
+                conv = unitCellConverter.HallamUnitCellConverter(self.block)
+            else:
+                conv.setSourceBlock(self.block)
+            self.block = conv.convert()
+            threshold = getattr(self.options, "pruneThreshold", None)
+            if threshold:
+                self.pruneReport = nuclidePruning.pruneRings(
+                    self.block,
+                    threshold,
+                    preserveMass=self.options.prunePreserveMass,
+                    label=self.options.label,
+                )
+
+    def getMixtureIndex(self, ring):
+        """
+        Get the (1-based) DRAGON mixture a ring of the converted block was written as.
+
+        Rings whose mixtures were merged share an index. This is only known once the
+        input has been written.
+        """
+        ringIndex = list(self.block).index(ring)
+        return self.options.ringMixtures[ringIndex]
+
+    def getResonanceState(self):
+        """
+        Get the resonance state of this case without writing its input.
+
+        See :py:func:`happ.shielding.getResonanceState`.
+        """
+        self.options.resolveDerivedOptions()
+        return dragonFactory.makeWriter(self.block, self.options).getResonanceState()
 
     def writeInput(self):
         """Write the input file with the children of this converted unit cell block."""
         inputWriter = dragonFactory.makeWriter(self.block, self.options)
         inputWriter.write()
+
+    def prepareCase(self, workingDir, nuclearDataPath=None):
+        """
+        Write the input into an isolated working directory for a worker to run.
+
+        Auxiliary inputs (e.g. the nuclear data library) are staged alongside it.
+        """
+        self.options.resolveDerivedOptions()
+        # the input is written from inside the working directory
+        self.options.templatePath = os.path.abspath(self.options.templatePath)
+        os.makedirs(workingDir, exist_ok=True)
+        inputs, _outputs = self._collectInputsAndOutputs()
+        for inputFile in inputs:
+            source, destName = (
+                inputFile if isinstance(inputFile, tuple) else (inputFile, None)
+            )
+            if os.path.exists(source):
+                dragonRunner.stageFile(source, workingDir, destName)
+        with directoryChangers.DirectoryChanger(workingDir):
+            self.writeInput()
+        return dragonRunner.DragonCase(
+            label=self.options.label,
+            workingDir=workingDir,
+            executablePath=self.options.executablePath,
+            inputName=self.options.inputFile,
+            outputName=self.options.outputFile,
+            nuclearDataPath=nuclearDataPath,
+        )
+
+    def collectResult(self, result: dragonRunner.DragonResult):
+        """
+        Read the output of a case run by :py:func:`happ.dragonRunner.runCases`.
+
+        Raises
+        ------
+        DragonCaseError
+            If the case failed. Nothing is read or applied to the reactor.
+        """
+        result.check()
+        with TIMER.time(stageTimer.READBACK, result.label):
+            with directoryChangers.DirectoryChanger(result.workingDir):
+                output = self._readOutput()
+        self.saveShieldedLibrary(result)
+        if self.options.applyResultsToReactor:
+            output.apply(self.r)
+        return output
+
+    def saveShieldedLibrary(self, result: dragonRunner.DragonResult):
+        """Add the self-shielded library a finished case saved (if any) to the store."""
+        libraryPath = os.path.join(result.workingDir, shielding.SHIELDED_LIBRARY)
+        saving = getattr(self.options, "shielding", None) == shielding.MODE_SAVE
+        if saving and os.path.exists(libraryPath):
+            self.options.shieldingStore.add(self.options.resonanceState, libraryPath)
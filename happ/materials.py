@@ -1,10 +1,158 @@
+"""
+Hallam-specific materials.
+
+Property methods accept NumPy arrays of temperatures as well as scalars, so many
+components can be evaluated at once. Density and thermal expansion lookups can
+optionally be served from precomputed interpolation tables; see
+:py:class:`TabulatedDensityMixin`.
+"""
+import numpy
+
 from armi import materials
 from armi.materials import material
 from armi.materials import graphite
 from armi.utils.units import getTc
 
+# Shared property tables, keyed on material class, reference density, range, and
+# property
+_PROPERTY_TABLES = {}
+
+# Points in the default tables: a 5 K grid from 20 to 1000 C
+TABLE_POINTS = 197
+
+
+def _getTc(Tc=None, Tk=None):
+    """Get temperature in C as a float or array, whichever was passed in."""
+    if isinstance(Tc, (list, tuple)):
+        Tc = numpy.asarray(Tc, dtype=float)
+    if isinstance(Tk, (list, tuple)):
+        Tk = numpy.asarray(Tk, dtype=float)
+    return getTc(Tc, Tk)
+
+
+def _constantLike(value, Tc=None, Tk=None):
+    """Return a constant property with the same shape as the temperature input."""
+    if Tc is None and Tk is None:
+        return value
+    tempC = _getTc(Tc, Tk)
+    if numpy.ndim(tempC):
+        return numpy.full(numpy.shape(tempC), value)
+    return value
 
-class UMo(materials.FuelMaterial):
+
+class PropertyTable:
+    """
+    A material property tabulated on a uniform temperature grid.
+
+    Lookups are linear interpolations, done with plain arithmetic for a single
+    temperature (much faster than ``numpy.interp`` on a scalar) and with
+    ``numpy.interp`` for arrays. Properties that are linear in temperature, like the
+    expansion of most Hallam materials, are reproduced to round-off. Others are not:
+    density goes as 1/(1 + dL/L)^3 (or squared, in 2-D) even when the expansion is
+    linear. The interpolation error is at most h^2/8 max|f''(T)| for a grid spacing
+    h. For density with a constant expansion coefficient alpha, that is about
+    1.5 (alpha h)^2 of the density in 3-D: around 1e-8 for alpha = 2e-5/K on the
+    default 5 K grid.
+    """
+
+    def __init__(self, temperaturesC, values):
+        self.temperaturesC = numpy.asarray(temperaturesC, dtype=float)
+        self.values = numpy.asarray(values, dtype=float)
+        self._tMin = float(self.temperaturesC[0])
+        self._tMax = float(self.temperaturesC[-1])
+        self._step = (self._tMax - self._tMin) / (len(self.temperaturesC) - 1)
+        self._valueList = self.values.tolist()
+
+    def covers(self, tempC):
+        if not numpy.ndim(tempC):
+            return self._tMin <= tempC <= self._tMax
+        return bool(numpy.all((tempC >= self._tMin) & (tempC <= self._tMax)))
+
+    def lookup(self, tempC):
+        if numpy.ndim(tempC):
+            return numpy.interp(tempC, self.temperaturesC, self.values)
+        x = (tempC - self._tMin) / self._step
+        i = min(int(x), len(self._valueList) - 2)
+        low, high = self._valueList[i], self._valueList[i + 1]
+        return low + (x - i) * (high - low)
+
+
+class TabulatedDensityMixin:
+    """
+    Serve density and thermal expansion from precomputed tables when enabled.
+
+    Tables are off by default. They are turned on for all Hallam materials by the
+    ``hallamDensityTables`` setting (see :py:func:`applyDensityTableSetting`), or
+    for one material class by :py:meth:`enableDensityTable`.
+
+    Besides ``density`` and ``density3``, this tabulates ``linearExpansionFactor``,
+    which is what ARMI calls to thermally expand component dimensions (e.g. in
+    ``Component.getDimension`` and ``setTemperature``), so component areas and
+    volumes are sped up as well. Expansion factors are tabulated for each reference
+    temperature they are asked for, which in practice is one per component input
+    temperature. Tables are built on first use and shared between all instances of
+    the class with the same reference density. Temperatures outside the tabulated
+    range fall back to the direct calculation.
+    """
+
+    densityTableRange = None
+
+    @classmethod
+    def enableDensityTable(cls, TcMin=20.0, TcMax=1000.0, numPoints=TABLE_POINTS):
+        """Turn on tabulated densities and expansion for this material class."""
+        cls.densityTableRange = (TcMin, TcMax, numPoints)
+
+    @classmethod
+    def disableDensityTable(cls):
+        cls.densityTableRange = None
+
+    def _getTable(self, name, compute):
+        """Get (or build) a table of a property, calling ``compute(Tc)`` per point."""
+        if self.densityTableRange is None:
+            return None
+        key = (self.__class__, self.p.refDens, self.densityTableRange, name)
+        table = _PROPERTY_TABLES.get(key)
+        if table is None:
+            TcMin, TcMax, numPoints = self.densityTableRange
+            temps = numpy.linspace(TcMin, TcMax, numPoints)
+            # build point by point so the table works with any parent implementation
+            table = PropertyTable(temps, [compute(T) for T in temps])
+            _PROPERTY_TABLES[key] = table
+        return table
+
+    def density(self, Tk=None, Tc=None):
+        table = self._getTable(
+            "density", lambda T: super(TabulatedDensityMixin, self).density(Tc=T)
+        )
+        if table is not None:
+            tempC = _getTc(Tc, Tk)
+            if table.covers(tempC):
+                return table.lookup(tempC)
+        return super().density(Tk=Tk, Tc=Tc)
+
+    def density3(self, Tk=None, Tc=None):
+        table = self._getTable(
+            "density3", lambda T: super(TabulatedDensityMixin, self).density3(Tc=T)
+        )
+        if table is not None:
+            tempC = _getTc(Tc, Tk)
+            if table.covers(tempC):
+                return table.lookup(tempC)
+        return super().density3(Tk=Tk, Tc=Tc)
+
+    def linearExpansionFactor(self, Tc, T0):
+        table = self._getTable(
+            ("linearExpansionFactor", T0),
+            lambda T: super(TabulatedDensityMixin, self).linearExpansionFactor(
+                Tc=T, T0=T0
+            ),
+        )
+        if table is not None and table.covers(Tc):
+            return table.lookup(Tc)
+        return super().linearExpansionFactor(Tc=Tc, T0=T0)
+
+
+class UMo(TabulatedDensityMixin, materials.FuelMaterial):
     """
     U-10Mo metallic fuel for Hallam
 
@@ -48,16 +196,16 @@ class UMo(materials.FuelMaterial):
             \frac{17.1}{16.64} = (1+dLL(T_H))^3
 
         """
-        tempC = getTc(Tc, Tk)
+        tempC = _getTc(Tc, Tk)
         return 100 * (tempC - 20.0) * 0.00913 / 476.0
 
     def heatCapacity(self, Tk=None, Tc=None):
         """Cp from Burkes in J/g-C"""
-        Tc = getTc(Tc, Tk)
+        Tc = _getTc(Tc, Tk)
         return 0.137 + 5.12e-5 * Tc + 1.99e-8 * Tc ** 2
 
 
-class SS304(materials.Material):
+class SS304(TabulatedDensityMixin, materials.Material):
     """
     Stainless Steel 304 for Hallam
 
@@ -87,11 +235,11 @@ class SS304(materials.Material):
             \frac{7.9}{7.72} = (1+dLL(T_H))^3
 
         """
-        tempC = getTc(Tc, Tk)
+        tempC = _getTc(Tc, Tk)
         return 100 * (tempC - 20.0) * 0.007712 / 400.0
 
 
-class Zircaloy2(materials.Material):
+class Zircaloy2(TabulatedDensityMixin, materials.Material):
     """
     Zircaloy 2 for Hallam
 
@@ -115,11 +263,11 @@ class Zircaloy2(materials.Material):
             \frac{6.57}{6.52} = (1+dLL(T_H))^3
 
         """
-        tempC = getTc(Tc, Tk)
+        tempC = _getTc(Tc, Tk)
         return 100 * (tempC - 20.0) * 0.00255 / 400.0
 
 
-class HastelloyX(materials.Material):
+class HastelloyX(TabulatedDensityMixin, materials.Material):
     """
     Control cladding for Hallam.
 
@@ -144,13 +292,13 @@ class HastelloyX(materials.Material):
         It won't matter much for the paper
         """
         # returning 0 actually triggers an error in ARMI
-        return 0.0001
+        return _constantLike(0.0001, Tc=Tc, Tk=Tk)
 
     def linearExpansionFactor(self, Tc, T0):
-        return 0.0001
+        return _constantLike(0.0001, Tc=Tc)
 
 
-class RareEarths(materials.Material):
+class RareEarths(TabulatedDensityMixin, materials.Material):
     """
     Control material (Gd oxide, Sm oxide) for Hallam
 
@@ -174,13 +322,13 @@ class RareEarths(materials.Material):
         It won't matter much for the paper
         """
         # returning 0 actually triggers an error in ARMI
-        return 0.0001
+        return _constantLike(0.0001, Tc=Tc, Tk=Tk)
 
     def linearExpansionFactor(self, Tc, T0):
-        return 0.0001
+        return _constantLike(0.0001, Tc=Tc)
 
 
-class Graphite(graphite.Graphite):
+class Graphite(TabulatedDensityMixin, graphite.Graphite):
     """
     Graphite with reduced density to match Table 2 in Aronchick.
     """
@@ -193,10 +341,36 @@ class Graphite(graphite.Graphite):
         self.p.refDens = 1.67
 
 
-class Helium(material.Fluid):
+class Helium(TabulatedDensityMixin, material.Fluid):
     name = "Helium"
 
     def setDefaultMassFracs(self):
         """Helium"""
         self.setMassFrac("HE4", 1.0)
         self.p.refDens = 0.001
+
+
+HALLAM_MATERIALS = (UMo, SS304, Zircaloy2, HastelloyX, RareEarths, Graphite, Helium)
+
+
+def enableDensityTables(TcMin=20.0, TcMax=1000.0, numPoints=TABLE_POINTS):
+    """Turn on tabulated densities and expansion for all Hallam materials."""
+    for materialClass in HALLAM_MATERIALS:
+        materialClass.enableDensityTable(TcMin, TcMax, numPoints)
+
+
+def disableDensityTables():
+    """Turn off tabulated densities and expansion for all Hallam materials."""
+    for materialClass in HALLAM_MATERIALS:
+        materialClass.disableDensityTable()
+
+
+def applyDensityTableSetting(cs):
+    """Turn tabulated densities on or off for all Hallam materials per the settings."""
+    # pylint: disable=import-outside-toplevel ; avoid circular import with the plugin
+    from happ.plugin import CONF_HALLAM_DENSITY_TABLES
+
+    if cs[CONF_HALLAM_DENSITY_TABLES]:
+        enableDensityTables()
+    else:
+        disableDensityTables()
@@ -0,0 +1,115 @@
+"""
+Adaptive radial mesh splitting for the 1-D Hallam DRAGON cases.
+
+The transport tracking cost grows with the total number of sub-regions, whether or
+not the extra splits change the answer. :py:func:`adaptSplits` finds a split pattern
+that is converged in k-inf to within a tolerance while using as few regions as
+possible: it first refines every ring until doubling the splits no longer changes
+k-inf, then coarsens the rings one at a time for as long as k-inf stays within the
+tolerance of the finest answer.
+
+This takes several DRAGON runs, so converged patterns are saved in a small JSON file
+(:py:class:`SplitCache`) and reused by later runs. They are keyed by the caller, who
+should make sure a key changes whenever the unit cell or nuclear data do.
+"""
+import json
+import os
+
+# Most sub-regions a single ring is split into
+MAX_SPLITS = 40
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".happ", "meshSplits.json")
+
+
+def adaptSplits(runKinf, initialSplits, tolerance, maxSplits=MAX_SPLITS):
+    """
+    Find the coarsest split pattern whose k-inf is converged within a tolerance.
+
+    Parameters
+    ----------
+    runKinf : callable
+        Takes a list of splits (one per ring) and returns k-inf, e.g. by running
+        DRAGON. Each pattern is only evaluated once.
+    initialSplits : list of int
+        Pattern to start from.
+    tolerance : float
+        Largest acceptable absolute difference in k-inf from the finest pattern.
+    maxSplits : int
+        Most splits allowed in a single ring.
+
+    Returns
+    -------
+    splits : list of int
+        Converged split pattern.
+    kinf : float
+        k-inf with that pattern.
+    numRuns : int
+        How many patterns were evaluated.
+    """
+    kinfs = {}
+
+    def kinf(splits):
+        if splits not in kinfs:
+            value = runKinf(list(splits))
+            if value is None:
+                raise RuntimeError(f"No k-inf for geometry splits {list(splits)}")
+            kinfs[splits] = value
+        return kinfs[splits]
+
+    # refine everywhere until doubling the splits no longer matters
+    splits = tuple(initialSplits)
+    while True:
+        finer = tuple(min(2 * split, maxSplits) for split in splits)
+        if finer == splits or abs(kinf(finer) - kinf(splits)) <= tolerance:
+            break
+        splits = finer
+    reference = kinf(finer)
+
+    # then coarsen each ring for as long as the answer holds
+    for i in range(len(splits)):
+        while splits[i] > 1:
+            coarser = splits[:i] + (splits[i] // 2,) + splits[i + 1 :]
+            if abs(kinf(coarser) - reference) > tolerance:
+                break
+            splits = coarser
+
+    return list(splits), kinf(splits), len(kinfs)
+
+
+class SplitCache:
+    """
+    Converged split patterns, saved to a JSON file.
+
+    Patterns are stored under a key such as the one made by
+    :py:func:`happ.latticeInterface.getMeshKey`, from the block design, its unit cell
+    geometry and composition, and the nuclear data. A pattern is only reused if it
+    was converged to a tolerance at least as tight as the one asked for, and for the
+    same number of rings.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def get(self, key, numRings, tolerance):
+        """Return the cached split pattern for a key, or None."""
+        entry = self.entries.get(key)
+        if (
+            entry is None
+            or entry["tolerance"] > tolerance
+            or len(entry["splits"]) != numRings
+        ):
+            return None
+        return entry["splits"]
+
+    def set(self, key, splits, tolerance, kinf):
+        """Save a converged pattern under a key."""
+        self.entries[key] = {"splits": splits, "tolerance": tolerance, "kinf": kinf}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
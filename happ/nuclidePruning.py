@@ -0,0 +1,154 @@
+"""
+Pruning of trace nuclides from converted Hallam unit cells before DRAGON runs.
+
+Once burnup starts, every ring carries many fission products and minor isotopes at
+trace densities, and DRAGON's run time and memory grow with the number of nuclides in
+each mixture. Nuclides whose number density is below a threshold fraction of their
+ring's total are dropped, except for strong absorbers (:py:data:`STRONG_ABSORBERS`),
+which matter at any density a reactor will see. Optionally the remaining isotopes of
+each element that lost some are scaled so that the element's mass is unchanged.
+
+Dropping nuclides changes the answer by an amount that cannot be known without
+cross sections, so :py:class:`PruneReport` records what was removed. Its estimated
+reactivity impact is filled in by calibrating against a pruned and an unpruned run
+of a similar unit cell (see :py:meth:`PruneReport.estimateReactivity`).
+"""
+import collections
+import dataclasses
+from typing import List, Tuple
+
+from armi.nucDirectory import nuclideBases as nb
+
+# Fission products, burnable poisons, and control materials with absorption cross
+# sections so large that even trace densities change reactivity; they are never pruned
+STRONG_ABSORBERS = frozenset(
+    (
+        "XE135",
+        "SM149",
+        "SM151",
+        "EU155",
+        "GD155",
+        "GD157",
+        "CD113",
+        "RH103",
+        "ND143",
+        "PM147",
+        "B10",
+    )
+)
+
+
+@dataclasses.dataclass
+class PruneReport:
+    """
+    What was pruned from one unit cell.
+
+    Attributes
+    ----------
+    label : str
+        Case the unit cell belongs to.
+    removed : list of tuple
+        Ring index, nuclide name, and number density of each removed nuclide.
+    atomFraction : float
+        Area-weighted fraction of the cell's atoms that were removed.
+    massFraction : float
+        Area-weighted fraction of the cell's mass that was removed (before any
+        renormalization within elements).
+    numNuclides : int
+        Nuclides left in all rings together.
+    reactivityPcm : float
+        Estimated reactivity impact of the pruning, once calibrated.
+    """
+
+    label: str
+    removed: List[Tuple[int, str, float]] = dataclasses.field(default_factory=list)
+    atomFraction: float = 0.0
+    massFraction: float = 0.0
+    numNuclides: int = 0
+    reactivityPcm: float = None
+
+    def estimateReactivity(self, pcmPerAtomFraction):
+        """Scale a calibrated sensitivity by the fraction of atoms removed here."""
+        self.reactivityPcm = pcmPerAtomFraction * self.atomFraction
+        return self.reactivityPcm
+
+    def asDict(self):
+        return dataclasses.asdict(self)
+
+
+def pruneRings(rings, threshold, preserveMass=True, label=None, keep=STRONG_ABSORBERS):
+    """
+    Remove trace nuclides from the rings of a converted unit cell, in place.
+
+    Parameters
+    ----------
+    rings : iterable of Component
+        Rings of a converted unit cell.
+    threshold : float
+        Nuclides whose number density is below this fraction of their ring's total
+        number density are removed.
+    preserveMass : bool
+        Scale the remaining isotopes of each element that lost some, in each ring, so
+        that the element's mass is unchanged. Other nuclides (e.g. the fissile ones,
+        unless an isotope of their own element was pruned) are left as they are.
+        The mass of an element with no isotope left is lost.
+    label : str, optional
+        Case label for the report.
+    keep : set of str
+        Nuclides that are never removed, however low their density.
+
+    Returns
+    -------
+    PruneReport
+    """
+    report = PruneReport(label)
+    totalAtoms = removedAtoms = totalMass = removedMass = 0.0
+    for i, ring in enumerate(rings):
+        area = ring.getArea()
+        ndens = ring.getNumberDensities()
+        ringTotal = sum(ndens.values())
+        kept = {}
+        ringMass = ringRemovedMass = 0.0
+        elementMass = collections.defaultdict(float)
+        removedElementMass = collections.defaultdict(float)
+        for nucName, nd in ndens.items():
+            nuc = nb.byName[nucName]
+            mass = nd * nuc.weight
+            ringMass += mass
+            elementMass[_getElement(nuc)] += mass
+            if nd < threshold * ringTotal and nucName not in keep:
+                report.removed.append((i, nucName, nd))
+                removedAtoms += nd * area
+                ringRemovedMass += mass
+                removedElementMass[_getElement(nuc)] += mass
+            else:
+                kept[nucName] = nd
+        if preserveMass:
+            _restoreElementMasses(kept, elementMass, removedElementMass)
+        if len(kept) < len(ndens):
+            ring.setNumberDensities(kept)
+        totalAtoms += ringTotal * area
+        totalMass += ringMass * area
+        removedMass += ringRemovedMass * area
+        report.numNuclides += len(kept)
+
+    report.atomFraction = removedAtoms / totalAtoms if totalAtoms else 0.0
+    report.massFraction = removedMass / totalMass if totalMass else 0.0
+    return report
+
+
+def _getElement(nuc):
+    # lumped and dummy nuclides have no element and are never rescaled
+    return getattr(nuc, "element", None)
+
+
+def _restoreElementMasses(kept, elementMass, removedElementMass):
+    """Scale the kept isotopes of each pruned element back up to its full mass."""
+    for element, removedMass in removedElementMass.items():
+        keptMass = elementMass[element] - removedMass
+        if element is None or keptMass <= 0.0:
+            continue
+        factor = elementMass[element] / keptMass
+        for nucName, nd in kept.items():
+            if _getElement(nb.byName[nucName]) is element:
+                kept[nucName] = nd * factor
@@ -0,0 +1,100 @@
+"""
+State-point perturbations of Hallam unit cells.
+
+Power-coefficient studies need lattice cases at many fuel temperatures, sodium
+densities, and enrichments. A :py:class:`StatePoint` describes one such case, and
+:py:func:`applyStatePoint` applies it to a copy of a nominal unit cell block, which is
+much cheaper than constructing a new block from blueprints for every case.
+"""
+import copy
+import dataclasses
+import itertools
+
+# Components whose temperature follows the fuel temperature
+FUEL_PIN_COMPONENTS = ("fuel", "bond", "clad")
+SODIUM = "Sodium"
+
+
+@dataclasses.dataclass(frozen=True)
+class StatePoint:
+    """
+    One set of perturbations to a unit cell. ``None`` leaves a parameter nominal.
+
+    Attributes
+    ----------
+    fuelTempC : float
+        Temperature of the fuel pins (fuel, bond, and clad) in C.
+    sodiumDensityFactor : float
+        Multiplier on the number densities of all sodium components.
+    enrichment : float
+        U-235 mass fraction of the uranium in the fuel.
+    """
+
+    fuelTempC: float = None
+    sodiumDensityFactor: float = None
+    enrichment: float = None
+
+    @property
+    def label(self):
+        parts = []
+        if self.fuelTempC is not None:
+            parts.append(f"T{self.fuelTempC:g}")
+        if self.sodiumDensityFactor is not None:
+            parts.append(f"Na{self.sodiumDensityFactor:g}")
+        if self.enrichment is not None:
+            parts.append(f"E{self.enrichment:g}")
+        return "-".join(parts) or "nominal"
+
+    def changedParameters(self, other):
+        """Names of the parameters that differ between two state points."""
+        return [
+            field.name
+            for field in dataclasses.fields(self)
+            if getattr(self, field.name) != getattr(other, field.name)
+        ]
+
+
+def makeGrid(fuelTempsC=None, sodiumDensityFactors=None, enrichments=None):
+    """
+    Build the full factorial grid of state points.
+
+    The first value of each parameter is the reference, so the first state point in
+    the grid is the reference case.
+    """
+    return [
+        StatePoint(fuelTempC, sodiumDensityFactor, enrichment)
+        for fuelTempC, sodiumDensityFactor, enrichment in itertools.product(
+            fuelTempsC or [None], sodiumDensityFactors or [None], enrichments or [None]
+        )
+    ]
+
+
+def applyStatePoint(b, state: StatePoint):
+    """Return a perturbed copy of a block. The original is left alone."""
+    b = copy.deepcopy(b)
+    if state.fuelTempC is not None:
+        for name in FUEL_PIN_COMPONENTS:
+            b.getComponentByName(name).setTemperature(state.fuelTempC)
+    if state.sodiumDensityFactor is not None:
+        for c in b.getComponentsOfMaterial(materialName=SODIUM):
+            c.changeNDensByFactor(state.sodiumDensityFactor)
+    if state.enrichment is not None:
+        setEnrichment(b.getComponentByName("fuel"), state.enrichment)
+    return b
+
+
+def setEnrichment(c, enrichment):
+    """
+    Set the U-235 mass fraction of the uranium in a fuel component.
+
+    The enrichment is applied through the material, as a ``U235_wt_frac`` material
+    modification in the blueprints would be, and the component's number densities
+    are then recomputed from the material at its temperature.
+    """
+    c.material.applyInputParams(U235_wt_frac=enrichment)
+    c.applyMaterialMassFracsToNumberDensities()
+
+
+def reactivity(k):
+    """Reactivity (dk/k) of a multiplication factor."""
+    return (k - 1.0) / k
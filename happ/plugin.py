@@ -5,18 +5,41 @@ This can be used in the standalone Hallam App or as part of a different app.
 """
 from armi import plugins
 from armi import interfaces
-from armi import interfaces
 from armi.reactor.assemblies import HexAssembly
 from armi.settings import setting
 from armi.physics.neutronics import settings as neutronicsSettings
 
 from happ.blocks import HallamBlock
 from happ import components
-from happ.cli import summary
-from happ.cli import makeXS
+from happ import materials
 
 
 CONF_OPT_HALLAM_DRAGON = "Hallam-DRAGON"
+CONF_HALLAM_LATTICE_SELECTION = "hallamLatticeSelection"
+CONF_HALLAM_CLUSTER_TOLERANCE = "hallamLatticeClusterTolerance"
+CONF_HALLAM_DRAGON_WORKERS = "hallamDragonWorkers"
+CONF_HALLAM_DRAGON_CACHE = "hallamDragonCache"
+CONF_HALLAM_DRAGON_CACHE_DIR = "hallamDragonCacheDir"
+CONF_HALLAM_DRAGON_CACHE_SIZE = "hallamDragonCacheSizeMB"
+CONF_HALLAM_DRAGON_ASYNC = "hallamDragonAsync"
+CONF_HALLAM_DRAGON_TIMEOUT = "hallamDragonTimeoutSec"
+CONF_HALLAM_KEEP_DRAGON_DIRS = "hallamKeepDragonDirs"
+CONF_HALLAM_ADAPTIVE_MESH = "hallamAdaptiveMesh"
+CONF_HALLAM_MESH_TOLERANCE = "hallamMeshTolerancePcm"
+CONF_HALLAM_MESH_CACHE = "hallamMeshCachePath"
+CONF_HALLAM_SHIELDING_REUSE = "hallamShieldingReuse"
+CONF_HALLAM_SHIELDING_TOLERANCE = "hallamShieldingTolerance"
+CONF_HALLAM_BUCKLING_SEARCH = "hallamCriticalBucklingSearch"
+CONF_HALLAM_BUCKLING_TOLERANCE = "hallamBucklingSearchTolerancePcm"
+CONF_HALLAM_PRUNE = "hallamPruneTraceNuclides"
+CONF_HALLAM_PRUNE_THRESHOLD = "hallamPruneThreshold"
+CONF_HALLAM_PRUNE_PRESERVE_MASS = "hallamPrunePreserveMass"
+CONF_HALLAM_MERGE_MIXTURES = "hallamMergeMixtures"
+CONF_HALLAM_MERGE_TOLERANCE = "hallamMixtureMergeTolerance"
+CONF_HALLAM_DENSITY_TABLES = "hallamDensityTables"
+
+LATTICE_SELECTION_BASIC_FUEL = "basic fuel"
+LATTICE_SELECTION_CORE = "core"
 ORDER = interfaces.STACK_ORDER.CROSS_SECTIONS
 
 
@@ -26,9 +49,10 @@ class HallamPhysicsPlugin(plugins.ArmiPlugin):
     @staticmethod
     @plugins.HOOKIMPL
     def exposeInterfaces(cs):
-        from happ.latticeInterface import HallamLatticeInterface
-
         if cs["xsKernel"] == CONF_OPT_HALLAM_DRAGON:
+            # DRAGON-dependent modules are only imported when they will be used
+            from happ.latticeInterface import HallamLatticeInterface
+
             klass = HallamLatticeInterface
             return [interfaces.InterfaceInfo(ORDER, klass, {})]
 
@@ -50,12 +74,25 @@ class HallamPhysicsPlugin(plugins.ArmiPlugin):
         """Register the custom parameters"""
         return {components.ScallopedHex: components.getScallopedHexParamDefs()}
 
+    @staticmethod
+    @plugins.HOOKIMPL
+    def beforeReactorConstruction(cs):
+        """Set up the Hallam materials before any components are built"""
+        materials.applyDensityTableSetting(cs)
+
     @staticmethod
     @plugins.HOOKIMPL
     def defineEntryPoints():
+        from happ.cli import summary
+        from happ.cli import benchmark
+        from happ.cli import sweep
+        from happ.cli import makeXS
+
         return [
             summary.HallamTables,
-            # makeXS.MakeXSEntryPoint
+            benchmark.HallamBenchmarks,
+            sweep.HallamSweep,
+            makeXS.MakeXSEntryPoint,
         ]
 
     @staticmethod
@@ -65,5 +102,226 @@ class HallamPhysicsPlugin(plugins.ArmiPlugin):
         settings = [
             # add XS kernel option for the Hallam 1-D mode
             setting.Option(CONF_OPT_HALLAM_DRAGON, neutronicsSettings.CONF_XS_KERNEL),
+            setting.Setting(
+                CONF_HALLAM_LATTICE_SELECTION,
+                default=LATTICE_SELECTION_BASIC_FUEL,
+                label="Hallam lattice block selection",
+                description=(
+                    "Which blocks to run lattice physics on. `basic fuel` runs the "
+                    "blueprint basic fuel cell only. `core` runs one representative "
+                    "of each unique converted unit cell in the core."
+                ),
+                options=[LATTICE_SELECTION_BASIC_FUEL, LATTICE_SELECTION_CORE],
+            ),
+            setting.Setting(
+                CONF_HALLAM_CLUSTER_TOLERANCE,
+                default=0.0,
+                label="Hallam lattice clustering tolerance",
+                description=(
+                    "In `core` selection mode, unit cells whose ring diameters, "
+                    "temperatures, and number densities are all within this relative "
+                    "difference of another cell share its lattice results. 0 only "
+                    "shares results between identical cells. This is a composition "
+                    "distance, not a cross section error: it bounds the change in "
+                    "macroscopic cross sections only for fixed microscopic ones."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_DRAGON_WORKERS,
+                default=1,
+                label="DRAGON worker processes",
+                description=(
+                    "Number of DRAGON cases to run at once on this node. "
+                    "1 runs them serially."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_DRAGON_CACHE,
+                default=False,
+                label="Cache DRAGON results",
+                description=(
+                    "Reuse DRAGON outputs from earlier runs with byte-for-byte "
+                    "identical inputs, nuclear data, and executable. The outputs are "
+                    "kept in `hallamDragonCacheDir`."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_DRAGON_CACHE_DIR,
+                default="",
+                label="DRAGON cache directory",
+                description=(
+                    "Where cached DRAGON results are stored when `hallamDragonCache` "
+                    "is on. Defaults to ~/.happ/dragonCache, shared by all cases, if "
+                    "empty."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_DRAGON_CACHE_SIZE,
+                default=2000.0,
+                label="DRAGON cache size (MB)",
+                description=(
+                    "Size of the DRAGON result cache above which the least "
+                    "recently used results are evicted."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_DRAGON_ASYNC,
+                default=False,
+                label="Follow DRAGON output live",
+                description=(
+                    "Run DRAGON cases as asyncio subprocesses of the ARMI process, "
+                    "reading their output as it is written so cases that hit a fatal "
+                    "error are killed right away. Up to `hallamDragonWorkers` cases "
+                    "run at once."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_DRAGON_TIMEOUT,
+                default=0.0,
+                label="DRAGON case timeout (s)",
+                description=(
+                    "Wall-clock time after which a DRAGON case is killed and treated "
+                    "as failed. 0 means no limit."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_KEEP_DRAGON_DIRS,
+                default=False,
+                label="Keep DRAGON working directories",
+                description=(
+                    "Keep the directories DRAGON cases run in (named hallam-* in the "
+                    "case directory) for debugging, instead of removing them once the "
+                    "outputs are read."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_ADAPTIVE_MESH,
+                default=False,
+                label="Adapt Hallam radial mesh",
+                description=(
+                    "Choose the number of sub-regions in each ring by refining and "
+                    "coarsening until k-inf converges, once per block design. "
+                    "Otherwise fuel and moderator rings are split in 5."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_MESH_TOLERANCE,
+                default=10.0,
+                label="Radial mesh k-inf tolerance (pcm)",
+                description=(
+                    "Largest change in k-inf from the finest mesh tried that an "
+                    "adapted mesh may introduce."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_MESH_CACHE,
+                default="",
+                label="Adapted radial mesh file",
+                description=(
+                    "JSON file where adapted meshes are saved and reused. A mesh is "
+                    "only reused for the same block design, unit cell geometry and "
+                    "composition, and nuclear data. Defaults to "
+                    "~/.happ/meshSplits.json if empty."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_SHIELDING_REUSE,
+                default=False,
+                label="Reuse self-shielded libraries",
+                description=(
+                    "Save the self-shielded library of each DRAGON case and start "
+                    "later cases with the same resonance state from it, skipping "
+                    "self-shielding."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_SHIELDING_TOLERANCE,
+                default=1e-3,
+                label="Self-shielding reuse tolerance",
+                description=(
+                    "Largest relative difference in ring radii, mixture temperatures, "
+                    "and number densities (of resonance absorbers and of the "
+                    "background nuclides that dilute them) at which a saved "
+                    "self-shielded library is reused."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_BUCKLING_SEARCH,
+                default=False,
+                label="Search for critical buckling",
+                description=(
+                    "Iterate on the B1 buckling of each unit cell until it is "
+                    "critical, and generate its cross sections at that buckling."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_BUCKLING_TOLERANCE,
+                default=1.0,
+                label="Critical buckling k-eff tolerance (pcm)",
+                description="How close to 1 k-eff must be to end the buckling search.",
+            ),
+            setting.Setting(
+                CONF_HALLAM_PRUNE,
+                default=False,
+                label="Prune trace nuclides",
+                description=(
+                    "Leave nuclides at trace densities out of the DRAGON mixtures, "
+                    "and report what was left out and its estimated reactivity "
+                    "effect. Strong absorbers such as Xe-135 and Sm-149 are always "
+                    "kept."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_PRUNE_THRESHOLD,
+                default=1e-7,
+                label="Trace nuclide threshold",
+                description=(
+                    "Nuclides below this fraction of their ring's total number "
+                    "density are pruned."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_PRUNE_PRESERVE_MASS,
+                default=True,
+                label="Preserve mass when pruning",
+                description=(
+                    "Scale up the isotopes left of each element that lost some to "
+                    "pruning, so that the element's mass in each ring is unchanged. "
+                    "Other nuclides are not changed."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_MERGE_MIXTURES,
+                default=False,
+                label="Merge matching DRAGON mixtures",
+                description=(
+                    "Write rings with matching compositions and temperatures as one "
+                    "DRAGON mixture shared in the geometry."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_MERGE_TOLERANCE,
+                default=0.0,
+                label="Mixture merging tolerance",
+                description=(
+                    "Largest relative difference in temperature and in each number "
+                    "density at which two rings share a mixture. 0 merges only "
+                    "identical mixtures."
+                ),
+            ),
+            setting.Setting(
+                CONF_HALLAM_DENSITY_TABLES,
+                default=False,
+                label="Tabulate Hallam material densities and expansion",
+                description=(
+                    "Look up the densities and linear expansion factors of Hallam "
+                    "materials between 20 and 1000 C in tables interpolated on a 5 K "
+                    "grid, instead of computing them each time. The expansion factors "
+                    "are what thermally expands component dimensions, so this speeds "
+                    "up component areas and volumes. Expansion that is linear in "
+                    "temperature is reproduced to round-off; densities have a "
+                    "relative error around 1e-8."
+                ),
+            ),
         ]
         return settings
@@ -0,0 +1,144 @@
+"""
+Reuse of self-shielded DRAGON libraries between cases with the same resonance state.
+
+Self-shielding (``SHI:``) is one of the most expensive steps of a lattice case, yet
+many perturbations (e.g. small changes in sodium density or buckling) hardly change
+the resonance absorbers it depends on. In the two-phase mode, the first case of each
+resonance state is run in full and saves its self-shielded library to the
+:py:data:`SHIELDED_LIBRARY` file. Later cases whose resonance state is within a
+tolerance start from a copy of that library, update its number densities, and go
+straight to tracking and flux.
+
+The resonance state of a case is its nuclear data, ring radii and mixtures, and the
+temperature and number densities of each mixture. Both the resonance absorbers and
+the background nuclides (e.g. sodium, carbon, oxygen, and helium) are included, since
+the background sets the dilution the absorbers are shielded at.
+"""
+import hashlib
+import os
+import shutil
+
+import numpy
+
+# Name of the saved self-shielded library, as declared in the DRAGON template
+SHIELDED_LIBRARY = "SHIELDED"
+
+MODE_SAVE = "save"
+MODE_REUSE = "reuse"
+
+
+def getResonanceState(templateData):
+    """
+    Get what self-shielding depends on from the data used to render a case.
+
+    Each mixture has its temperature, the number densities of its resonance
+    absorbers (``ndens``), and those of the other nuclides, which make up the
+    background that dilutes them (``background``).
+    """
+    return {
+        "nucData": templateData["nucData"],
+        "radii": [float(radius) for radius in templateData["radii"]],
+        "ringMixtures": list(templateData["ringMixtures"]),
+        "mixtures": [_getMixtureState(mixture) for mixture in templateData["mixtures"]],
+    }
+
+
+def _getMixtureState(mixture):
+    state = {"tempK": float(mixture.getTempInK()), "ndens": {}, "background": {}}
+    for mixNuc in mixture.getMixVector():
+        group = "ndens" if str(mixNuc.selfshield).strip() else "background"
+        state[group][f"{mixNuc.armiName}{mixNuc.xsid}"] = float(mixNuc.ndens)
+    return state
+
+
+def getStateDistance(state, other):
+    """
+    Largest relative difference between two resonance states.
+
+    States with different nuclear data, numbers of rings or mixtures, assignments of
+    mixtures to rings, or resonance absorber or background nuclides are infinitely
+    far apart.
+    """
+    if (
+        state["nucData"] != other["nucData"]
+        or len(state["radii"]) != len(other["radii"])
+        or state["ringMixtures"] != other["ringMixtures"]
+        or len(state["mixtures"]) != len(other["mixtures"])
+    ):
+        return numpy.inf
+    values, refs = list(state["radii"]), list(other["radii"])
+    for mixture, otherMixture in zip(state["mixtures"], other["mixtures"]):
+        values.append(mixture["tempK"])
+        refs.append(otherMixture["tempK"])
+        for group in ("ndens", "background"):
+            densities, otherDensities = mixture[group], otherMixture[group]
+            if densities.keys() != otherDensities.keys():
+                return numpy.inf
+            values.extend(densities.values())
+            refs.extend(otherDensities[nuc] for nuc in densities)
+    values, refs = numpy.array(values), numpy.array(refs)
+    diffs = numpy.abs(values - refs)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        relDiffs = numpy.where(diffs > 0, diffs / numpy.abs(refs), 0.0)
+    return float(relDiffs.max(initial=0.0))
+
+
+class ShieldedLibraryStore:
+    """
+    Self-shielded libraries saved during a run, with the resonance states they are for.
+
+    Parameters
+    ----------
+    root : str
+        Directory to keep the libraries in. Created if needed.
+    tolerance : float
+        Largest relative difference in resonance state (see
+        :py:func:`getStateDistance`) at which a library is reused.
+    """
+
+    def __init__(self, root, tolerance):
+        self.root = root
+        self.tolerance = tolerance
+        self.entries = []
+        self.reused = 0
+        os.makedirs(root, exist_ok=True)
+
+    def matches(self, state, other):
+        return getStateDistance(state, other) <= self.tolerance
+
+    def find(self, state):
+        """
+        Find the saved library closest to a resonance state, within the tolerance.
+
+        This only looks; the caller counts the library as reused (in
+        :py:attr:`reused`) once a case that uses it is actually run.
+
+        Returns
+        -------
+        key, path : str
+            Content hash and path of the library, or None, None.
+        """
+        best, bestDistance = None, numpy.inf
+        for entry in self.entries:
+            distance = getStateDistance(state, entry["state"])
+            if distance <= self.tolerance and distance < bestDistance:
+                best, bestDistance = entry, distance
+        if best is None:
+            return None, None
+        return best["key"], best["path"]
+
+    def add(self, state, libraryPath):
+        """Save a copy of a self-shielded library made for a resonance state."""
+        with open(libraryPath, "rb") as library:
+            key = hashlib.sha256(library.read()).hexdigest()
+        path = os.path.join(self.root, key[:16], SHIELDED_LIBRARY)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copy(libraryPath, path)
+        self.entries.append({"state": state, "key": key, "path": path})
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} {self.root}: {len(self.entries)} libraries, "
+            f"reused {self.reused} times>"
+        )
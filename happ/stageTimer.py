@@ -0,0 +1,207 @@
+"""
+Wall time, CPU time, and memory of each stage of the Hallam lattice pipeline.
+
+A lattice step goes through block selection, conversion to unit cells, rendering the
+DRAGON inputs, running DRAGON, and reading back the ISOTXS files. Each stage is
+timed (for each case where that makes sense) with :py:meth:`StageTimer.time`, and the
+records are tagged with the time node they belong to so they can be summed per node
+and per cycle.
+
+CPU time includes child processes that finished during the stage, so it covers
+DRAGON itself. Memory is measured in two ways. Each stage records how much the
+resident set of this process grew from its start to its end, which shows what the
+stage kept in memory (transient peaks inside a stage are not seen). Each DRAGON case
+records the peak resident set of its own DRAGON process, where the runner could get
+it (see :py:attr:`happ.dragonRunner.DragonResult.peakMemoryMB`).
+"""
+import collections
+import contextlib
+import json
+import os
+import time
+
+import psutil
+import tabulate
+
+SELECTION = "selection"
+TRANSFORM = "transform"
+RENDER = "render"
+DRAGON = "dragon"
+# time each case spent in DRAGON; with parallel workers this adds up to more than DRAGON
+DRAGON_CASE = "dragon case"
+READBACK = "readback"
+STAGES = (SELECTION, TRANSFORM, RENDER, DRAGON, DRAGON_CASE, READBACK)
+
+
+class StageTimer:
+    """Records of how long each stage took, by time node."""
+
+    def __init__(self):
+        self.records = []
+        self.cycle = None
+        self.node = None
+
+    def startNode(self, cycle, node):
+        """Tag the records that follow with a time node."""
+        self.cycle = cycle
+        self.node = node
+
+    @contextlib.contextmanager
+    def time(self, stage, case=None):
+        """
+        Time a stage, optionally for a single case.
+
+        Stages may nest (e.g. rendering inside a serial DRAGON run), in which case
+        the outer stage includes the inner one.
+        """
+        startWall = time.perf_counter()
+        startCpu = _cpuTime()
+        startMemory = _residentMemoryMB()
+        try:
+            yield
+        finally:
+            self.add(
+                stage,
+                case,
+                time.perf_counter() - startWall,
+                _cpuTime() - startCpu,
+                memoryGrowthMB=_residentMemoryMB() - startMemory,
+            )
+
+    def add(
+        self, stage, case, wallSec, cpuSec=None, memoryGrowthMB=None, peakMemoryMB=None
+    ):
+        """
+        Add a record measured elsewhere (e.g. the run time of a DRAGON case).
+
+        ``memoryGrowthMB`` is how much this process's resident set grew during the
+        stage, and ``peakMemoryMB`` the peak resident set of a DRAGON process.
+        """
+        self.records.append(
+            {
+                "cycle": self.cycle,
+                "node": self.node,
+                "stage": stage,
+                "case": case,
+                "wallSec": wallSec,
+                "cpuSec": cpuSec,
+                "memoryGrowthMB": memoryGrowthMB,
+                "peakMemoryMB": peakMemoryMB,
+            }
+        )
+
+    def summarize(self, cycle=None):
+        """
+        Sum the records of each time node and stage.
+
+        Parameters
+        ----------
+        cycle : int, optional
+            Only summarize this cycle.
+
+        Returns
+        -------
+        list of dict
+            One per time node and stage, with the number of records, total wall and
+            CPU time, total resident set growth, and the highest DRAGON peak.
+        """
+        totals = collections.OrderedDict()
+        for record in self.records:
+            if cycle is not None and record["cycle"] != cycle:
+                continue
+            key = (record["cycle"], record["node"], record["stage"])
+            total = totals.setdefault(
+                key,
+                {
+                    "cycle": key[0],
+                    "node": key[1],
+                    "stage": key[2],
+                    "count": 0,
+                    "wallSec": 0.0,
+                    "cpuSec": 0.0,
+                    "memoryGrowthMB": None,
+                    "peakMemoryMB": None,
+                },
+            )
+            total["count"] += 1
+            total["wallSec"] += record["wallSec"]
+            total["cpuSec"] += record["cpuSec"] or 0.0
+            if record["memoryGrowthMB"] is not None:
+                total["memoryGrowthMB"] = (
+                    total["memoryGrowthMB"] or 0.0
+                ) + record["memoryGrowthMB"]
+            if record["peakMemoryMB"] is not None:
+                total["peakMemoryMB"] = max(
+                    total["peakMemoryMB"] or 0.0, record["peakMemoryMB"]
+                )
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        return sorted(
+            totals.values(),
+            key=lambda t: (
+                -1 if t["cycle"] is None else t["cycle"],
+                -1 if t["node"] is None else t["node"],
+                order.get(t["stage"], len(order)),
+            ),
+        )
+
+    def makeTable(self, cycle=None):
+        """Format :py:meth:`summarize` as a text table."""
+        rows = [
+            (
+                t["cycle"],
+                t["node"],
+                t["stage"],
+                t["count"],
+                t["wallSec"],
+                t["cpuSec"],
+                t["memoryGrowthMB"],
+                t["peakMemoryMB"],
+            )
+            for t in self.summarize(cycle)
+        ]
+        header = [
+            "Cycle",
+            "Node",
+            "Stage",
+            "Count",
+            "Wall (s)",
+            "CPU (s)",
+            "RSS growth (MB)",
+            "DRAGON peak (MB)",
+        ]
+        return tabulate.tabulate(rows, headers=header, floatfmt=".3f")
+
+    def writeJson(self, path):
+        """Write every record and the per-node summary to a JSON sidecar file."""
+        with open(path, "w") as f:
+            json.dump(
+                {"summary": self.summarize(), "records": self.records}, f, indent=1
+            )
+
+    def reset(self):
+        """Drop all records, e.g. at the start of a run."""
+        self.records = []
+        self.cycle = None
+        self.node = None
+
+    @contextlib.contextmanager
+    def discarding(self):
+        """Drop the records added inside this context, e.g. by benchmarks."""
+        numRecords = len(self.records)
+        try:
+            yield
+        finally:
+            del self.records[numRecords:]
+
+
+def _cpuTime():
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _residentMemoryMB():
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+
+# Timer shared by the lattice interface and the executers and writers it creates
+TIMER = StageTimer()
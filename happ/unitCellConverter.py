@@ -33,12 +33,33 @@ then has the equivalent of 5 basic fuel cells around it.
 from dataclasses import dataclass
 from typing import List
 
+import numpy
+
+from armi import runLog
 from armi.reactor.converters import blockConverters
 from armi.reactor.components import Component
 from armi.reactor import blocks
 from armi.reactor import components
 from armi.utils import flags
 
+from happ import areaCache
+
+
+# Names of the components that make up each ring, from the inside moving out.
+RING_LAYOUT = (
+    ("center hole",),
+    ("center tube", "spacers", "fuel", "clad", "bond", "coolant"),
+    ("process tube",),
+    ("moderator coolant annulus", "moderator clad"),
+    ("moderator", "moderator coolant gap"),
+)
+
+
+def canConvert(block):
+    """Return True if the block has all the components needed to build the rings."""
+    names = {c.name for c in block}
+    return all(name in names for ringNames in RING_LAYOUT for name in ringNames)
+
 
 @dataclass
 class RingSpec:
@@ -55,14 +76,29 @@ class HallamUnitCellConverter(blockConverters.BlockConverter):
 
     def __init__(self, sourceBlock, quiet=False):
         blockConverters.BlockConverter.__init__(self, sourceBlock, quiet=quiet)
+        self._ringLayout = getRingLayout(sourceBlock)
+        self._childNames = _getChildNames(sourceBlock)
         self.ringSpecs = []
+        self._blendedRings = []
+        self.convertedBlock = None
+        self._buildRingSpecs()
 
-        self.convertedBlock = blocks.ThRZBlock(
-            name=sourceBlock.name + "-cyl", height=sourceBlock.getHeight()
-        )
-        self.convertedBlock.setLumpedFissionProducts(
-            sourceBlock.getLumpedFissionProductCollection()
-        )
+    def setSourceBlock(self, sourceBlock):
+        """
+        Point the converter at another block, e.g. a perturbed copy of the last one.
+
+        Blended rings are kept, so converting a block of the same design only
+        re-blends the rings whose components differ from the last conversion. The
+        ring layout is worked out again if the block's children are not the same,
+        in the same order, as those of the last block.
+        """
+        if sourceBlock is self._sourceBlock:
+            return
+        self._sourceBlock = sourceBlock
+        childNames = _getChildNames(sourceBlock)
+        if childNames != self._childNames:
+            self._ringLayout = getRingLayout(sourceBlock)
+            self._childNames = childNames
         self._buildRingSpecs()
 
     def _buildRingSpecs(self):
@@ -71,73 +107,239 @@ class HallamUnitCellConverter(blockConverters.BlockConverter):
 
         Height and inner radius will be added during conversion.
         """
-        sbn = self._sourceBlock.getComponentByName
+        children = list(self._sourceBlock)
         height = self._sourceBlock.getHeight()
         self.ringSpecs = [
-            RingSpec(components=[sbn("center hole"),], heightCm=height),
-            RingSpec(
-                components=[
-                    sbn("center tube"),
-                    sbn("spacers"),
-                    sbn("fuel"),
-                    sbn("clad"),
-                    sbn("bond"),
-                    sbn("coolant"),
-                ],
-                heightCm=height,
-            ),
-            RingSpec(components=[sbn("process tube")], heightCm=height),
-            RingSpec(
-                components=[sbn("moderator coolant annulus"), sbn("moderator clad")],
-                heightCm=height,
-            ),
-            RingSpec(
-                components=[sbn("moderator"), sbn("moderator coolant gap")],
-                heightCm=height,
-            ),
+            RingSpec(components=[children[i] for i in ringIndices], heightCm=height)
+            for ringIndices in self._ringLayout
         ]
 
     def convert(self):
+        """
+        Convert the source block into concentric rings.
+
+        The first call blends every ring. Later calls (e.g. after perturbing the
+        temperature of the fuel pins in the source block) only re-blend the rings
+        whose components changed since the last call; the others keep their area
+        and composition and only get a new inner diameter. Every call returns a new
+        block of new rings, so blocks returned earlier are never changed.
+        """
+        self.convertedBlock = blocks.ThRZBlock(
+            name=self._sourceBlock.name + "-cyl", height=self._sourceBlock.getHeight()
+        )
+        self.convertedBlock.setLumpedFissionProducts(
+            self._sourceBlock.getLumpedFissionProductCollection()
+        )
         innerDiam = 0.0
         height = self._sourceBlock.getHeight()
-        for ringSpec in self.ringSpecs:
+        numBlended = 0
+        for i, ringSpec in enumerate(self.ringSpecs):
             ringSpec.innerDiamCm = innerDiam
             ringSpec.heightCm = height
-            ring = _makeRing(ringSpec)
+            blended = self._blendedRings[i] if i < len(self._blendedRings) else None
+            if blended is None or not blended.matches(ringSpec):
+                blended = BlendedRing.fromSpec(ringSpec)
+                # replace this ring's record, or append it on the first conversion
+                self._blendedRings[i : i + 1] = [blended]
+                numBlended += 1
+            ring = blended.makeRing(innerDiam)
             self.convertedBlock.add(ring)
             innerDiam = ring.getDimension("od")
+
+        runLog.debug(
+            f"Converted {self._sourceBlock}, blending {numBlended} of "
+            f"{len(self.ringSpecs)} rings"
+        )
         return self.convertedBlock
 
 
+@dataclass
+class BlendedRing:
+    """
+    Area, temperature, and composition of a ring blended from its components.
+
+    The state of the components it was blended from is kept so later conversions
+    can tell whether it is still valid without recomputing areas or copying number
+    densities.
+    """
+
+    area: float
+    tempInC: float
+    flags: flags.Flag
+    nDensities: dict
+    fraction: float
+    componentStates: tuple
+    componentDensities: tuple
+
+    @classmethod
+    def fromSpec(cls, ringSpec: RingSpec):
+        """
+        Blend the components of a ring specification.
+
+        The ring area is the total area of its constituents, and its number densities
+        are their area-weighted average. These are computed straight from the source
+        components rather than by building and querying a throwaway block.
+        """
+        comps = ringSpec.components
+        flag = flags.Flag()
+        for c in comps:
+            flag |= c.p.flags
+
+        areas = numpy.array([c.getArea() for c in comps])
+        # here we lose a bit of identity of the constituents.
+        # it would be a bit nicer if we could add components to components
+        nucNames, nDensities = blendNumberDensities(comps, areas)
+        nDensities *= ringSpec.fraction
+        return cls(
+            area=areas.sum() * ringSpec.fraction,
+            tempInC=sum(c.temperatureInC for c in comps) / len(comps),
+            flags=flag,
+            nDensities=dict(zip(nucNames, nDensities.tolist())),
+            fraction=ringSpec.fraction,
+            componentStates=tuple(_getComponentState(c) for c in comps),
+            componentDensities=tuple(dict(c.getNumberDensities()) for c in comps),
+        )
+
+    def matches(self, ringSpec: RingSpec):
+        """Check whether the components of a ring are as they were when blended."""
+        comps = ringSpec.components
+        return (
+            ringSpec.fraction == self.fraction
+            and len(comps) == len(self.componentStates)
+            and all(
+                _getComponentState(c) == state
+                for c, state in zip(comps, self.componentStates)
+            )
+            and all(
+                c.p.numberDensities == densities
+                for c, densities in zip(comps, self.componentDensities)
+            )
+        )
+
+    def makeRing(self, innerDiamCm):
+        """Make a circle component of this ring starting at an inner diameter."""
+        outerDiamCm = blockConverters.getOuterDiamFromIDAndArea(innerDiamCm, self.area)
+        ring = components.Circle(
+            "convertedRing",
+            "Custom",
+            self.tempInC,
+            self.tempInC,
+            od=outerDiamCm,
+            id=innerDiamCm,
+            mult=1,
+        )
+        ring.p.flags = self.flags
+        # copied so that changes to the ring (e.g. pruning) do not reach this record
+        ring.setNumberDensities(dict(self.nDensities))
+        return ring
+
+
+def _getComponentState(c):
+    """
+    Get what a component's area depends on, besides its number densities.
+
+    Dimensions are compared as stored (cold, or as links to other components), so
+    nothing is computed. Area-cached components also carry their cache version, and
+    linked dimensions the state of the components they are linked to.
+    """
+    return (
+        c.temperatureInC,
+        c.p.flags,
+        areaCache.getVersion(c),
+        tuple(c.p[name] for name in c.DIMENSION_NAMES),
+    ) + areaCache.getLinkedState(c, c.DIMENSION_NAMES)
+
+
+def getRingLayout(block):
+    """
+    Get which children of a block go into which ring.
+
+    Returns
+    -------
+    tuple of tuple of int
+        For each ring in :py:data:`RING_LAYOUT`, the indices of its components
+        among the block's children.
+    """
+    indices = {c.name: i for i, c in enumerate(block)}
+    return tuple(
+        tuple(indices[name] for name in ringNames) for ringNames in RING_LAYOUT
+    )
+
+
+def _getChildNames(block):
+    return tuple(c.name for c in block)
+
+
+def convertBlocks(sourceBlocks, quiet=True):
+    """
+    Convert many blocks to 1-D unit cells.
+
+    Blocks of the same design (block type) share one converter, so the ring layout
+    is worked out once per design and each block only re-blends the rings whose
+    components differ from those of the block converted before it.
+
+    Returns
+    -------
+    list of ThRZBlock
+        Converted blocks in the same order as ``sourceBlocks``.
+    """
+    converters = {}
+    converted = []
+    for b in sourceBlocks:
+        converter = converters.get(b.getType())
+        if converter is None:
+            converter = HallamUnitCellConverter(b, quiet=quiet)
+            converters[b.getType()] = converter
+        else:
+            converter.setSourceBlock(b)
+        converted.append(converter.convert())
+    return converted
+
+
 def _makeRing(ringSpec: RingSpec):
     """Given a ring specification, make a circle component representing it."""
+    return BlendedRing.fromSpec(ringSpec).makeRing(ringSpec.innerDiamCm)
 
-    blender = blocks.Block(name="blender")
-    flag = flags.Flag()
-    for c in ringSpec.components:
-        blender.add(components.UnshapedComponent.fromComponent(c))
-        flag |= c.p.flags
 
-    area = blender.getVolume() / ringSpec.heightCm * ringSpec.fraction
+def blendNumberDensities(comps, weights):
+    """
+    Compute weighted-average number densities of several components.
 
-    tempInC = sum(c.temperatureInC for c in ringSpec.components) / len(
-        ringSpec.components
-    )
+    All nuclides are accumulated into one array over a nuclide index shared by the
+    components, rather than by merging dictionaries.
 
-    outerDiamCm = blockConverters.getOuterDiamFromIDAndArea(ringSpec.innerDiamCm, area)
-    ring = components.Circle(
-        "convertedRing",
-        "Custom",
-        tempInC,
-        tempInC,
-        od=outerDiamCm,
-        id=ringSpec.innerDiamCm,
-        mult=1,
-    )
-    ring.p.flags = flag
-    # here we lose a bit of identity of the constituents.
-    # it would be a bit nicer if we could add components to components
-    nDensities = blender.getNumberDensities()
-    nDensities = {k: v * ringSpec.fraction for k, v in nDensities.items()}
-    ring.setNumberDensities(nDensities)
-    return ring
+    Parameters
+    ----------
+    comps : list of Component
+        Components to blend.
+    weights : numpy.ndarray
+        Weight of each component (e.g. area or volume).
+
+    Returns
+    -------
+    nucNames : list of str
+        Nuclide names, indexing ``nDensities``.
+    nDensities : numpy.ndarray
+        Blended number densities in atoms/bn-cm.
+    """
+    compDensities = [c.getNumberDensities() for c in comps]
+    nucIndex = {}
+    for densities in compDensities:
+        for nucName in densities:
+            nucIndex.setdefault(nucName, len(nucIndex))
+
+    blended = numpy.zeros(len(nucIndex))
+    for weight, densities in zip(weights, compDensities):
+        indices = numpy.fromiter(
+            (nucIndex[nucName] for nucName in densities),
+            dtype=int,
+            count=len(densities),
+        )
+        blended[indices] += weight * numpy.fromiter(
+            densities.values(), dtype=float, count=len(densities)
+        )
+
+    totalWeight = numpy.sum(weights)
+    if totalWeight:
+        blended /= totalWeight
+    return list(nucIndex), blended
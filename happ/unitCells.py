@@ -0,0 +1,72 @@
+"""
+Build Hallam unit cell blocks straight from blueprints.
+
+Constructing a full reactor (and all its interfaces) just to get at a couple of
+unit cells is slow. These helpers load only the blueprints and construct the
+assembly and block designs that are actually needed.
+"""
+from armi.reactor import blueprints
+from armi.reactor.flags import Flags
+
+from happ import materials
+
+BASIC_FUEL = "basic fuel"
+FIVE_ONE_ASSEMBLY = "inner fuel"
+
+# Height the basic fuel cell is built at, in cm
+BASIC_FUEL_HEIGHT = 10.0
+
+
+def loadBlueprints(cs):
+    """
+    Load the blueprints named in the settings and prepare them for construction.
+
+    The Hallam materials are set up per the settings first, as they would be before
+    a reactor is constructed.
+
+    Constructing an assembly is the public way to have the blueprints set up their
+    nuclide flags and assembly designs. The 5/1 cell's assembly is used, and kept on
+    the blueprints for :py:func:`constructFiveOneCell`, so it is only built once.
+    """
+    materials.applyDensityTableSetting(cs)
+    bp = blueprints.loadFromCs(cs)
+    bp.hallamFiveOneAssembly = bp.constructAssem(cs, name=FIVE_ONE_ASSEMBLY)
+    return bp
+
+
+def constructBlock(cs, bp, designName, height=1.0, xsType="A", materialInput=None):
+    """Construct a single block from its blueprint design."""
+    return bp.blockDesigns[designName].construct(
+        cs, bp, 0, 1, height, xsType, materialInput or {}
+    )
+
+
+def constructFiveOneCell(cs, bp):
+    """
+    Construct the 5/1 cell as it is in the core.
+
+    The inner fuel assembly is constructed from its design, so the cell has the
+    height, XS type, and material modifications it has in the core, and the first
+    inner fuel block is returned. The assembly built by :py:func:`loadBlueprints` is
+    used the first time; it is handed out only once, so later calls get cells of
+    their own.
+    """
+    assem = getattr(bp, "hallamFiveOneAssembly", None)
+    if assem is None:
+        assem = bp.constructAssem(cs, name=FIVE_ONE_ASSEMBLY)
+    else:
+        bp.hallamFiveOneAssembly = None
+    return assem.getFirstBlock(Flags.FUEL | Flags.INNER)
+
+
+def constructUnitCells(cs, bp):
+    """
+    Construct the 5/1 and basic fuel unit cells used for comparisons with Aronchick.
+
+    Returns
+    -------
+    bFiveOne, basicFuel : HallamBlock
+    """
+    bFiveOne = constructFiveOneCell(cs, bp)
+    basicFuel = constructBlock(cs, bp, BASIC_FUEL, height=BASIC_FUEL_HEIGHT)
+    return bFiveOne, basicFuel
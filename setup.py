@@ -29,7 +29,7 @@ setup(
     package_data={"happ": []},
     license="Apache 2.0",
     long_description=README,
-    install_requires=["armi", "jinja2"],
+    install_requires=["armi", "jinja2", "numpy", "psutil", "tabulate"],
     keywords=["ARMI"],
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -0,0 +1,68 @@
+"""Tests of choosing representative unit cells and giving them XS IDs."""
+import collections
+
+import pytest
+
+pytest.importorskip("armi")
+
+# pylint: disable=wrong-import-position
+from happ import blockSelection
+
+
+class FakeBlock:
+    def __init__(self, name, xsID):
+        self.name = name
+        self.xsID = xsID
+
+    def getName(self):
+        return self.name
+
+    def getMicroSuffix(self):
+        return self.xsID
+
+
+def _makeGroups(*entries):
+    groups = collections.OrderedDict()
+    for xsID, fingerprint, names in entries:
+        groups[(xsID, fingerprint)] = [FakeBlock(name, xsID) for name in names]
+    return groups
+
+
+def test_differentCellsSharingAnXSIDGetTheirOwn():
+    groups = _makeGroups(
+        ("AA", "cell1", ["b1", "b2"]),
+        ("AA", "cell2", ["b3", "b4"]),
+        ("BA", "cell1", ["b5"]),
+    )
+    newGroups, xsTypes = blockSelection.splitXSIDs(groups, {"A", "B"})
+
+    assert list(newGroups) == [("AA", "cell1"), ("CA", "cell2"), ("BA", "cell1")]
+    # only the blocks of the second cell with XS ID AA change XS type
+    assert xsTypes == {"b3": "C", "b4": "C"}
+
+    selection = blockSelection.BlockSelection(newGroups, xsTypes=xsTypes)
+    assert [b.getName() for b in selection.representatives] == ["b1", "b3", "b5"]
+    blocks = {b.getName(): b for group in groups.values() for b in group}
+    assert selection.getRepresentative(blocks["b2"]).getName() == "b1"
+    assert selection.getRepresentative(blocks["b4"]).getName() == "b3"
+
+
+def test_newXSTypesAreReusedAcrossBurnupGroups():
+    groups = _makeGroups(
+        ("AA", "cell1", ["b1"]),
+        ("AA", "cell2", ["b2"]),
+        ("AB", "cell3", ["b3"]),
+        ("AB", "cell4", ["b4"]),
+        ("AA", "cell5", ["b5"]),
+    )
+    _newGroups, xsTypes = blockSelection.splitXSIDs(groups, {"A"})
+    assert xsTypes == {"b2": "B", "b4": "B", "b5": "C"}
+
+
+def test_groupsShareResultsWhenXSTypesRunOut():
+    groups = _makeGroups(("AA", "cell1", ["b1"]), ("AA", "cell2", ["b2"]))
+    newGroups, xsTypes = blockSelection.splitXSIDs(
+        groups, set(blockSelection.XS_TYPES)
+    )
+    assert xsTypes == {}
+    assert [b.getName() for b in newGroups[("AA", "cell1")]] == ["b1", "b2"]
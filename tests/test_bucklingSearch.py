@@ -0,0 +1,59 @@
+"""Tests of the critical buckling search, with model k-eff curves in place of DRAGON."""
+import math
+
+import pytest
+
+from happ import bucklingSearch
+
+
+def _oneGroup(kinf, migrationArea, calls=None):
+    def runKeff(buckling):
+        if calls is not None:
+            calls.append(buckling)
+        return kinf / (1.0 + migrationArea * buckling)
+
+    return runKeff
+
+
+def test_findsOneGroupCriticalBuckling():
+    # a migration area far from the one used for the second guess
+    runKeff = _oneGroup(1.3, 150.0)
+    result = bucklingSearch.findCriticalBuckling(runKeff, tolerance=1e-7)
+
+    assert result.converged
+    assert abs(result.keff - 1.0) <= 1e-7
+    assert result.keff == runKeff(result.buckling)
+    assert result.buckling == pytest.approx(0.3 / 150.0, rel=1e-6)
+    assert result.numRuns < 10
+
+
+def test_bracketedSearchConverges():
+    # k-eff falls off steeply, so the secant steps overshoot the root
+    def runKeff(buckling):
+        return 1.2 * math.exp(-4000.0 * buckling)
+
+    result = bucklingSearch.findCriticalBuckling(runKeff, tolerance=1e-8, maxRuns=30)
+    assert result.converged
+    assert result.buckling == pytest.approx(math.log(1.2) / 4000.0, rel=1e-6)
+
+
+def test_criticalInitialBucklingNeedsOneRun():
+    calls = []
+    result = bucklingSearch.findCriticalBuckling(_oneGroup(1.0, 400.0, calls))
+    assert calls == [0.0]
+    assert (result.buckling, result.numRuns, result.converged) == (0.0, 1, True)
+
+
+def test_stopsAtMaxRuns():
+    calls = []
+    result = bucklingSearch.findCriticalBuckling(
+        _oneGroup(1.3, 150.0, calls), tolerance=0.0, maxRuns=3
+    )
+    assert not result.converged
+    assert result.numRuns == len(calls) == 3
+    assert result.buckling == calls[-1]
+
+
+def test_missingKeffRaises():
+    with pytest.raises(RuntimeError):
+        bucklingSearch.findCriticalBuckling(lambda buckling: None)
@@ -0,0 +1,105 @@
+"""Tests of the Hallam scalloped hex area calculations."""
+import math
+
+import numpy
+import pytest
+
+armi = pytest.importorskip("armi")
+
+# pylint: disable=wrong-import-position
+from happ import components
+
+NUM_RANDOM = 20000
+
+
+def _makeDimensions(rng, size):
+    op = rng.uniform(30.0, 45.0, size)
+    ip = numpy.where(rng.random(size) < 0.5, 0.0, op - rng.uniform(0.01, 1.0, size))
+    sradius = rng.uniform(4.0, 7.0, size)
+    offset = rng.uniform(0.05, 0.5, size)
+    mult = rng.choice([0.5, 1.0, 3.0], size)
+    return op, ip, sradius, offset, mult
+
+
+def _scalarArea(op, ip, sradius, offset, mult):
+    """The per-component formula, one set of dimensions at a time."""
+    area = math.sqrt(3.0) / 2.0 * (op ** 2 - ip ** 2)
+    area *= mult
+    angle = math.atan(offset / sradius)
+    circleFraction = 2.0 * (components.ONE_THIRD - angle) / components.ONE_THIRD
+    scallopArea = circleFraction * math.pi * sradius ** 2
+    area -= scallopArea * mult
+    if ip:
+        area += scallopArea * mult
+    return area
+
+
+def test_batchMatchesScalarFormula():
+    rng = numpy.random.default_rng(20211)
+    dims = _makeDimensions(rng, NUM_RANDOM)
+    batch = components.computeScallopedHexAreas(*dims)
+    scalar = numpy.array([_scalarArea(*args) for args in zip(*map(list, dims))])
+    # numpy.arctan and math.atan may round differently in the last place
+    assert numpy.allclose(batch, scalar, rtol=1e-13, atol=0.0)
+
+
+@pytest.mark.parametrize("cold", [True, False])
+def test_batchMatchesComponents(cold):
+    if not armi.isConfigured():
+        armi.configure()
+    rng = numpy.random.default_rng(7)
+    comps = []
+    for i, (op, ip, sradius, offset, mult) in enumerate(
+        zip(*map(list, _makeDimensions(rng, 500)))
+    ):
+        comps.append(
+            components.ScallopedHex(
+                f"moderator {i}",
+                "Graphite",
+                Tinput=20.0,
+                Thot=float(rng.uniform(20.0, 600.0)),
+                op=op,
+                ip=ip,
+                sradius=sradius,
+                offset=offset,
+                mult=mult,
+            )
+        )
+    batch = components.getScallopedHexAreas(comps, cold=cold)
+    single = numpy.array([c.getComponentArea(cold=cold) for c in comps])
+    # vectorized arctan may round differently for a long array than for one value
+    assert numpy.allclose(batch, single, rtol=1e-13, atol=0.0)
+
+    # evaluating at each component's own temperature gives its hot area
+    if not cold:
+        atTemp = [
+            components.getScallopedHexAreas([c], Tc=c.temperatureInC)[0]
+            for c in comps
+        ]
+        assert numpy.allclose(atTemp, single, rtol=1e-13, atol=0.0)
+
+
+def test_areaCacheInvalidation():
+    if not armi.isConfigured():
+        armi.configure()
+    c = components.ScallopedHex(
+        "moderator",
+        "Graphite",
+        Tinput=20.0,
+        Thot=20.0,
+        op=40.4114,
+        sradius=6.03504,
+        offset=0.24384,
+        mult=0.5,
+    )
+    cold = c.getComponentArea()
+    assert c.getComponentArea() == cold
+
+    c.setTemperature(454.44)
+    hot = c.getComponentArea()
+    assert hot != cold
+    assert hot == c._computeComponentArea(cold=False)
+
+    c.setDimension("op", 40.0)
+    assert c.getComponentArea() == c._computeComponentArea(cold=False)
+    assert c.getComponentArea() != hot
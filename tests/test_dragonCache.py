@@ -0,0 +1,69 @@
+"""Tests of the on-disk DRAGON result cache, with outputs written by hand."""
+import pytest
+
+pytest.importorskip("armi")
+
+# pylint: disable=wrong-import-position
+from happ import dragonCache
+from happ import dragonRunner
+
+OUTPUT_BYTES = 1000
+
+
+def _makeCase(tmp_path, label, inputText, withOutputs=True):
+    workingDir = tmp_path / label
+    workingDir.mkdir()
+    (workingDir / "case.x2m").write_text(inputText)
+    if withOutputs:
+        (workingDir / f"{label}.out").write_text("o" * OUTPUT_BYTES)
+        (workingDir / "ISOTXS000001").write_text("x" * OUTPUT_BYTES)
+    return dragonRunner.DragonCase(
+        label=label,
+        workingDir=str(workingDir),
+        executablePath="dragon",
+        inputName="case.x2m",
+        outputName=f"{label}.out",
+    )
+
+
+def test_fetchCopiesOutputsUnderTheCaseOutputName(tmp_path):
+    cache = dragonCache.DragonResultCache(str(tmp_path / "cache"), 1.0)
+    cache.store(_makeCase(tmp_path, "first", "same input"))
+
+    second = _makeCase(tmp_path, "second", "same input", withOutputs=False)
+    assert cache.fetch(second)
+    assert (tmp_path / "second" / "second.out").read_text() == "o" * OUTPUT_BYTES
+    assert (tmp_path / "second" / "ISOTXS000001").exists()
+
+    other = _makeCase(tmp_path, "other", "another input", withOutputs=False)
+    assert not cache.fetch(other)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evictsLeastRecentlyUsed(tmp_path, monkeypatch):
+    clock = iter(range(1000))
+    monkeypatch.setattr(dragonCache.time, "time", lambda: float(next(clock)))
+    # room for two entries of two files each
+    maxSizeMB = 4.5 * OUTPUT_BYTES / 1024 ** 2
+    cache = dragonCache.DragonResultCache(str(tmp_path / "cache"), maxSizeMB)
+    cache.store(_makeCase(tmp_path, "a", "input a"))
+    cache.store(_makeCase(tmp_path, "b", "input b"))
+    # using a makes b the least recently used
+    assert cache.fetch(_makeCase(tmp_path, "a2", "input a", withOutputs=False))
+    cache.store(_makeCase(tmp_path, "c", "input c"))
+
+    assert cache.fetch(_makeCase(tmp_path, "a3", "input a", withOutputs=False))
+    assert cache.fetch(_makeCase(tmp_path, "c2", "input c", withOutputs=False))
+    assert not cache.fetch(_makeCase(tmp_path, "b2", "input b", withOutputs=False))
+
+
+def test_indexIsRebuiltWhenOpened(tmp_path):
+    root = str(tmp_path / "cache")
+    cache = dragonCache.DragonResultCache(root, 1.0)
+    cache.store(_makeCase(tmp_path, "a", "input a"))
+    cache.store(_makeCase(tmp_path, "b", "input b"))
+
+    reopened = dragonCache.DragonResultCache(root, 1.0)
+    # pylint: disable=protected-access
+    assert len(reopened._index) == 2
+    assert reopened._totalBytes == cache._totalBytes == 4 * OUTPUT_BYTES
@@ -0,0 +1,133 @@
+"""Tests of running DRAGON cases, with a stub executable standing in for DRAGON."""
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from happ import dragonRunner
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="the stub DRAGON is a script with a shebang"
+)
+
+# Reads "KINF <value>", "SLEEP <seconds>", "ALLOCATE <MB>", and "ABORT" lines from
+# its input
+STUB_DRAGON = """#!{python}
+import sys
+import time
+
+for line in sys.stdin:
+    command, _, value = line.strip().partition(" ")
+    if command == "KINF":
+        print(" K-INFINITY  =", value, flush=True)
+    elif command == "SLEEP":
+        print("FLUX := FLU: FLUX LIBRARY TRACK ::", flush=True)
+        time.sleep(float(value))
+    elif command == "ALLOCATE":
+        data = b"x" * (int(value) * 2 ** 20)
+    elif command == "ABORT":
+        print("XABORT: stub failure", flush=True)
+        time.sleep(30)
+        sys.exit(1)
+"""
+
+
+@pytest.fixture
+def stubDragon(tmp_path):
+    path = tmp_path / "stubDragon.py"
+    path.write_text(STUB_DRAGON.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def _makeCase(tmp_path, stubDragon, label, lines):
+    workingDir = tmp_path / label
+    workingDir.mkdir()
+    (workingDir / "case.x2m").write_text("\n".join(lines) + "\n")
+    return dragonRunner.DragonCase(
+        label=label,
+        workingDir=str(workingDir),
+        executablePath=stubDragon,
+        inputName="case.x2m",
+        outputName="case.out",
+    )
+
+
+@pytest.mark.parametrize("numWorkers", [1, 3])
+@pytest.mark.parametrize("useAsync", [False, True])
+def test_resultsInCaseOrder(tmp_path, stubDragon, numWorkers, useAsync):
+    # later cases finish first
+    cases = [
+        _makeCase(tmp_path, stubDragon, label, [f"SLEEP {0.4 - 0.1 * i}", f"KINF {i}"])
+        for i, label in enumerate(["c0", "c1", "c2", "c3"])
+    ]
+    results = dragonRunner.runCases(cases, numWorkers, useAsync=useAsync)
+    assert [result.label for result in results] == ["c0", "c1", "c2", "c3"]
+    assert all(result.ok for result in results)
+    kinfs = [dragonRunner.readKinf(result.outputPath) for result in results]
+    assert kinfs == [0.0, 1.0, 2.0, 3.0]
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs os.wait4")
+def test_peakMemoryOfEachCase(tmp_path, stubDragon):
+    cases = [
+        _makeCase(tmp_path, stubDragon, "large", ["ALLOCATE 200", "KINF 1"]),
+        _makeCase(tmp_path, stubDragon, "small", ["KINF 1"]),
+    ]
+    large, small = dragonRunner.runCases(cases)
+    # each case reports its own peak, not the largest of all earlier processes
+    assert 0 < small.peakMemoryMB < 200 < large.peakMemoryMB
+
+
+def test_duplicatesGetTheirOwnResult(tmp_path, stubDragon):
+    cases = [
+        _makeCase(tmp_path, stubDragon, "c0", ["KINF 1.1"]),
+        _makeCase(tmp_path, stubDragon, "c1", ["KINF 1.2"]),
+        _makeCase(tmp_path, stubDragon, "c2", ["KINF 1.1"]),
+    ]
+    results = dragonRunner.runCases(cases, 2)
+    duplicate = results[2]
+    assert duplicate.label == "c2"
+    assert duplicate.workingDir == cases[2].workingDir
+    assert duplicate.duplicateOf == "c0"
+    assert results[0].duplicateOf is None
+    assert dragonRunner.readKinf(duplicate.outputPath) == 1.1
+
+
+@pytest.mark.parametrize("useAsync", [False, True])
+def test_timeout(tmp_path, stubDragon, useAsync):
+    case = _makeCase(tmp_path, stubDragon, "slow", ["SLEEP 30", "KINF 1.0"])
+    start = time.perf_counter()
+    (result,) = dragonRunner.runCases([case], timeoutSec=1.0, useAsync=useAsync)
+    assert time.perf_counter() - start < 10.0
+    assert not result.ok
+    assert "timed out" in result.failure
+    assert result.lastModule == "FLU"
+
+
+def test_fatalErrorKillsAsyncCase(tmp_path, stubDragon):
+    case = _makeCase(tmp_path, stubDragon, "abort", ["ABORT"])
+    start = time.perf_counter()
+    (result,) = dragonRunner.runCases([case], useAsync=True)
+    assert time.perf_counter() - start < 10.0
+    assert not result.ok
+    assert "XABORT" in result.failure
+
+
+def test_checkRaisesForFailedCases(tmp_path, stubDragon):
+    cases = [
+        _makeCase(tmp_path, stubDragon, "good", ["KINF 1.0"]),
+        _makeCase(tmp_path, stubDragon, "abort", ["ABORT"]),
+    ]
+    good, failed = dragonRunner.runCases(cases, useAsync=True)
+    good.check()
+    with pytest.raises(dragonRunner.DragonCaseError, match="abort"):
+        failed.check()
+
+
+def test_readKinfFortranExponent(tmp_path):
+    output = tmp_path / "case.out"
+    output.write_text(" K-EFFECTIVE  =  1.0D+00\n K-INFINITY = 1.234500D+00\n")
+    assert dragonRunner.readKinf(str(output)) == 1.2345
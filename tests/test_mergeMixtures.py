@@ -0,0 +1,71 @@
+"""Tests of merging DRAGON mixtures of rings with matching compositions."""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("armi")
+pytest.importorskip("terrapower.physics.neutronics.dragon")
+
+# pylint: disable=wrong-import-position
+from happ import latticeInterface
+
+
+class FakeMixture:
+    def __init__(self, tempK, ndens, selfshield=""):
+        self.tempK = tempK
+        self.ndens = ndens
+        self.selfshield = selfshield
+
+    def getTempInK(self):
+        return self.tempK
+
+    def getMixVector(self):
+        return [
+            SimpleNamespace(
+                armiName=name,
+                xsid="AA",
+                dragName=name,
+                selfshield=self.selfshield,
+                ndens=nd,
+            )
+            for name, nd in self.ndens.items()
+        ]
+
+
+def test_identicalRingsShareAMixture():
+    fuel = {"U235": 1e-3, "U238": 2e-2}
+    mixtures = [
+        FakeMixture(700.0, fuel),
+        FakeMixture(600.0, {"NA23": 2e-2}),
+        FakeMixture(700.0, dict(fuel)),
+        FakeMixture(600.0, {"NA23": 2e-2}),
+    ]
+    unique, ringMixtures = latticeInterface.mergeMixtures(mixtures)
+    assert unique == [mixtures[0], mixtures[1]]
+    assert ringMixtures == [1, 2, 1, 2]
+
+
+def test_mixturesMustMatchExactlyByDefault():
+    mixtures = [
+        FakeMixture(700.0, {"U238": 2e-2}),
+        FakeMixture(701.0, {"U238": 2e-2}),
+        FakeMixture(700.0, {"U238": 2.0001e-2}),
+        FakeMixture(700.0, {"U238": 2e-2}, selfshield="1"),
+        FakeMixture(700.0, {"U238": 2e-2, "U235": 1e-12}),
+    ]
+    _unique, ringMixtures = latticeInterface.mergeMixtures(mixtures)
+    assert ringMixtures == [1, 2, 3, 4, 5]
+
+
+def test_toleranceMergesIntoTheFirstMatch():
+    mixtures = [
+        FakeMixture(700.0, {"U238": 2e-2}),
+        FakeMixture(701.0, {"U238": 2.0001e-2}),
+        FakeMixture(800.0, {"U238": 2e-2}),
+        FakeMixture(700.0, {"U238": 2e-2, "U235": 1e-12}),
+    ]
+    unique, ringMixtures = latticeInterface.mergeMixtures(mixtures, tolerance=1e-2)
+    # a merged ring takes the composition of the first ring, and trace nuclides
+    # still keep mixtures apart
+    assert unique == [mixtures[0], mixtures[2], mixtures[3]]
+    assert ringMixtures == [1, 1, 2, 3]
@@ -0,0 +1,58 @@
+"""Tests of adaptive radial mesh splitting, with a model k-inf in place of DRAGON."""
+import pytest
+
+from happ import meshAdaptation
+
+
+def _makeKinf(weights, calls=None):
+    """k-inf whose discretization error in each ring falls off as 1/splits^2."""
+
+    def runKinf(splits):
+        if calls is not None:
+            calls.append(tuple(splits))
+        return 1.0 - sum(w / n ** 2 for w, n in zip(weights, splits))
+
+    return runKinf
+
+
+def test_adaptSplitsRefinesOnlyWhereNeeded():
+    calls = []
+    # the second ring barely matters, the first matters a lot
+    runKinf = _makeKinf([1e-2, 1e-7, 1e-3], calls)
+    splits, kinf, numRuns = meshAdaptation.adaptSplits(runKinf, [1, 1, 1], 1e-4)
+
+    assert splits[1] == 1
+    assert splits[0] > splits[2] > 1
+    # each pattern is only evaluated once
+    assert numRuns == len(calls) == len(set(calls))
+    assert kinf == runKinf(splits)
+    finest = max(calls, key=sum)
+    assert abs(kinf - runKinf(finest)) <= 1e-4
+
+
+def test_adaptSplitsStopsAtMaxSplits():
+    runKinf = _makeKinf([1.0])
+    splits, _kinf, _numRuns = meshAdaptation.adaptSplits(
+        runKinf, [1], 1e-12, maxSplits=8
+    )
+    assert splits == [8]
+
+
+def test_adaptSplitsNeedsKinf():
+    with pytest.raises(RuntimeError):
+        meshAdaptation.adaptSplits(lambda splits: None, [1], 1e-4)
+
+
+def test_splitCacheKeysAndTolerance(tmp_path):
+    path = str(tmp_path / "splits" / "meshSplits.json")
+    cache = meshAdaptation.SplitCache(path)
+    cache.set("basic fuel:abc", [4, 1, 2], 1e-4, 1.1)
+
+    reopened = meshAdaptation.SplitCache(path)
+    assert reopened.get("basic fuel:abc", 3, 1e-4) == [4, 1, 2]
+    # a looser tolerance can use a tighter mesh, but not the other way around
+    assert reopened.get("basic fuel:abc", 3, 1e-3) == [4, 1, 2]
+    assert reopened.get("basic fuel:abc", 3, 1e-5) is None
+    # another unit cell or nuclear data of the same design gets its own mesh
+    assert reopened.get("basic fuel:def", 3, 1e-4) is None
+    assert reopened.get("basic fuel:abc", 4, 1e-4) is None
@@ -0,0 +1,77 @@
+"""Tests of pruning trace nuclides from the rings of a converted unit cell."""
+import pytest
+
+armi = pytest.importorskip("armi")
+
+# pylint: disable=wrong-import-position
+from happ import nuclidePruning
+
+
+class FakeRing:
+    def __init__(self, area, ndens):
+        self.area = area
+        self.ndens = dict(ndens)
+        self.numSets = 0
+
+    def getArea(self):
+        return self.area
+
+    def getNumberDensities(self):
+        return dict(self.ndens)
+
+    def setNumberDensities(self, ndens):
+        self.ndens = dict(ndens)
+        self.numSets += 1
+
+
+@pytest.fixture
+def rings():
+    if not armi.isConfigured():
+        armi.configure()
+    fuel = FakeRing(1.0, {"U235": 1e-3, "U238": 2e-2, "XE135": 1e-9})
+    steel = FakeRing(2.0, {"FE56": 8e-2, "FE54": 1e-7, "C": 1e-2})
+    return [fuel, steel]
+
+
+def _getElementMass(ndens, symbol):
+    # pylint: disable=import-outside-toplevel ; needs ARMI configured first
+    from armi.nucDirectory import nuclideBases as nb
+
+    return sum(
+        nd * nb.byName[name].weight
+        for name, nd in ndens.items()
+        if nb.byName[name].element.symbol == symbol
+    )
+
+
+def test_strongAbsorbersAreKept(rings):
+    fuel, steel = rings
+    report = nuclidePruning.pruneRings(rings, 1e-5, label="cell")
+
+    assert report.removed == [(1, "FE54", 1e-7)]
+    assert "XE135" in fuel.ndens
+    assert fuel.numSets == 0
+    assert set(steel.ndens) == {"FE56", "C"}
+    assert report.numNuclides == 5
+    totalAtoms = 1.0 * (1e-3 + 2e-2 + 1e-9) + 2.0 * (8e-2 + 1e-7 + 1e-2)
+    assert report.atomFraction == pytest.approx(2.0 * 1e-7 / totalAtoms)
+
+
+def test_massIsPreservedPerElement(rings):
+    steel = rings[1]
+    before = steel.getNumberDensities()
+    nuclidePruning.pruneRings(rings, 1e-5)
+
+    assert _getElementMass(steel.ndens, "FE") == pytest.approx(
+        _getElementMass(before, "FE"), rel=1e-12
+    )
+    assert steel.ndens["FE56"] > before["FE56"]
+    # other elements in the ring are left alone
+    assert steel.ndens["C"] == before["C"]
+
+
+def test_massIsLostWithoutRenormalization(rings):
+    steel = rings[1]
+    report = nuclidePruning.pruneRings(rings, 1e-5, preserveMass=False)
+    assert steel.ndens["FE56"] == 8e-2
+    assert report.massFraction > 0.0
@@ -0,0 +1,83 @@
+"""Tests of matching resonance states and reusing self-shielded libraries."""
+import copy
+from types import SimpleNamespace
+
+import numpy
+import pytest
+
+from happ import shielding
+
+
+class FakeMixture:
+    def __init__(self, tempK, nuclides):
+        self.tempK = tempK
+        self.nuclides = nuclides
+
+    def getTempInK(self):
+        return self.tempK
+
+    def getMixVector(self):
+        return [
+            SimpleNamespace(armiName=name, xsid="AA", ndens=nd, selfshield=shield)
+            for name, nd, shield in self.nuclides
+        ]
+
+
+def _makeState(sodium=0.02, u238=0.03, tempK=700.0):
+    mixtures = [
+        FakeMixture(tempK, [("U238", u238, "1"), ("MO", 0.005, "")]),
+        FakeMixture(600.0, [("NA23", sodium, " "), ("C", 0.08, "")]),
+    ]
+    templateData = {
+        "nucData": "draglib",
+        "radii": [0.5, 1.0],
+        "ringMixtures": [1, 2],
+        "mixtures": mixtures,
+    }
+    return shielding.getResonanceState(templateData)
+
+
+def test_resonanceStateSplitsAbsorbersFromBackground():
+    state = _makeState()
+    fuel, coolant = state["mixtures"]
+    assert fuel["ndens"] == {"U238AA": 0.03}
+    assert fuel["background"] == {"MOAA": 0.005}
+    assert coolant["ndens"] == {}
+    assert coolant["background"] == {"NA23AA": 0.02, "CAA": 0.08}
+
+
+def test_stateDistanceIncludesBackground():
+    state = _makeState()
+    assert shielding.getStateDistance(state, copy.deepcopy(state)) == 0.0
+    # a change in sodium density changes the dilution, so it counts
+    assert shielding.getStateDistance(_makeState(sodium=0.01), state) == 0.5
+    for changed in (_makeState(u238=0.0303), _makeState(tempK=707.0)):
+        assert shielding.getStateDistance(changed, state) == pytest.approx(0.01)
+
+
+def test_statesWithOtherNuclidesAreInfinitelyFar():
+    state = _makeState()
+    other = copy.deepcopy(state)
+    other["mixtures"][1]["background"]["O16AA"] = 1e-6
+    assert shielding.getStateDistance(other, state) == numpy.inf
+    other = copy.deepcopy(state)
+    other["nucData"] = "another library"
+    assert shielding.getStateDistance(other, state) == numpy.inf
+
+
+def test_storeFindsClosestLibraryWithoutCountingReuse(tmp_path):
+    store = shielding.ShieldedLibraryStore(str(tmp_path / "store"), 0.05)
+    state = _makeState()
+    near = _makeState(u238=0.0301)
+    for content, libraryState in ((b"near", near), (b"exact", state)):
+        library = tmp_path / content.decode()
+        library.write_bytes(content)
+        store.add(libraryState, str(library))
+
+    key, path = store.find(state)
+    with open(path, "rb") as f:
+        assert f.read() == b"exact"
+    assert key == store.entries[1]["key"]
+    assert store.find(_makeState(sodium=0.01)) == (None, None)
+    # only the caller knows whether the case that found a library will run
+    assert store.reused == 0
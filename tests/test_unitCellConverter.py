@@ -0,0 +1,124 @@
+"""Tests of the Hallam unit cell converter."""
+import copy
+
+import pytest
+
+armi = pytest.importorskip("armi")
+
+# pylint: disable=wrong-import-position
+from armi.reactor import blocks
+from armi.reactor import components
+from armi.reactor.flags import Flags
+
+from happ import benchmarks
+from happ import unitCellConverter
+
+
+@pytest.fixture
+def ringSpec():
+    if not armi.isConfigured():
+        armi.configure()
+    pins = components.Circle(
+        "clad", "HT9", Tinput=20.0, Thot=400.0, od=1.2, id=1.0, mult=7
+    )
+    pins.p.flags = Flags.CLAD
+    coolant = components.Circle(
+        "coolant", "Sodium", Tinput=400.0, Thot=400.0, od=4.0, id=0.0, mult=1
+    )
+    coolant.p.flags = Flags.COOLANT
+    tube = components.Circle(
+        "process tube", "Graphite", Tinput=20.0, Thot=450.0, od=5.0, id=4.0, mult=1
+    )
+    return unitCellConverter.RingSpec(
+        components=[pins, coolant, tube], innerDiamCm=0.5, heightCm=1.0, fraction=0.9
+    )
+
+
+def test_makeRingMatchesBlender(ringSpec):
+    ring = unitCellConverter._makeRing(ringSpec)
+    reference = benchmarks.makeRingWithBlender(ringSpec)
+    assert ring.getDimension("id") == reference.getDimension("id")
+    assert ring.getDimension("od") == pytest.approx(reference.getDimension("od"))
+    assert ring.temperatureInC == reference.temperatureInC
+    assert ring.p.flags == reference.p.flags
+    densities = ring.getNumberDensities()
+    referenceDensities = reference.getNumberDensities()
+    assert set(densities) == set(referenceDensities)
+    for nucName, nd in referenceDensities.items():
+        assert densities[nucName] == pytest.approx(nd, rel=1e-12)
+
+
+@pytest.fixture
+def unitCell():
+    """A block with a circle for each component of the Hallam ring layout."""
+    if not armi.isConfigured():
+        armi.configure()
+    b = blocks.HexBlock("unit cell")
+    b.setHeight(10.0)
+    innerDiam = 0.0
+    for ringNames in unitCellConverter.RING_LAYOUT:
+        for name in ringNames:
+            material = "HT9" if name == "fuel" else "Graphite"
+            c = components.Circle(
+                name, material, Tinput=20.0, Thot=400.0, od=innerDiam + 0.5, id=0.0
+            )
+            b.add(c)
+        innerDiam += 0.5
+    return b
+
+
+def test_reconvertOnlyBlendsChangedRings(unitCell):
+    conv = unitCellConverter.HallamUnitCellConverter(unitCell, quiet=True)
+    first = conv.convert()
+    firstDensities = [ring.getNumberDensities() for ring in first]
+    firstDiams = [ring.getDimension("od") for ring in first]
+
+    unitCell.getComponentByName("fuel").setTemperature(600.0)
+    second = conv.convert()
+    fresh = unitCellConverter.HallamUnitCellConverter(unitCell, quiet=True).convert()
+
+    # the block returned by the first conversion is left alone
+    assert [ring.getNumberDensities() for ring in first] == firstDensities
+    assert [ring.getDimension("od") for ring in first] == firstDiams
+    assert all(new is not old for new, old in zip(second, first))
+    # only the fuel ring changed composition
+    changed = [
+        old.getNumberDensities() != new.getNumberDensities()
+        for old, new in zip(first, second)
+    ]
+    assert changed == [False, True, False, False, False]
+    for ring, freshRing in zip(second, fresh):
+        assert ring.getDimension("od") == pytest.approx(freshRing.getDimension("od"))
+        assert ring.getNumberDensities() == freshRing.getNumberDensities()
+
+
+def test_setSourceBlockReusesMatchingRings(unitCell):
+    conv = unitCellConverter.HallamUnitCellConverter(unitCell, quiet=True)
+    conv.convert()
+    blended = list(conv._blendedRings)
+
+    perturbed = copy.deepcopy(unitCell)
+    perturbed.getComponentByName("moderator").changeNDensByFactor(0.9)
+    conv.setSourceBlock(perturbed)
+    conv.convert()
+
+    reused = [new is old for new, old in zip(conv._blendedRings, blended)]
+    assert reused == [True, True, True, True, False]
+
+
+def test_setSourceBlockFollowsChildOrder(unitCell):
+    conv = unitCellConverter.HallamUnitCellConverter(unitCell, quiet=True)
+    conv.convert()
+
+    # same number of children, in another order
+    reordered = blocks.HexBlock("reordered")
+    reordered.setHeight(unitCell.getHeight())
+    for c in reversed(list(copy.deepcopy(unitCell))):
+        reordered.add(c)
+    conv.setSourceBlock(reordered)
+    converted = conv.convert()
+
+    fresh = unitCellConverter.HallamUnitCellConverter(unitCell, quiet=True).convert()
+    for ring, freshRing in zip(converted, fresh):
+        assert ring.getDimension("od") == pytest.approx(freshRing.getDimension("od"))
+        assert ring.getNumberDensities() == freshRing.getNumberDensities()